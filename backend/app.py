@@ -3,6 +3,7 @@ from http import HTTPStatus
 from flask import Flask, g, request
 from backend.tool.logger import get_logger, init_logger_handler
 from backend.tool.security import init_cors
+from backend.tool.profiler import init_profiling
 from backend import config
 
 logger = get_logger(__name__)
@@ -20,6 +21,7 @@ def create_app():
 
 def init_extensions(app):
     init_cors(app)
+    init_profiling(app)
 
 
 def init_controller(app):
@@ -11,16 +11,122 @@ RETRIEVAL_LIMIT: int = int(os.getenv("RETRIEVAL_LIMIT", default=10))
 REPLY_LIMIT: int = int(os.getenv("REPLY_LIMIT", default=10))
 
 SERVERLESS_CLUSTER_HOST: str = os.getenv("SERVERLESS_CLUSTER_HOST")
-SERVERLESS_CLUSTER_PORT: int = int(os.getenv("SERVERLESS_CLUSTER_PORT"))
+SERVERLESS_CLUSTER_PORT: int = int(os.getenv("SERVERLESS_CLUSTER_PORT", default=4000))
 SERVERLESS_CLUSTER_USERNAME: str = os.getenv("SERVERLESS_CLUSTER_USERNAME")
 SERVERLESS_CLUSTER_PASSWORD: str = os.getenv("SERVERLESS_CLUSTER_PASSWORD")
 SERVERLESS_CLUSTER_DATABASE_NAME: str = os.getenv("SERVERLESS_CLUSTER_DATABASE_NAME")
 
+# Storage backend: "tidb" (TiDB Serverless via pytidb) or "local" (SQLite rows + memory-mapped NumPy vectors)
+STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", default="tidb").lower()
+LOCAL_STORAGE_PATH: str = os.getenv("LOCAL_STORAGE_PATH", default="data")
+
 EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL")
 MIN_DISTANCE: float = float(os.getenv("MIN_DISTANCE", default=0.7))
+# Replies mark results closer than this as "Similar", the others as "Related"
+SIMILAR_DISTANCE: float = float(os.getenv("SIMILAR_DISTANCE", default=0.3))
+
+# Embedding model migration: new vectors are dual-written to the *_vec_next columns and existing rows are
+# re-embedded in the background (python -m backend.tool.reembed); search switches once coverage is complete
+EMBEDDING_MIGRATION_MODEL: str = os.getenv("EMBEDDING_MIGRATION_MODEL")
+EMBEDDING_MIGRATION_DIMENSIONS: int = int(os.getenv("EMBEDDING_MIGRATION_DIMENSIONS")) if os.getenv("EMBEDDING_MIGRATION_DIMENSIONS") else None
+EMBEDDING_MIGRATION_RATE: float = float(os.getenv("EMBEDDING_MIGRATION_RATE", default=10))  # Rows re-embedded per second
+EMBEDDING_MIGRATION_CONCURRENCY: int = int(os.getenv("EMBEDDING_MIGRATION_CONCURRENCY", default=2))
+EMBEDDING_MIGRATION_BATCH_SIZE: int = int(os.getenv("EMBEDDING_MIGRATION_BATCH_SIZE", default=32))
+
+# Time allowed for one provider embedding request
+EMBEDDING_TIMEOUT: float = float(os.getenv("EMBEDDING_TIMEOUT", default=60))
+# Optional secondary provider serving the SAME model (e.g. another region), raced against slow primary requests
+EMBEDDING_HEDGE_MODEL: str = os.getenv("EMBEDDING_HEDGE_MODEL")
+EMBEDDING_HEDGE_API_BASE: str = os.getenv("EMBEDDING_HEDGE_API_BASE")
+EMBEDDING_HEDGE_AFTER_MS: float = float(os.getenv("EMBEDDING_HEDGE_AFTER_MS", default=500))
+
+# In-process models (EMBEDDING_MODEL="local/<model path>" or "hashing/<dimensions>"), see backend.tool.local_embedding
+EMBEDDING_LOCAL_THREADS: int = int(os.getenv("EMBEDDING_LOCAL_THREADS", default=0))  # 0 keeps torch's default, one per core
+EMBEDDING_LOCAL_BATCH_SIZE: int = int(os.getenv("EMBEDDING_LOCAL_BATCH_SIZE", default=32))
+EMBEDDING_LOCAL_DEVICE: str = os.getenv("EMBEDDING_LOCAL_DEVICE", default="cpu")
+
+# Embedding input compaction (token budgets are estimated, ~4 chars per token)
+EMBEDDING_TITLE_TOKEN_BUDGET: int = int(os.getenv("EMBEDDING_TITLE_TOKEN_BUDGET", default=256))
+EMBEDDING_BODY_TOKEN_BUDGET: int = int(os.getenv("EMBEDDING_BODY_TOKEN_BUDGET", default=2048))
+EMBEDDING_MAX_FENCED_LINES: int = int(os.getenv("EMBEDDING_MAX_FENCED_LINES", default=30))
+
+# Retrieval: "vector", or "hybrid" adding a full-text search of title/body whose hits are fused with the
+# vector results by reciprocal rank; issues containing one of the new issue's error lines verbatim rank higher
+SEARCH_MODE: str = os.getenv("SEARCH_MODE", default="vector").lower()
+HYBRID_LEXICAL_LIMIT: int = int(os.getenv("HYBRID_LEXICAL_LIMIT", default=20))  # Full-text candidates per search
+HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", default=60))
+HYBRID_EXACT_MATCH_MIN_CHARS: int = int(os.getenv("HYBRID_EXACT_MATCH_MIN_CHARS", default=48))  # Shortest error line matched verbatim
+
+# Tiered search: search open and recently updated issues first, and older ones only when fewer than
+# SEARCH_HOT_TIER_MIN_HITS results fall within MIN_DISTANCE (tier hit rates at /metrics/search-tiers)
+SEARCH_TIERED: bool = os.getenv("SEARCH_TIERED", "false").lower() in ("true", "1", "yes")
+SEARCH_HOT_TIER_DAYS: int = int(os.getenv("SEARCH_HOT_TIER_DAYS", default=180))
+SEARCH_HOT_TIER_MIN_HITS: int = int(os.getenv("SEARCH_HOT_TIER_MIN_HITS", default=3))
+
+# Vector storage: "full" searches full vectors, "truncated" searches compact vectors then re-ranks exactly
+VECTOR_STORAGE_MODE: str = os.getenv("VECTOR_STORAGE_MODE", default="full").lower()
+COMPACT_VECTOR_DIMENSIONS: int = int(os.getenv("COMPACT_VECTOR_DIMENSIONS", default=256))
+# Number of first-pass candidates fetched per final result for the exact re-rank
+RERANK_CANDIDATE_FACTOR: int = int(os.getenv("RERANK_CANDIDATE_FACTOR", default=4))
+# TiDB only uses a vector index for an unfiltered ORDER BY distance LIMIT, so the repository and other filters
+# are applied to this many nearest neighbours per result (as pytidb's post-filter search)
+VECTOR_SEARCH_OVERFETCH_FACTOR: int = int(os.getenv("VECTOR_SEARCH_OVERFETCH_FACTOR", default=10))
+
+# Micro-batching of embedding calls across concurrent requests
+EMBEDDING_BATCH_ENABLED: bool = os.getenv("EMBEDDING_BATCH_ENABLED", "true").lower() in ("true", "1", "yes")
+EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", default=64))
+EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", default=5))
+EMBEDDING_BATCH_CONCURRENCY: int = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", default=4))
+
+# Outbound HTTP (GitHub and embedding providers): keep-alive pools, retries with jittered backoff
+HTTP_POOL_CONNECTIONS: int = int(os.getenv("HTTP_POOL_CONNECTIONS", default=10))  # Number of per-host pools kept
+HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", default=20))  # Connections kept per host
+HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", default=3))
+HTTP_BACKOFF_FACTOR: float = float(os.getenv("HTTP_BACKOFF_FACTOR", default=0.5))
+HTTP_BACKOFF_JITTER: float = float(os.getenv("HTTP_BACKOFF_JITTER", default=0.5))
+HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", default=30))
+
+# Backfill pipeline (init_database): workers per stage and bounded queues between stages
+BACKFILL_FETCH_WORKERS: int = int(os.getenv("BACKFILL_FETCH_WORKERS", default=1))  # Repositories fetched in parallel
+BACKFILL_CONVERT_WORKERS: int = int(os.getenv("BACKFILL_CONVERT_WORKERS", default=1))
+BACKFILL_EMBED_WORKERS: int = int(os.getenv("BACKFILL_EMBED_WORKERS", default=8))
+BACKFILL_WRITE_WORKERS: int = int(os.getenv("BACKFILL_WRITE_WORKERS", default=4))
+BACKFILL_QUEUE_SIZE: int = int(os.getenv("BACKFILL_QUEUE_SIZE", default=200))
+BACKFILL_REPORT_INTERVAL: float = float(os.getenv("BACKFILL_REPORT_INTERVAL", default=30))
+
+# Dependency resilience: time budget per webhook delivery, shared by embedding, search and comment calls
+WEBHOOK_TIME_BUDGET_SECONDS: float = float(os.getenv("WEBHOOK_TIME_BUDGET_SECONDS", default=20))
+CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=5))  # Consecutive failures
+CIRCUIT_BREAKER_RESET_SECONDS: float = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", default=30))  # Open time before a trial call
+HEDGE_MAX_WORKERS: int = int(os.getenv("HEDGE_MAX_WORKERS", default=16))
+
+# Webhook priority lanes: events that can lead to a reply run at once on reserved workers, metadata
+# churn is queued for a smaller background pool (answered 202, lost if the process exits while queued)
+WEBHOOK_PRIORITY_LANES: bool = os.getenv("WEBHOOK_PRIORITY_LANES", "true").lower() in ("true", "1", "yes")
+WEBHOOK_FAST_LANE_WORKERS: int = int(os.getenv("WEBHOOK_FAST_LANE_WORKERS", default=8))
+WEBHOOK_BACKGROUND_LANE_WORKERS: int = int(os.getenv("WEBHOOK_BACKGROUND_LANE_WORKERS", default=2))
+WEBHOOK_BACKGROUND_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_BACKGROUND_QUEUE_SIZE", default=1000))
+
+# Work leases in the issue storage, so replicas never process the same delivery twice nor the same
+# issue concurrently (inserts, comments, backfill writes). Leases of crashed workers expire after the TTL.
+WORK_LEASES_ENABLED: bool = os.getenv("WORK_LEASES_ENABLED", "true").lower() in ("true", "1", "yes")
+LEASE_TTL_SECONDS: float = float(os.getenv("LEASE_TTL_SECONDS", default=120))  # Longer than any unit of work
+LEASE_WAIT_SECONDS: float = float(os.getenv("LEASE_WAIT_SECONDS", default=30))  # Wait for a held lease, outside a time budget
+LEASE_POLL_SECONDS: float = float(os.getenv("LEASE_POLL_SECONDS", default=0.2))
+# Processed deliveries stay claimed this long, GitHub allows redelivering the last 3 days
+DELIVERY_LEASE_RETENTION_SECONDS: float = float(os.getenv("DELIVERY_LEASE_RETENTION_SECONDS", default=3 * 24 * 3600))
 
 # GitHub Config
+GITHUB_API_URL: str = os.getenv("GITHUB_API_URL", default="https://api.github.com").rstrip("/")
+# Defaults to the GraphQL endpoint matching GITHUB_API_URL
+GITHUB_GRAPHQL_URL: str = os.getenv("GITHUB_GRAPHQL_URL", default="").rstrip("/")
+# How init_database fetches issues: "rest" (PyGithub listing) or "graphql" (only the stored fields, 100 issues per query)
+GITHUB_SYNC_MODE: str = os.getenv("GITHUB_SYNC_MODE", default="rest").lower()
 GITHUB_REPO_NAME: str = os.getenv("GITHUB_REPO_NAME")
+# Comma separated list of repositories to serve; empty means every repository the App is installed on
+GITHUB_REPO_NAMES: list[str] = [
+    name.strip() for name in os.getenv("GITHUB_REPO_NAMES", default=GITHUB_REPO_NAME or "").split(",") if name.strip()
+]
 
 # For getting issues from the webhook
 GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET")
@@ -29,4 +135,14 @@ GITHUB_WEBHOOK_URL: str = os.getenv("GITHUB_WEBHOOK_URL", default="/github/webho
 # GitHub App authentication
 GITHUB_APP_ID: str = os.getenv("GITHUB_APP_ID")
 GITHUB_APP_PRIVATE_KEY: str = os.getenv("GITHUB_APP_PRIVATE_KEY")  # Path to private key file or key content
+# Optional: installations are resolved per repository / per webhook; this is only the fallback
 GITHUB_APP_INSTALLATION_ID: str = os.getenv("GITHUB_APP_INSTALLATION_ID")
+
+# Request profiling (cProfile + tracemalloc), nothing is installed unless enabled
+PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("true", "1", "yes")
+# Requests sending this token in the X-Tiara-Profile header are profiled; it also guards the /profiles endpoints
+PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN")
+PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", default=0))  # Fraction of other requests profiled
+PROFILING_DIR: str = os.getenv("PROFILING_DIR", default="profiles")
+PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", default=50))  # Oldest profiles are deleted beyond this
+PROFILING_TOP_ENTRIES: int = int(os.getenv("PROFILING_TOP_ENTRIES", default=30))  # Functions and allocation sites in reports
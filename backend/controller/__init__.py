@@ -1,14 +1,20 @@
 from . import root
 from . import github
 from . import issues
+from . import metrics
+from . import profiles
+from backend import config
 
 BPS = [
     ('/', root.bp),
     ('/issues', issues.bp),
+    ('/metrics', metrics.bp),
 ]
 
 def init_routes(app):
     github.init_webhook(app)
     for url_prefix, bp in BPS:
         app.register_blueprint(bp, url_prefix=url_prefix)
+    if config.PROFILING_ENABLED:
+        app.register_blueprint(profiles.bp, url_prefix='/profiles')
     return app
@@ -1,11 +1,18 @@
 from http import HTTPStatus
-from backend.model import base
+from flask import abort, make_response, request
 from backend.tool.logger import get_logger
 from github_webhook import Webhook
 from backend import config
-from backend.model.issue import ISSUE_TABLE_NAME, Issue
-from backend.model.init_database import diff_and_get_changed_fields, PROTECTED_FIELDS
+from backend.model.issue import Issue
+from backend.model.store import get_issue_store
+from backend.model.embedding import embed_issue, embed_changed_fields, defer_changed_fields_embedding
+from backend.model.compact_vectors import compact_enabled
+from backend.model.init_database import load_changed_fields
 from backend.tool.send_issue_comment import search_similar_issues, log_similar_issues, send_issue_comment, should_send_comment
+from backend.tool.get_issues import remember_repo_installation
+from backend.tool import leases
+from backend.tool.priority_lanes import FAST_LANE, classify_issues_event, get_lanes
+from backend.tool.resilience import DeadlineExceeded, DependencyUnavailable, check_deadline, with_time_budget
 
 logger = get_logger(__name__)
 
@@ -20,14 +27,76 @@ def init_webhook(app):
     )
 
     @webhook.hook(event_type="issues")
+    @with_time_budget(lambda: config.WEBHOOK_TIME_BUDGET_SECONDS)
     def github_webhook_issues(data):
-        """Handle GitHub Issues webhook events."""
+        """
+        Route GitHub Issues webhook events to their priority lane. github_webhook ignores what
+        hooks return and answers 204, so failures are raised as HTTP errors for GitHub to see.
+        """
+        # Only readable in the request context, lanes may run the event after the response
+        delivery_id = request.headers.get('X-GitHub-Delivery')
+        if not config.WEBHOOK_PRIORITY_LANES:
+            return respond(*process_delivery(data, delivery_id))
+        
+        lanes = get_lanes()
+        lane = classify_issues_event(data)
+        if lane == FAST_LANE:
+            try:
+                return respond(*lanes[FAST_LANE].run(lambda: raise_for_failure(*process_delivery(data, delivery_id))))
+            except DeadlineExceeded as e:
+                logger.warning(f"No {FAST_LANE} lane worker became free in time: {str(e)}")
+                return respond({'status': 'error', 'message': str(e)}, HTTPStatus.SERVICE_UNAVAILABLE)
+            except DeliveryFailed as e:
+                return respond(e.body, e.status)
+        
+        if not lanes[lane].submit(lambda: raise_for_failure(*process_delivery(data, delivery_id))):
+            logger.warning(f"The {lane} lane is full, dropping Issues webhook event ({data.get('action')})")
+            return respond({'status': 'error', 'message': f'The {lane} lane is full'}, HTTPStatus.SERVICE_UNAVAILABLE)
+        return respond({'status': 'accepted', 'message': f'Queued in the {lane} lane'}, HTTPStatus.ACCEPTED)
+    
+    @with_time_budget(lambda: config.WEBHOOK_TIME_BUDGET_SECONDS)
+    def process_delivery(data, delivery_id=None):
+        """
+        Process an Issues webhook delivery once across all replicas (redeliveries of a processed
+        delivery are skipped), and at most one delivery of an issue at a time.
+        """
+        if not config.WORK_LEASES_ENABLED:
+            return process_issues_event(data)
+        
+        delivery_lease = leases.delivery_lease_name(delivery_id) if delivery_id else None
+        try:
+            if delivery_lease and not leases.try_acquire(delivery_lease):
+                logger.info(f"Skipping delivery {delivery_id}: already processed or being processed")
+                return {'status': 'duplicate', 'message': f'Delivery {delivery_id} already processed'}, HTTPStatus.OK
+            
+            with leases.issue_lease(data.get('issue', {}).get('id')):
+                body, status = process_issues_event(data)
+        except DeadlineExceeded as e:
+            logger.warning(f"Issue is being processed by another worker, giving up: {str(e)}")
+            body, status = {'status': 'error', 'message': str(e)}, HTTPStatus.SERVICE_UNAVAILABLE
+        except Exception as e:
+            logger.error(f"Error processing Issues webhook delivery {delivery_id}: {str(e)}")
+            body, status = {'status': 'error', 'message': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+        
+        if delivery_lease:
+            # Failed or degraded deliveries can be redelivered to try again
+            done = not is_failure(body, status)
+            leases.release(delivery_lease, keep_seconds=config.DELIVERY_LEASE_RETENTION_SECONDS if done else None)
+        return body, status
+    
+    @with_time_budget(lambda: config.WEBHOOK_TIME_BUDGET_SECONDS)
+    def process_issues_event(data):
+        """Handle GitHub Issues webhook events within WEBHOOK_TIME_BUDGET_SECONDS."""
         logger.info(f"Received GitHub Issues webhook: {data}")
         
         try:
             # Convert webhook payload to our Issue model
             issue = Issue.from_webhook_payload(data)
             
+            # Tokens are minted per installation, learn which one serves this repository
+            installation_id = data.get('installation', {}).get('id')
+            remember_repo_installation(issue.repository_name, installation_id)
+            
             action = data.get('action', 'unknown')
             logger.info(f"Issue {action}: #{issue.github_issue_number} - {issue.title}")
             logger.info(f"Repository: {issue.repository_name}")
@@ -54,19 +123,29 @@ def init_webhook(app):
 
             # Perform semantic search for similar issues
             try:
+                check_deadline("search")
                 logger.info(f"Searching for similar issues to #{issue.github_issue_number}")
                 similar_issues = search_similar_issues(issue, limit_per_field=config.RETRIEVAL_LIMIT)
                 log_similar_issues(similar_issues, issue)
+            except DependencyUnavailable:
+                raise
             except Exception as e:
                 logger.error(f"Error during similarity search for issue #{issue.github_issue_number}: {str(e)}")
                 # Don't fail the webhook if similarity search fails
+                similar_issues = []
             
             logger.info(f"Successfully processed {action} event for issue #{issue.github_issue_number}")
             
             # Send comment to issue
             if should_send_comment(action, issue, similar_issues):
-                send_issue_comment(issue, similar_issues)
+                check_deadline("comment")
+                # Edits the earlier reply if the delivery is retried or redelivered
+                send_issue_comment(issue, similar_issues, upsert=True)
             
+        except DependencyUnavailable as e:
+            # The issue is stored (possibly without vectors, filled in later), only the reply is given up
+            logger.warning(f"Degraded processing of Issues webhook, reply skipped: {str(e)}")
+            return {'status': 'degraded', 'message': f'Reply skipped: {str(e)}'}, HTTPStatus.OK
         except Exception as e:
             logger.error(f"Error processing Issues webhook: {str(e)}")
             return {'status': 'error', 'message': str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
@@ -74,6 +153,45 @@ def init_webhook(app):
         return {'status': 'success', 'message': 'Issues webhook processed'}, HTTPStatus.OK
 
 
+class DeliveryFailed(Exception):
+    """
+    A delivery failed or was degraded, raised so priority lanes count it as failed.
+    """
+
+    def __init__(self, body: dict, status: int):
+        super().__init__(f"{body.get('status')}: {body.get('message')}")
+        self.body = body
+        self.status = status
+
+
+def is_failure(body: dict, status: int) -> bool:
+    """
+    Whether a delivery failed, or was degraded (stored, reply skipped), and should be redelivered.
+    """
+    return status >= HTTPStatus.INTERNAL_SERVER_ERROR or body.get('status') == 'degraded'
+
+
+def raise_for_failure(body: dict, status: int):
+    """
+    Return the result of a delivery, raising DeliveryFailed if it failed or was degraded.
+    """
+    if is_failure(body, status):
+        raise DeliveryFailed(body, status)
+    return body, status
+
+
+def respond(body: dict, status: int):
+    """
+    Answer a webhook delivery: failures abort the request with their JSON body and status
+    (a degraded delivery with 503), other results are returned (github_webhook answers 204).
+    """
+    if body.get('status') == 'degraded':
+        status = HTTPStatus.SERVICE_UNAVAILABLE
+    if status >= HTTPStatus.BAD_REQUEST:
+        abort(make_response(body, status))
+    return body, status
+
+
 def save_issue_to_database(issue: Issue, action: str):
     """
     Save or update issue in database with diff optimization.
@@ -86,59 +204,91 @@ def save_issue_to_database(issue: Issue, action: str):
     """
     logger.info(f"Saving issue to database: {issue.github_issue_id} (action: {action})")
 
-    table = base.db.open_table(ISSUE_TABLE_NAME)
+    store = get_issue_store()
+    issue.content_fingerprint = issue.compute_content_fingerprint()
     
     # Indicates whether the bot should reply for this issue event
     should_reply = False
     
     try:
         if action == 'opened':
-            # Insert new issue
-            table.insert(issue)
-            logger.info(f"Inserted new issue #{issue.github_issue_number}")
-            
             # Determine if the REPLY_LABEL is present on newly opened issues
             labels_list = issue.get_labels_list() if issue.labels else []
             if any(label.get('name') == config.REPLY_LABEL for label in labels_list):
                 should_reply = True
         else:
-            # Update existing issue with diff optimization
-            existing_issue = table.get(issue.github_issue_id)
-            
-            # Determine if the REPLY_LABEL was newly added before any field update logic
+            # Determine if the REPLY_LABEL was newly added before any field update logic,
+            # the stored labels are only read when the event carries the label
             current_has_reply = False
             if issue.labels:
                 current_has_reply = any(label.get('name') == config.REPLY_LABEL for label in issue.get_labels_list())
-            db_has_reply = False
-            if existing_issue and getattr(existing_issue, 'labels', None):
-                db_has_reply = any(label.get('name') == config.REPLY_LABEL for label in existing_issue.get_labels_list())
-            if current_has_reply and not db_has_reply:
-                should_reply = True
-            
-            if existing_issue:
-                logger.info(f"Checking for changes in issue #{issue.github_issue_number} (action: {action})")
+            if current_has_reply:
+                stored = store.get_fields(issue.github_issue_id, ['labels'])
+                db_has_reply = bool(stored) and any(label.get('name') == config.REPLY_LABEL for label in stored['labels'] or [])
+                should_reply = not db_has_reply
+        
+        # Fingerprint fast path, then a diff without reading the vectors. Opened issues are
+        # checked too: the backfill, a redelivery or another event of the issue (e.g. the
+        # 'labeled' GitHub sends along, handled on another lane) may have stored it first.
+        changed_fields = load_changed_fields(issue, store)
+        
+        if changed_fields is not None:
+            if changed_fields:
+                logger.info(f"Updating {len(changed_fields)} changed fields for issue #{issue.github_issue_number}")
+                logger.debug(f"Changed fields: {list(changed_fields.keys())}")
                 
-                # Get only changed fields
-                changed_fields = diff_and_get_changed_fields(existing_issue, issue)
+                embed_error = None
+                try:
+                    embed_changed_fields(changed_fields)
+                except Exception as e:
+                    # Keep the update, init_database fills in the vectors later
+                    embed_error = e
+                    defer_changed_fields_embedding(changed_fields)
                 
-                if changed_fields:
-                    logger.info(f"Updating {len(changed_fields)} changed fields for issue #{issue.github_issue_number}")
-                    logger.debug(f"Changed fields: {list(changed_fields.keys())}")
-                    
-                    table.update(
-                        changed_fields,
-                        {"github_issue_id": issue.github_issue_id}
-                    )
-                    logger.info(f"Updated existing issue #{issue.github_issue_number}")
-                else:
-                    logger.info(f"No changes detected for issue #{issue.github_issue_number}, skipping update")
+                store.update(
+                    changed_fields,
+                    {"github_issue_id": issue.github_issue_id}
+                )
+                logger.info(f"Updated existing issue #{issue.github_issue_number}")
+                if embed_error is not None:
+                    raise _embedding_unavailable(issue, embed_error)
             else:
-                # Issue doesn't exist, insert it
-                table.insert(issue)
-                logger.info(f"Inserted new issue #{issue.github_issue_number} (not found for update)")
+                logger.info(f"No changes detected for issue #{issue.github_issue_number} (action: {action}), skipping update")
+        else:
+            # Issue doesn't exist, insert it
+            embed_issue_or_store_without_vectors(issue, store)
+            logger.info(f"Inserted new issue #{issue.github_issue_number}")
                 
+    except DependencyUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error saving issue #{issue.github_issue_number}: {str(e)}")
         raise
 
     return should_reply
+
+
+def _embedding_unavailable(issue: Issue, error: Exception) -> DependencyUnavailable:
+    logger.warning(f"Stored issue #{issue.github_issue_number} without vectors, embedding failed: {str(error)}")
+    if isinstance(error, DependencyUnavailable):
+        return error
+    return DependencyUnavailable("embedding", str(error))
+
+
+def embed_issue_or_store_without_vectors(issue: Issue, store):
+    """
+    Embed and insert a new issue. If embedding fails (provider down, circuit open, time
+    budget exhausted), the issue is still inserted, without vectors, and DependencyUnavailable
+    is raised so no reply is attempted; init_database fills in the vectors later.
+    """
+    try:
+        embed_issue(issue)
+    except Exception as e:
+        issue.title_vec = issue.body_vec = None
+        if compact_enabled():
+            issue.title_vec_compact = issue.body_vec_compact = None
+        issue.title_vec_next = issue.body_vec_next = None
+        # bulk_insert never auto-embeds the missing vectors
+        store.bulk_insert([issue])
+        raise _embedding_unavailable(issue, e)
+    store.insert(issue)
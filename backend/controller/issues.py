@@ -1,8 +1,9 @@
 from http import HTTPStatus
-from flask import Blueprint
+from flask import Blueprint, request
 
 from backend.tool.logger import get_logger
-from backend.tool.get_issues import get_github_client
+from backend.tool.get_issues import get_github_client, is_pull_request
+from backend.tool.leases import issue_lease
 from backend.tool.send_issue_comment import (
     search_similar_issues,
     log_similar_issues,
@@ -22,11 +23,16 @@ logger = get_logger(__name__)
 def fetch_issue(issue_id: int):
     try:
         # Authenticate via GitHub App and fetch the repository
-        github_client = get_github_client()
-        repo = github_client.get_repo(config.GITHUB_REPO_NAME)
+        repo_name = request.args.get('repo', config.GITHUB_REPO_NAME)
+        if not repo_name:
+            return {'status': 'error', 'message': 'Missing "repo" query parameter'}, HTTPStatus.BAD_REQUEST
+        github_client = get_github_client(repo_name=repo_name)
+        repo = github_client.get_repo(repo_name)
 
         # Fetch the issue by number from GitHub
         github_issue = repo.get_issue(issue_id)
+        if is_pull_request(github_issue):
+            return {'status': 'error', 'message': f'#{issue_id} is a pull request'}, HTTPStatus.BAD_REQUEST
 
         # Convert PyGithub Issue to our internal Issue model
         issue_model = Issue.from_github_issue(github_issue)
@@ -49,8 +55,11 @@ def fetch_issue(issue_id: int):
 def trigger_reply(issue_id: int):
     try:
         # Authenticate via GitHub App and fetch the repository
-        github_client = get_github_client()
-        repo = github_client.get_repo(config.GITHUB_REPO_NAME)
+        repo_name = request.args.get('repo', config.GITHUB_REPO_NAME)
+        if not repo_name:
+            return {'status': 'error', 'message': 'Missing "repo" query parameter'}, HTTPStatus.BAD_REQUEST
+        github_client = get_github_client(repo_name=repo_name)
+        repo = github_client.get_repo(repo_name)
 
         # Fetch the issue by number from GitHub
         github_issue = repo.get_issue(issue_id)
@@ -58,12 +67,14 @@ def trigger_reply(issue_id: int):
         # Convert PyGithub Issue to our internal Issue model
         issue_model = Issue.from_github_issue(github_issue)
 
-        # Perform semantic search for similar issues
-        similar_issues = search_similar_issues(issue_model, limit_per_field=config.RETRIEVAL_LIMIT)
-        log_similar_issues(similar_issues, issue_model)
+        # Not concurrently with a webhook replying to the same issue
+        with issue_lease(issue_model.github_issue_id):
+            # Perform semantic search for similar issues
+            similar_issues = search_similar_issues(issue_model, limit_per_field=config.RETRIEVAL_LIMIT)
+            log_similar_issues(similar_issues, issue_model)
 
-        # Always send the comment (bypass should_send_comment checks)
-        send_issue_comment(issue_model, similar_issues)
+            # Always send the comment (bypass should_send_comment checks), editing the previous one if any
+            send_issue_comment(issue_model, similar_issues, upsert=True)
 
         return {'status': 'success', 'message': 'Comment posted'}, HTTPStatus.OK
 
@@ -0,0 +1,36 @@
+from http import HTTPStatus
+from flask import Blueprint
+
+from backend.model.tiered_search import get_tier_metrics
+from backend.tool.http_client import get_http_metrics
+from backend.tool.leases import get_lease_metrics
+from backend.tool.priority_lanes import get_lane_metrics
+from backend.tool.resilience import get_resilience_metrics
+
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/http", methods=["GET"])
+def http_metrics():
+    return {'hosts': get_http_metrics()}, HTTPStatus.OK
+
+
+@bp.route("/resilience", methods=["GET"])
+def resilience_metrics():
+    return get_resilience_metrics(), HTTPStatus.OK
+
+
+@bp.route("/lanes", methods=["GET"])
+def lane_metrics():
+    return {'lanes': get_lane_metrics()}, HTTPStatus.OK
+
+
+@bp.route("/search-tiers", methods=["GET"])
+def search_tier_metrics():
+    return get_tier_metrics(), HTTPStatus.OK
+
+
+@bp.route("/leases", methods=["GET"])
+def lease_metrics():
+    return get_lease_metrics(), HTTPStatus.OK
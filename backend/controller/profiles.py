@@ -0,0 +1,34 @@
+from http import HTTPStatus
+from flask import Blueprint, request, send_file
+
+from backend.tool.profiler import PROFILE_HEADER, list_profiles, load_profile, profile_path, token_matches
+
+
+bp = Blueprint("profiles", __name__)
+
+
+@bp.before_request
+def require_profiling_token():
+    if not token_matches(request.headers.get(PROFILE_HEADER)):
+        return {'message': 'Forbidden'}, HTTPStatus.FORBIDDEN
+
+
+@bp.route("", methods=["GET"])
+def profiles():
+    return {'profiles': list_profiles()}, HTTPStatus.OK
+
+
+@bp.route("/<profile_id>", methods=["GET"])
+def profile(profile_id: str):
+    report = load_profile(profile_id)
+    if report is None:
+        return {'message': 'Not Found'}, HTTPStatus.NOT_FOUND
+    return report, HTTPStatus.OK
+
+
+@bp.route("/<profile_id>/pstats", methods=["GET"])
+def profile_pstats(profile_id: str):
+    path = profile_path(profile_id, "prof")
+    if path is None:
+        return {'message': 'Not Found'}, HTTPStatus.NOT_FOUND
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=f"{profile_id}.prof")
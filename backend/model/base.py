@@ -6,6 +6,7 @@ from backend.tool.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Only connect when TiDB is the configured storage backend, the local engine needs no network
 db = TiDBClient.connect(
     host=config.SERVERLESS_CLUSTER_HOST,
     port=config.SERVERLESS_CLUSTER_PORT,
@@ -15,4 +16,4 @@ db = TiDBClient.connect(
     enable_ssl=True,
     pool_recycle=300,
     pool_pre_ping=True,
-)
+) if config.STORAGE_BACKEND == "tidb" else None
@@ -0,0 +1,106 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend import config
+
+# full: search the full-precision vectors directly
+# truncated: first-pass search on Matryoshka-style truncated vectors, exact re-rank on the full ones
+VECTOR_STORAGE_MODES = ("full", "truncated")
+
+# Full vector column -> compact first-pass column
+COMPACT_VECTOR_COLUMNS = {
+    "title_vec": "title_vec_compact",
+    "body_vec": "body_vec_compact",
+}
+
+
+def compact_enabled() -> bool:
+    return config.VECTOR_STORAGE_MODE == "truncated"
+
+
+def compact_columns() -> Dict[str, str]:
+    """
+    Compact columns of the current mode: the compact columns and their indexes only exist in "truncated" mode.
+    """
+    return COMPACT_VECTOR_COLUMNS if compact_enabled() else {}
+
+
+def check_compact_dimensions(model_dimensions: Optional[int]):
+    """
+    Fail at startup when "truncated" mode would not truncate anything.
+
+    Args:
+        model_dimensions: Dimensions of the configured embedding model, None if unknown
+
+    Raises:
+        ValueError: COMPACT_VECTOR_DIMENSIONS is not smaller than the model's dimensions
+    """
+    if compact_enabled() and model_dimensions and config.COMPACT_VECTOR_DIMENSIONS >= model_dimensions:
+        raise ValueError(
+            f"COMPACT_VECTOR_DIMENSIONS ({config.COMPACT_VECTOR_DIMENSIONS}) must be smaller than the "
+            f"{model_dimensions} dimensions of EMBEDDING_MODEL '{config.EMBEDDING_MODEL}' when VECTOR_STORAGE_MODE is \"truncated\""
+        )
+
+
+def compact_vector(vector, dimensions: int = None) -> Optional[list[float]]:
+    """
+    Truncate a vector to its leading dimensions and re-normalize it, so cosine distance
+    on the compact vector approximates the full one (Matryoshka-style).
+    """
+    if vector is None:
+        return None
+    dimensions = dimensions or config.COMPACT_VECTOR_DIMENSIONS
+    truncated = np.asarray(vector, dtype=np.float32)[:dimensions]
+    norm = np.linalg.norm(truncated)
+    if norm > 0:
+        truncated = truncated / norm
+    return truncated.tolist()
+
+
+def quantize_float16(vector) -> np.ndarray:
+    """
+    Round-trip a vector through float16, as it would be stored in a half-precision column.
+    """
+    return np.asarray(vector, dtype=np.float32).astype(np.float16).astype(np.float32)
+
+
+def quantize_int8(vector) -> np.ndarray:
+    """
+    Round-trip a vector through symmetric per-vector int8 quantization.
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    scale = float(np.max(np.abs(vector))) / 127 or 1.0
+    return np.round(vector / scale).clip(-127, 127).astype(np.int8).astype(np.float32) * scale
+
+
+def cosine_distance(a, b) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denominator = np.linalg.norm(a) * np.linalg.norm(b)
+    if denominator == 0:
+        return 1.0
+    return float(1 - np.dot(a, b) / denominator)
+
+
+def cosine_distances(matrix, vector) -> np.ndarray:
+    """
+    Cosine distance between every row of matrix and vector, 1.0 where either is all zeros.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    vector = np.asarray(vector, dtype=np.float32)
+    denominators = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    similarities = np.divide(matrix @ vector, denominators, out=np.zeros(len(matrix), dtype=np.float32), where=denominators > 0)
+    return 1 - similarities
+
+
+def add_compact_vectors(values: Dict) -> Dict:
+    """
+    Fill the compact columns for every full vector present in values (an Issue field dict).
+    """
+    if not compact_enabled():
+        return values
+    for full_column, compact_column in COMPACT_VECTOR_COLUMNS.items():
+        if full_column in values:
+            values[compact_column] = compact_vector(values[full_column])
+    return values
@@ -0,0 +1,363 @@
+import re
+import threading
+from typing import List, Optional, Tuple
+
+from pydantic import Field
+from pytidb.embeddings import EmbeddingFunction
+from pytidb.embeddings.litellm import get_embeddings
+
+from backend import config
+from backend.model.compact_vectors import COMPACT_VECTOR_COLUMNS, add_compact_vectors, compact_enabled, compact_vector
+from backend.tool.embedding_batcher import get_embedding_batcher
+from backend.tool.http_client import call_with_retries, install_litellm_transport, is_transient_error
+from backend.tool.local_embedding import get_local_embedding_model, is_local_model
+from backend.tool.logger import get_logger
+from backend.tool.resilience import bounded_timeout, get_circuit_breaker, hedged_call
+
+logger = get_logger(__name__)
+
+# Vector columns filled by the embedding migration target model, keyed by the columns they replace
+MIGRATION_VECTOR_COLUMNS = {
+    "title_vec": "title_vec_next",
+    "body_vec": "body_vec_next",
+}
+
+# Stored by Issue.from_github_issue / from_webhook_payload when an issue has no body
+EMPTY_BODY_PLACEHOLDER = "N/A"
+
+# Rough chars-per-token ratio used to estimate token counts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+FENCED_BLOCK_RE = re.compile(r"^(?P<fence>```|~~~)[^\n]*\n(?P<content>.*?)^(?P=fence)[ \t]*$", re.DOTALL | re.MULTILINE)
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+\S")
+BOILERPLATE_LINE_RES = [
+    re.compile(r"^\s*_No response_\s*$"),  # Empty issue form field
+    re.compile(r"^\s*[-*]\s+\[[ xX]\]\s+"),  # Template checklists
+]
+PLACEHOLDER_TEXTS = {"", EMPTY_BODY_PLACEHOLDER.lower(), "none", "null", "n/a.", "-"}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in the text.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def is_placeholder_text(text: Optional[str]) -> bool:
+    """
+    Check whether the text is empty or a placeholder that carries no meaning.
+    """
+    if text is None:
+        return True
+    return text.strip().lower() in PLACEHOLDER_TEXTS
+
+
+def _truncate_fenced_blocks(text: str, max_lines: int) -> str:
+    """
+    Keep only the head and tail of fenced code blocks (usually pasted logs) longer than max_lines.
+    """
+    def replace(match):
+        lines = match.group("content").splitlines()
+        if len(lines) <= max_lines:
+            return match.group(0)
+        head = lines[:max_lines // 2]
+        tail = lines[-(max_lines - len(head)):] if max_lines > len(head) else []
+        fence = match.group("fence")
+        return "\n".join([fence, *head, f"... ({len(lines) - len(head) - len(tail)} lines omitted) ...", *tail, fence])
+
+    return FENCED_BLOCK_RE.sub(replace, text)
+
+
+def _strip_template_boilerplate(text: str) -> str:
+    """
+    Remove issue template boilerplate: empty form answers, checklists and headings of empty sections.
+    """
+    lines = [
+        line for line in text.splitlines()
+        if not any(pattern.match(line) for pattern in BOILERPLATE_LINE_RES)
+    ]
+
+    # Drop headings whose section has no content left
+    kept = []
+    for i, line in enumerate(lines):
+        if HEADING_RE.match(line):
+            section_has_content = False
+            for next_line in lines[i + 1:]:
+                if HEADING_RE.match(next_line):
+                    break
+                if next_line.strip():
+                    section_has_content = True
+                    break
+            if not section_has_content:
+                continue
+        kept.append(line)
+
+    return "\n".join(kept)
+
+
+def truncate_to_token_budget(text: str, token_budget: int) -> str:
+    """
+    Truncate the text to the token budget, cutting at a whitespace boundary when possible.
+    """
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    boundary = truncated.rfind(" ")
+    if boundary > max_chars // 2:
+        truncated = truncated[:boundary]
+    return truncated
+
+
+def prepare_embedding_text(text: Optional[str], token_budget: Optional[int] = None) -> Optional[str]:
+    """
+    Compact text before embedding it. The original text is stored untouched; only the
+    embedding input is affected.
+
+    Args:
+        text: Raw title or body text
+        token_budget: Maximum number of (estimated) tokens to send to the provider
+
+    Returns:
+        Compacted text, or None if the text is empty or a placeholder and should not be embedded
+    """
+    if is_placeholder_text(text):
+        return None
+
+    text = HTML_COMMENT_RE.sub("", text)
+    text = _truncate_fenced_blocks(text, config.EMBEDDING_MAX_FENCED_LINES)
+    text = _strip_template_boilerplate(text)
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    if is_placeholder_text(text):
+        return None
+
+    if token_budget:
+        text = truncate_to_token_budget(text, token_budget)
+
+    return text
+
+
+class PreprocessedEmbeddingFunction(EmbeddingFunction):
+    """
+    LiteLLM embedding function that compacts its input with prepare_embedding_text.
+    Placeholder or empty text is skipped entirely and gets a None embedding.
+    Provider calls from concurrent callers are micro-batched (see EmbeddingBatcher).
+    Local models ("local/<path>", "hashing/<dimensions>") run in-process instead.
+    """
+    token_budget: Optional[int] = Field(None, description="Maximum number of tokens embedded per text.")
+
+    def prepare_text(self, text: Optional[str]) -> Optional[str]:
+        return prepare_embedding_text(text, self.token_budget)
+
+    def embed_prepared(self, texts: List[Optional[str]]) -> List[Optional[list[float]]]:
+        """
+        Embed already prepared texts, keeping None for texts that should not be embedded.
+        """
+        to_embed = [text for text in texts if text is not None]
+        if not to_embed:
+            return [None] * len(texts)
+
+        embeddings = iter(self._embed_texts(to_embed))
+        return [next(embeddings) if text is not None else None for text in texts]
+
+    def get_query_embedding(self, query: str) -> Optional[list[float]]:
+        return self.embed_prepared([self.prepare_text(query)])[0]
+
+    def get_source_embedding(self, source: str) -> Optional[list[float]]:
+        return self.embed_prepared([self.prepare_text(source)])[0]
+
+    def get_source_embeddings(self, sources: List[str]) -> List[Optional[list[float]]]:
+        return self.embed_prepared([self.prepare_text(source) for source in sources])
+
+    def _embed_texts(self, texts: List[str]) -> List[list[float]]:
+        if not config.EMBEDDING_BATCH_ENABLED:
+            return self._call_provider(texts)
+
+        # Functions of the same model with other dimensions or another endpoint must not share batches
+        batcher = get_embedding_batcher(
+            (self.model_name, self.dimensions, self.api_base),
+            self._call_provider,
+            name=self.model_name,
+            max_batch_size=config.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=config.EMBEDDING_BATCH_MAX_WAIT_MS,
+            max_concurrency=config.EMBEDDING_BATCH_CONCURRENCY,
+        )
+        return batcher.embed(texts)
+
+    def _request(self, texts: List[str], model_name: str, api_base: Optional[str]) -> List[list[float]]:
+        breaker = get_circuit_breaker(f"embedding:{model_name}")
+        # Only transient errors are retried and open the circuit, a rejected input fails alone
+        return call_with_retries(
+            lambda: breaker.call(lambda: get_embeddings(
+                api_key=self.api_key,
+                api_base=api_base,
+                model_name=model_name,
+                dimensions=self.dimensions,
+                timeout=bounded_timeout(self.timeout, "embedding"),
+                input=texts,
+            ), is_failure=is_transient_error),
+            description=f"Embedding request to {model_name}",
+        )
+
+    def _call_provider(self, texts: List[str]) -> List[list[float]]:
+        if is_local_model(self.model_name):
+            # In-process inference: no network, so no breaker, retries or hedging
+            model = get_local_embedding_model(
+                self.model_name,
+                threads=config.EMBEDDING_LOCAL_THREADS,
+                batch_size=config.EMBEDDING_LOCAL_BATCH_SIZE,
+                device=config.EMBEDDING_LOCAL_DEVICE,
+            )
+            return model.encode(texts)
+
+        if not config.EMBEDDING_HEDGE_MODEL or self.model_name != config.EMBEDDING_MODEL:
+            return self._request(texts, self.model_name, self.api_base)
+
+        # Race slow requests against the secondary provider of the same model
+        return hedged_call(
+            f"embedding:{self.model_name}",
+            lambda: self._request(texts, self.model_name, self.api_base),
+            lambda: self._request(texts, config.EMBEDDING_HEDGE_MODEL, config.EMBEDDING_HEDGE_API_BASE),
+            hedge_after=config.EMBEDDING_HEDGE_AFTER_MS / 1000,
+        )
+
+
+# Embedding providers reuse the pooled keep-alive httpx client
+install_litellm_transport()
+
+text_embedding_function = PreprocessedEmbeddingFunction(
+    config.EMBEDDING_MODEL,
+    timeout=config.EMBEDDING_TIMEOUT
+)
+
+# Per-field copies sharing the same model; model_copy skips the dimension probe in __init__
+title_embedding_function = text_embedding_function.model_copy(
+    update={"token_budget": config.EMBEDDING_TITLE_TOKEN_BUDGET}
+)
+body_embedding_function = text_embedding_function.model_copy(
+    update={"token_budget": config.EMBEDDING_BODY_TOKEN_BUDGET}
+)
+
+
+_migration_functions = None
+_migration_lock = threading.Lock()
+
+
+def get_migration_embedding_functions() -> Optional[Tuple[PreprocessedEmbeddingFunction, PreprocessedEmbeddingFunction, PreprocessedEmbeddingFunction]]:
+    """
+    Get the (text, title, body) embedding functions of EMBEDDING_MIGRATION_MODEL, created on
+    first use. None if no migration is configured.
+    """
+    global _migration_functions
+    if not config.EMBEDDING_MIGRATION_MODEL:
+        return None
+    if _migration_functions is None:
+        with _migration_lock:
+            if _migration_functions is None:
+                function = PreprocessedEmbeddingFunction(
+                    config.EMBEDDING_MIGRATION_MODEL,
+                    dimensions=config.EMBEDDING_MIGRATION_DIMENSIONS,
+                    timeout=config.EMBEDDING_TIMEOUT,
+                )
+                _migration_functions = (
+                    function,
+                    function.model_copy(update={"token_budget": config.EMBEDDING_TITLE_TOKEN_BUDGET}),
+                    function.model_copy(update={"token_budget": config.EMBEDDING_BODY_TOKEN_BUDGET}),
+                )
+    return _migration_functions
+
+
+def embed_migration_fields(values: dict) -> dict:
+    """
+    Dual-write during an embedding migration: add the migration model's vectors of the title
+    and/or body in values. A failing provider never fails the write, the background
+    re-embedding job fills whatever is left empty.
+
+    Args:
+        values: Dict of Issue fields, updated in place
+    """
+    functions = get_migration_embedding_functions()
+    sources = [source_field for source_field in ("title", "body") if source_field in values]
+    if functions is None or not sources:
+        return values
+
+    text_function, title_function, body_function = functions
+    prepare = {"title": title_function.prepare_text, "body": body_function.prepare_text}
+    try:
+        vectors = text_function.embed_prepared([prepare[source_field](values[source_field]) for source_field in sources])
+    except Exception as e:
+        logger.warning(f"Migration embedding with {config.EMBEDDING_MIGRATION_MODEL} failed, left to the re-embedding job: {str(e)}")
+        # Clear the stale vectors of changed text so the job picks them up
+        vectors = [None] * len(sources)
+    for source_field, vector in zip(sources, vectors):
+        values[MIGRATION_VECTOR_COLUMNS[f"{source_field}_vec"]] = vector
+    return values
+
+
+def embed_issue(issue):
+    """
+    Compute title_vec and body_vec of an issue together, so both texts share one
+    provider request instead of the two sequential calls auto-embedding would make.
+
+    Args:
+        issue: Issue model instance, updated in place
+    """
+    title_text = title_embedding_function.prepare_text(issue.title)
+    body_text = body_embedding_function.prepare_text(issue.body)
+    issue.title_vec, issue.body_vec = text_embedding_function.embed_prepared([title_text, body_text])
+    if compact_enabled():
+        issue.title_vec_compact = compact_vector(issue.title_vec)
+        issue.body_vec_compact = compact_vector(issue.body_vec)
+
+    migration_vectors = embed_migration_fields({"title": issue.title, "body": issue.body})
+    issue.title_vec_next = migration_vectors.get("title_vec_next")
+    issue.body_vec_next = migration_vectors.get("body_vec_next")
+    return issue
+
+
+def embed_changed_fields(changed_fields: dict) -> dict:
+    """
+    Add the vectors of a changed title and/or body to an update dict, embedding both in
+    one provider request and keeping the compact columns in sync.
+
+    Args:
+        changed_fields: Dict of changed Issue fields, updated in place
+    """
+    sources = [
+        (source_field, vector_field, embed_fn)
+        for source_field, vector_field, embed_fn in (
+            ("title", "title_vec", title_embedding_function),
+            ("body", "body_vec", body_embedding_function),
+        )
+        if source_field in changed_fields
+    ]
+    if not sources:
+        return changed_fields
+
+    texts = [embed_fn.prepare_text(changed_fields[source_field]) for source_field, _, embed_fn in sources]
+    vectors = text_embedding_function.embed_prepared(texts)
+    for (_, vector_field, _), vector in zip(sources, vectors):
+        changed_fields[vector_field] = vector
+    embed_migration_fields(changed_fields)
+    return add_compact_vectors(changed_fields)
+
+
+def defer_changed_fields_embedding(changed_fields: dict) -> dict:
+    """
+    Store a changed title and/or body without vectors, for writes that could not embed in
+    time. The explicit None values also keep TiDB from auto-embedding on update;
+    backend.model.init_database.fill_missing_vectors embeds them later.
+
+    Args:
+        changed_fields: Dict of changed Issue fields, updated in place
+    """
+    for source_field in ("title", "body"):
+        if source_field in changed_fields:
+            vector_field = f"{source_field}_vec"
+            changed_fields[vector_field] = None
+            changed_fields[COMPACT_VECTOR_COLUMNS[vector_field]] = None
+            changed_fields[MIGRATION_VECTOR_COLUMNS[vector_field]] = None
+    return changed_fields
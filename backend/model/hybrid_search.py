@@ -0,0 +1,122 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backend import config
+from backend.model.issue import Issue
+from backend.model.store import IssueStore
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Set on results containing one of the issue's error lines verbatim
+EXACT_MATCH_FLAG = "_exact_match"
+
+# Largest cosine distance: exact matches are scored by distance without being dropped by the threshold
+MAX_COSINE_DISTANCE = 2.0
+
+TERM_PATTERN = re.compile(r"\w{2,}")
+MAX_LEXICAL_TERMS = 32
+
+# Lines carrying an error string, panic or stack trace header worth matching verbatim
+ERROR_LINE_RE = re.compile(r"\b(panic|error|exception|fatal|traceback|failed|failure)\b", re.IGNORECASE)
+MAX_ERROR_SIGNATURES = 5
+MAX_ERROR_SIGNATURE_CHARS = 200
+
+
+def lexical_terms(text: Optional[str]) -> List[str]:
+    """
+    Distinct lowercase words of a text, in order of appearance, at most MAX_LEXICAL_TERMS.
+    """
+    terms = dict.fromkeys(term.lower() for term in TERM_PATTERN.findall(text or ""))
+    return list(terms)[:MAX_LEXICAL_TERMS]
+
+
+def extract_error_signatures(text: Optional[str], min_chars: int = config.HYBRID_EXACT_MATCH_MIN_CHARS) -> List[str]:
+    """
+    Lines of a text that look like error messages, long enough to identify an error when
+    another issue contains them verbatim.
+    """
+    signatures = []
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())[:MAX_ERROR_SIGNATURE_CHARS]
+        if len(line) >= min_chars and ERROR_LINE_RE.search(line) and line not in signatures:
+            signatures.append(line)
+            if len(signatures) == MAX_ERROR_SIGNATURES:
+                break
+    return signatures
+
+
+def _contains_signature(row: Dict, signatures: List[str]) -> bool:
+    text = " ".join(f"{row.get('title') or ''}\n{row.get('body') or ''}".split()).lower()
+    return any(signature.lower() in text for signature in signatures)
+
+
+def lexical_prefilter(store: IssueStore, issue: Issue, limit: int = config.HYBRID_LEXICAL_LIMIT, **filters) -> Tuple[List[Dict], List[int]]:
+    """
+    Full-text search with the title and error lines of an issue.
+
+    Args:
+        store: Issue store to search
+        issue: The issue to find similar issues for
+        limit: Maximum number of full-text hits
+        **filters: Metadata filters of the search
+
+    Returns:
+        (full-text hits best first, IDs of the hits containing one of the issue's error lines verbatim).
+        Titles are summaries, often generic, so only error lines of the body count.
+    """
+    signatures = extract_error_signatures(issue.body)
+    terms = lexical_terms(" ".join([issue.title or "", *signatures]))
+    if not terms:
+        return [], []
+
+    hits = store.lexical_search(" ".join(terms), limit, **filters)
+    exact_match_ids = []
+    if signatures:
+        exact_match_ids = [hit["github_issue_id"] for hit in hits if _contains_signature(hit, signatures)]
+    return hits, exact_match_ids
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = config.HYBRID_RRF_K) -> Dict[int, float]:
+    """
+    Fuse rankings of issue IDs (best first): each ID scores sum(1 / (k + rank)) over the
+    rankings it appears in.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, issue_id in enumerate(ranking, 1):
+            scores[issue_id] = scores.get(issue_id, 0.0) + 1 / (k + rank)
+    return scores
+
+
+def fuse_with_lexical(vector_results: List[Dict], lexical_hits: List[Dict], limit: int, exact_match_ids: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Fuse vector search results and full-text hits by reciprocal rank. Exact error line
+    matches are a third ranking, so they rank above results only one of the others found.
+
+    Args:
+        vector_results: Rows with '_distance' (within the distance threshold), including the
+            full-text hits scored by distance
+        lexical_hits: Full-text hits, best first
+        limit: Maximum number of results
+        exact_match_ids: IDs of the full-text hits sharing an error line with the issue
+
+    Returns:
+        The vector result rows with '_rrf_score' (and EXACT_MATCH_FLAG on exact matches),
+        open issues first and closed ones last, each group by fused score
+    """
+    exact_match_ids = exact_match_ids or []
+    by_distance = sorted(vector_results, key=lambda row: row["_distance"])
+    scores = reciprocal_rank_fusion([
+        [row["github_issue_id"] for row in by_distance],
+        [hit["github_issue_id"] for hit in lexical_hits],
+        exact_match_ids,
+    ])
+    results = []
+    for row in by_distance:
+        row["_rrf_score"] = scores[row["github_issue_id"]]
+        if row["github_issue_id"] in exact_match_ids:
+            row[EXACT_MATCH_FLAG] = True
+        results.append(row)
+    results.sort(key=lambda r: (r["state"] != "open", r["state"] == "closed", -r["_rrf_score"]))
+    return results[:limit]
@@ -1,39 +1,163 @@
 #!/usr/bin/env python3
 
 import sys
-from datetime import datetime
-from backend.model.issue import ISSUE_TABLE_NAME, Issue
-from backend.model.base import db
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+from backend.model.issue import Issue
+from backend.model.embedding import (
+    EMPTY_BODY_PLACEHOLDER,
+    MIGRATION_VECTOR_COLUMNS,
+    body_embedding_function,
+    embed_changed_fields,
+    embed_issue,
+    get_migration_embedding_functions,
+    text_embedding_function,
+    title_embedding_function,
+)
+from backend.model.store import get_issue_store
+from backend.model.compact_vectors import COMPACT_VECTOR_COLUMNS, add_compact_vectors, compact_columns, compact_enabled, compact_vector
+from backend.tool import leases
 from backend.tool.logger import get_logger
-from backend.tool.get_issues import ISSUES_PER_PAGE, list_all_issues, get_issues_page, get_issues_since
+from backend.tool.staged_pipeline import PipelineStage, StagedPipeline
+from backend.tool.get_issues import ISSUES_PER_PAGE, is_pull_request, list_all_issues, get_issues_page, get_issues_since, get_repo_names
+from backend.tool.graphql_issues import iter_repo_issue_nodes
 from backend import config
 
 logger = get_logger(__name__)
 
-table_models = [
-    (ISSUE_TABLE_NAME, Issue),
-]
-
 # Fields that should not be updated to avoid overwriting vector embeddings or primary keys
-PROTECTED_FIELDS = {'github_issue_id', 'title_vec', 'body_vec'}
+# (the fingerprint is not diffed, it is written alongside any changed field; the reply ID is written by send_issue_comment)
+PROTECTED_FIELDS = {
+    'github_issue_id', 'title_vec', 'body_vec', *COMPACT_VECTOR_COLUMNS.values(), *MIGRATION_VECTOR_COLUMNS.values(), 'content_fingerprint',
+    'reply_comment_id',
+}
+
+# Fields compared by the diff, the only ones read back when the fingerprint differs
+DIFF_FIELDS = [field_name for field_name in Issue.model_fields if field_name not in PROTECTED_FIELDS]
 
 def init_tables():
-    """Initialize database tables if they don't exist."""
-    for table_name, table_model in table_models:
-        if not db.has_table(table_name):
-            table = db.create_table(schema=table_model)
-            if table:
-                logger.info(f"Table {table_name} created")
-        else:
-            logger.info(f"Table {table_name} already exists")
+    """Create the storage of the configured backend if it doesn't exist and apply schema migrations."""
+    get_issue_store().init_schema()
+
+
+def clear_placeholder_vectors():
+    """
+    Drop body vectors that were computed from the empty-body placeholder before
+    placeholder text was skipped, so they no longer match each other in searches.
+    The compact and migration copies derived from the same text are cleared with them.
+    """
+    body_vec_columns = ["body_vec", compact_columns().get("body_vec"), MIGRATION_VECTOR_COLUMNS["body_vec"]]
+    get_issue_store().update(
+        {column: None for column in body_vec_columns if column},
+        {"body": EMPTY_BODY_PLACEHOLDER},
+    )
+    logger.info("Cleared body vectors of issues without a body")
+
+
+def remove_pull_requests(batch_size: int = 1000):
+    """
+    Delete pull requests stored as issues before ingestion skipped them. GitHub's issues
+    listing returns them too; their html_url points to /pull/ instead of /issues/.
+    """
+    store = get_issue_store()
+    removed_count = 0
+    after_id = None
+    
+    while True:
+        rows = store.scan(after_id, batch_size, fields=["github_issue_id", "html_url"])
+        if not rows:
+            break
+        after_id = rows[-1]["github_issue_id"]
+        
+        pull_request_ids = [row["github_issue_id"] for row in rows if "/pull/" in (row["html_url"] or "")]
+        if pull_request_ids:
+            store.delete({"github_issue_id": {"$in": pull_request_ids}})
+            removed_count += len(pull_request_ids)
+    
+    if removed_count:
+        logger.info(f"Removed {removed_count} pull requests stored as issues")
 
 
-def diff_and_get_changed_fields(existing_issue: Issue, new_issue: Issue) -> dict:
+def fill_compact_vectors(batch_size: int = 500):
     """
-    Compare existing issue with new issue and return only changed fields.
+    Derive the compact first-pass vectors of rows stored before "truncated" mode was enabled.
+    No embedding calls are made, the compact vectors are computed from the stored full vectors.
+    """
+    store = get_issue_store()
+    filled_count = 0
+    
+    for full_column, compact_column in COMPACT_VECTOR_COLUMNS.items():
+        while True:
+            rows = store.query(
+                filters={compact_column: None, full_column: {"$ne": None}},
+                limit=batch_size,
+            )
+            if not rows:
+                break
+            
+            for row in rows:
+                store.update(
+                    {compact_column: compact_vector(row[full_column])},
+                    {"github_issue_id": row["github_issue_id"]}
+                )
+            filled_count += len(rows)
+    
+    logger.info(f"Filled {filled_count} compact vectors")
+
+
+def fill_missing_vectors(batch_size: int = 100):
+    """
+    Embed the titles and bodies stored without vectors, e.g. by webhooks that ran out of
+    time budget or found the embedding provider's circuit open. During an embedding
+    migration the next vector columns are filled too, with the migration model: once
+    searches switched to them, an issue without them can no longer be found. Placeholder
+    texts are never embedded and stay without vectors.
+    """
+    store = get_issue_store()
+    filled_count = 0
+    
+    # (text function, field functions, vector column of each source field)
+    vector_sets = [(
+        text_embedding_function,
+        {"title": title_embedding_function, "body": body_embedding_function},
+        {"title": "title_vec", "body": "body_vec"},
+    )]
+    migration_functions = get_migration_embedding_functions()
+    if migration_functions is not None:
+        migration_text_function, migration_title_function, migration_body_function = migration_functions
+        vector_sets.append((
+            migration_text_function,
+            {"title": migration_title_function, "body": migration_body_function},
+            {source_field: MIGRATION_VECTOR_COLUMNS[f"{source_field}_vec"] for source_field in ("title", "body")},
+        ))
+    
+    for text_function, field_functions, vector_columns in vector_sets:
+        for source_field in ("title", "body"):
+            vector_field = vector_columns[source_field]
+            after_id = None
+            while True:
+                rows = store.scan(after_id, batch_size, fields=["github_issue_id", source_field], filters={vector_field: None})
+                if not rows:
+                    break
+                after_id = rows[-1]["github_issue_id"]
+                
+                texts = [field_functions[source_field].prepare_text(row[source_field]) for row in rows]
+                vectors = text_function.embed_prepared(texts)
+                for row, text, vector in zip(rows, texts, vectors):
+                    if text is None:
+                        continue
+                    store.update(add_compact_vectors({vector_field: vector}), {"github_issue_id": row["github_issue_id"]})
+                    filled_count += 1
+    
+    logger.info(f"Filled {filled_count} missing vectors")
+
+
+def diff_and_get_changed_fields(existing_values: dict, new_issue: Issue) -> dict:
+    """
+    Compare the stored fields of an issue with the new issue and return only changed fields.
     
     Args:
-        existing_issue: Existing Issue model instance from database
+        existing_values: Stored values of DIFF_FIELDS (see IssueStore.get_fields)
         new_issue: New Issue model instance
         
     Returns:
@@ -41,13 +165,9 @@ def diff_and_get_changed_fields(existing_issue: Issue, new_issue: Issue) -> dict
     """
     changed_fields = {}
     
-    for field_name in Issue.model_fields:
-        # Skip protected fields
-        if field_name in PROTECTED_FIELDS:
-            continue
-            
+    for field_name in DIFF_FIELDS:
         new_value = getattr(new_issue, field_name)
-        existing_value = getattr(existing_issue, field_name)
+        existing_value = existing_values.get(field_name)
         
         # Compare values - handle None values and type differences
         if _values_are_different(existing_value, new_value):
@@ -57,6 +177,59 @@ def diff_and_get_changed_fields(existing_issue: Issue, new_issue: Issue) -> dict
     return changed_fields
 
 
+def load_changed_fields(issue: Issue, store=None) -> Optional[dict]:
+    """
+    Find what an incoming issue changes in the stored one without reading vectors or
+    unneeded columns: the stored fingerprint is read first, and the diff fields only
+    when it differs from the incoming one.
+    
+    Args:
+        issue: Incoming Issue model instance, with content_fingerprint set
+        store: IssueStore to read from, defaults to the configured one
+        
+    Returns:
+        None if the issue is not stored, {} if it is unchanged or older than the stored one
+        (an event processed out of order), otherwise the changed fields including the new
+        content_fingerprint
+    """
+    store = store or get_issue_store()
+    
+    stored = store.get_fields(issue.github_issue_id, ['content_fingerprint'])
+    if stored is None:
+        return None
+    if stored['content_fingerprint'] == issue.content_fingerprint:
+        return {}
+    
+    existing_values = store.get_fields(issue.github_issue_id, DIFF_FIELDS)
+    if existing_values is None:
+        return None
+    
+    if is_older(issue.updated_at, existing_values.get('updated_at')):
+        logger.info(
+            f"Skipping stale write of issue #{issue.github_issue_number}: updated at {issue.updated_at}, "
+            f"stored {existing_values['updated_at']}"
+        )
+        return {}
+    
+    changed_fields = diff_and_get_changed_fields(existing_values, issue)
+    # Also stores the fingerprint of rows saved before the column existed
+    changed_fields['content_fingerprint'] = issue.content_fingerprint
+    return changed_fields
+
+
+def is_older(updated_at: Optional[datetime], stored_updated_at: Optional[datetime]) -> bool:
+    """
+    Whether an incoming updated_at is strictly older than the stored one. Naive datetimes
+    (as read back from storage) are UTC.
+    """
+    if updated_at is None or stored_updated_at is None:
+        return False
+    updated_at, stored_updated_at = (
+        value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (updated_at, stored_updated_at)
+    )
+    return updated_at < stored_updated_at
+
+
 def _values_are_different(existing_value, new_value) -> bool:
     """
     Helper function to compare two values, handling None and type differences.
@@ -88,6 +261,50 @@ def _values_are_different(existing_value, new_value) -> bool:
     return existing_value != new_value
 
 
+def prepare_issue_write(issue: Issue, store=None) -> Optional[Tuple[Issue, Optional[dict]]]:
+    """
+    Diff an issue against the stored one and compute the embeddings the write needs.
+    
+    Args:
+        issue: Issue model instance
+        store: IssueStore to read from, defaults to the configured one
+        
+    Returns:
+        None if the stored issue is unchanged, otherwise (issue, changed_fields) for write_issue,
+        changed_fields being None when the issue is new
+    """
+    store = store or get_issue_store()
+    issue.content_fingerprint = issue.compute_content_fingerprint()
+    
+    # Compare with the stored issue by fingerprint, reading the diff fields only if it changed
+    changed_fields = load_changed_fields(issue, store)
+    
+    if changed_fields is None:
+        embed_issue(issue)
+        return issue, None
+    
+    if not changed_fields:
+        logger.debug(f"No changes detected for issue #{issue.github_issue_number}, skipping update")
+        return None
+    
+    logger.debug(f"Changed fields of issue #{issue.github_issue_number}: {list(changed_fields.keys())}")
+    embed_changed_fields(changed_fields)
+    return issue, changed_fields
+
+
+def write_issue(issue: Issue, changed_fields: Optional[dict], store=None):
+    """
+    Insert a new issue, or update the changed fields of a stored one (see prepare_issue_write).
+    """
+    store = store or get_issue_store()
+    if changed_fields is None:
+        store.insert(issue)
+        logger.debug(f"Inserted issue #{issue.github_issue_number}")
+    else:
+        store.update(changed_fields, {"github_issue_id": issue.github_issue_id})
+        logger.debug(f"Updated {len(changed_fields)} changed fields of issue #{issue.github_issue_number}")
+
+
 def save_issue_to_database(issue: Issue):
     """
     Save or update issue in database using proper upsert logic with diff optimization.
@@ -95,133 +312,169 @@ def save_issue_to_database(issue: Issue):
     Args:
         issue: Issue model instance
     """
-    table = db.open_table(ISSUE_TABLE_NAME)
-    
     try:
-        # Try to get existing issue by github_issue_id
-        existing_issue = table.get(issue.github_issue_id)
-        
-        if existing_issue:
-            # Update existing issue with diff optimization
-            logger.info(f"Checking for changes in issue #{issue.github_issue_number}: {issue.title}")
-            
-            # Get only changed fields
-            changed_fields = diff_and_get_changed_fields(existing_issue, issue)
-            
-            if changed_fields:
-                logger.info(f"Updating {len(changed_fields)} changed fields for issue #{issue.github_issue_number}")
-                logger.debug(f"Changed fields: {list(changed_fields.keys())}")
-                
-                table.update(
-                    changed_fields,
-                    {"github_issue_id": issue.github_issue_id}
-                )
-                logger.info(f"Updated issue #{issue.github_issue_number} successfully")
-            else:
+        with leases.issue_lease(issue.github_issue_id):
+            write = prepare_issue_write(issue)
+            if write is None:
                 logger.info(f"No changes detected for issue #{issue.github_issue_number}, skipping update")
-        else:
-            # Insert new issue
-            logger.info(f"Inserting new issue #{issue.github_issue_number}: {issue.title}")
-            table.insert(issue)
-            logger.info(f"Inserted issue #{issue.github_issue_number} successfully")
-            
+                return
+            write_issue(*write)
+        logger.info(f"Saved issue #{issue.github_issue_number} successfully")
     except Exception as e:
         logger.error(f"Error saving issue #{issue.github_issue_number}: {str(e)}")
         raise
 
 
-def fetch_and_save_all_issues(since_datetime=None):
+def iter_repo_issues(repo_name: str, since_datetime=None) -> Iterator:
     """
-    Fetch all issues from GitHub repository and save them to database using since-based pagination.
-    This function is idempotent - can be run multiple times safely.
+    Iterate over all issues of a GitHub repository (PyGithub Issue objects) using since-based
+    pagination, one page in memory at a time.
     
     Args:
+        repo_name: Repository name (e.g., "owner/repo")
         since_datetime: Optional datetime to start fetching from. If None, starts from beginning.
     """
-    if not config.GITHUB_REPO_NAME:
-        raise ValueError("GITHUB_REPO_NAME is not configured")
-    
-    if since_datetime:
-        logger.info(f"Fetching all issues from repository: {config.GITHUB_REPO_NAME} using since-based pagination (starting from: {since_datetime})")
-    else:
-        logger.info(f"Fetching all issues from repository: {config.GITHUB_REPO_NAME} using since-based pagination")
+    current_since_datetime = since_datetime
+    batch_num = 0
     
-    try:
-        # Process issues using since-based pagination
-        processed_count = 0
-        error_count = 0
-        batch_num = 0
-        current_since_datetime = since_datetime  # Use the provided starting datetime
+    while True:
+        batch_num += 1
+        logger.debug(f"Fetching batch {batch_num} of {repo_name} (since: {current_since_datetime})")
         
-        while True:
-            batch_num += 1
-            logger.info(f"Processing batch {batch_num} (since: {current_since_datetime})")
-            
-            try:
-                # Get issues since the last datetime
-                issues_paginated = get_issues_since(
-                    config.GITHUB_REPO_NAME, 
-                    state="all", 
-                    since=current_since_datetime
-                )
-                
-                # Convert to list to get the batch (GitHub's per_page default is usually 30-100)
-                batch_issues = list(issues_paginated[:ISSUES_PER_PAGE])
-                
-                # If no issues in this batch, we're done
-                if not batch_issues:
-                    logger.info(f"No more issues found in batch {batch_num}, stopping")
-                    break
-                
-                logger.info(f"Processing {len(batch_issues)} issues from batch {batch_num}")
-                
-                # Track the latest updated_at time for next iteration
-                latest_updated_at = None
-                
-                # Process each issue in the current batch
-                for github_issue in batch_issues:
-                    try:
-                        # Convert PyGithub Issue to our Issue model
-                        issue = Issue.from_github_issue(github_issue)
-                        
-                        # Save to database
-                        save_issue_to_database(issue)
-                        processed_count += 1
-                        
-                        # Track the latest updated_at for pagination
-                        if latest_updated_at is None or github_issue.updated_at > latest_updated_at:
-                            latest_updated_at = github_issue.updated_at
-                        
-                        logger.debug(f"Processed issue #{issue.github_issue_number}: {issue.title}")
-                        
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Error processing issue #{github_issue.number}: {str(e)}")
-                        continue
-                
-                # Update current_since_datetime for next iteration
-                # Add 1 second to avoid getting the same issue again
-                if latest_updated_at:
-                    import datetime
-                    current_since_datetime = latest_updated_at + datetime.timedelta(seconds=1)
-                
-                logger.info(f"Completed batch {batch_num}. Total processed so far: {processed_count} issues")
-                logger.info(f"Next batch will start from: {current_since_datetime}")
-                
-            except Exception as e:
-                logger.error(f"Error processing batch {batch_num}: {str(e)}")
-                # For since-based pagination, we should stop on error as we can't continue safely
-                logger.error("Stopping due to batch processing error")
-                break
+        # Get issues since the last datetime
+        issues_paginated = get_issues_since(repo_name, state="all", since=current_since_datetime)
+        batch_issues = list(issues_paginated[:ISSUES_PER_PAGE])
         
-        logger.info(f"Issue processing completed: {processed_count} successful, {error_count} errors across {batch_num} batches")
+        # If no issues in this batch, we're done
+        if not batch_issues:
+            logger.info(f"No more issues found in {repo_name} after {batch_num - 1} batches")
+            return
         
-        if processed_count == 0:
-            logger.warning("No issues were processed. This might indicate a permissions or configuration issue.")
+        yield from batch_issues
         
-    except Exception as e:
-        logger.error(f"Error fetching issues from GitHub: {str(e)}")
-        raise
+        # Add 1 second to the latest updated_at to avoid getting the same issue again
+        latest_updated_at = max(github_issue.updated_at for github_issue in batch_issues)
+        current_since_datetime = latest_updated_at + timedelta(seconds=1)
+
+
+def build_backfill_pipeline(since_datetime=None, failed_repos: Optional[List[str]] = None) -> StagedPipeline:
+    """
+    Build the backfill pipeline taking repository names as input:
+    fetch (GitHub pages) -> convert (Issue models, pull requests dropped) -> embed (diff + embeddings) -> write (storage).
+    Pages come from the REST listing or, in the "graphql" GITHUB_SYNC_MODE, from GraphQL queries.
+    
+    Args:
+        since_datetime: Optional datetime to start fetching from. If None, starts from beginning.
+        failed_repos: Optional list collecting the repositories whose fetch failed
+    """
+    store = get_issue_store()
+    
+    def fetch(repo_name, emit):
+        logger.info(f"Fetching all issues from repository: {repo_name} (since: {since_datetime})")
+        iter_issues = iter_repo_issue_nodes if config.GITHUB_SYNC_MODE == "graphql" else iter_repo_issues
+        try:
+            for github_issue in iter_issues(repo_name, since_datetime=since_datetime):
+                emit(github_issue)
+        except Exception:
+            # For since-based pagination, we should stop on error as we can't continue safely
+            if failed_repos is not None:
+                failed_repos.append(repo_name)
+            raise
+    
+    def convert(github_issue, emit):
+        # GraphQL issue connections hold no pull requests
+        if isinstance(github_issue, dict):
+            emit(Issue.from_graphql_node(github_issue))
+            return
+        # Pull requests are not embedded nor stored, they are counted as processed but not emitted
+        if is_pull_request(github_issue):
+            return
+        emit(Issue.from_github_issue(github_issue))
+    
+    def embed(issue, emit):
+        # An issue a webhook is processing is skipped, the webhook stores its latest state
+        lease_name = leases.issue_lease_name(issue.github_issue_id)
+        if config.WORK_LEASES_ENABLED and not leases.try_acquire(lease_name):
+            logger.debug(f"Skipping issue #{issue.github_issue_number}, being processed by another worker")
+            return
+        prepared = None
+        try:
+            prepared = prepare_issue_write(issue, store)
+        finally:
+            if prepared is None and config.WORK_LEASES_ENABLED:
+                leases.release(lease_name)
+        if prepared is not None:
+            emit(prepared)
+    
+    def write(prepared, emit):
+        try:
+            write_issue(*prepared, store=store)
+        finally:
+            if config.WORK_LEASES_ENABLED:
+                leases.release(leases.issue_lease_name(prepared[0].github_issue_id))
+        emit(prepared)
+    
+    return StagedPipeline(
+        "backfill",
+        [
+            PipelineStage("fetch", fetch, workers=config.BACKFILL_FETCH_WORKERS),
+            PipelineStage("convert", convert, workers=config.BACKFILL_CONVERT_WORKERS),
+            PipelineStage("embed", embed, workers=config.BACKFILL_EMBED_WORKERS),
+            PipelineStage("write", write, workers=config.BACKFILL_WRITE_WORKERS),
+        ],
+        queue_size=config.BACKFILL_QUEUE_SIZE,
+        report_interval=config.BACKFILL_REPORT_INTERVAL,
+    )
+
+
+def fetch_and_save_all_issues(since_datetime=None, repo_names=None):
+    """
+    Fetch all issues from every served GitHub repository and save them to database.
+    This function is idempotent - can be run multiple times safely.
+    
+    Args:
+        since_datetime: Optional datetime to start fetching from. If None, starts from beginning.
+        repo_names: Optional list of repositories. If None, uses GITHUB_REPO_NAMES or all installed repositories.
+    """
+    if repo_names is None:
+        repo_names = get_repo_names()
+    
+    if not repo_names:
+        raise ValueError("No repositories to fetch. Please set GITHUB_REPO_NAMES or install the GitHub App on a repository")
+    
+    logger.info(f"Fetching issues from {len(repo_names)} repositories: {repo_names}")
+    
+    failed_repos = []
+    summaries = build_backfill_pipeline(since_datetime=since_datetime, failed_repos=failed_repos).run(repo_names)
+    
+    stage_summaries = {summary['stage']: summary for summary in summaries}
+    convert_summary = stage_summaries['convert']
+    pull_request_count = convert_summary['processed'] - convert_summary['emitted'] - convert_summary['errors']
+    logger.info(
+        f"Issue processing completed: {convert_summary['processed']} fetched, "
+        f"{pull_request_count} pull requests skipped, "
+        f"{stage_summaries['write']['emitted']} written, "
+        f"{stage_summaries['embed']['processed'] - stage_summaries['embed']['emitted'] - stage_summaries['embed']['errors']} unchanged, "
+        f"{sum(summary['errors'] for summary in summaries)} errors"
+    )
+    
+    if convert_summary['processed'] == 0:
+        logger.warning("No issues were processed. This might indicate a permissions or configuration issue.")
+    
+    if failed_repos:
+        raise RuntimeError(f"Failed to fetch issues from repositories: {failed_repos}")
+
+
+def fetch_and_save_repo_issues(repo_name: str, since_datetime=None):
+    """
+    Fetch all issues from a GitHub repository and save them to database using since-based pagination.
+    This function is idempotent - can be run multiple times safely.
+    
+    Args:
+        repo_name: Repository name (e.g., "owner/repo")
+        since_datetime: Optional datetime to start fetching from. If None, starts from beginning.
+    """
+    fetch_and_save_all_issues(since_datetime=since_datetime, repo_names=[repo_name])
 
 
 def init_database(since_datetime=None):
@@ -237,6 +490,14 @@ def init_database(since_datetime=None):
     try:
         # Step 1: Create tables if they don't exist
         init_tables()
+        clear_placeholder_vectors()
+        remove_pull_requests()
+        purged_leases = get_issue_store().purge_expired_leases()
+        if purged_leases:
+            logger.info(f"Purged {purged_leases} expired work leases")
+        if compact_enabled():
+            fill_compact_vectors()
+        fill_missing_vectors()
         
         # Step 2: Fetch and save all issues from GitHub
         if since_datetime:
@@ -262,21 +523,18 @@ if __name__ == '__main__':
     try:
         logger.info("Starting database initialization script")
         
-        # Check configuration
-        if not config.GITHUB_REPO_NAME:
-            logger.error("GITHUB_REPO_NAME environment variable is not set")
-            sys.exit(1)
-        
         # Check GitHub authentication
         has_github_app = (config.GITHUB_APP_ID and 
-                         config.GITHUB_APP_PRIVATE_KEY and 
-                         config.GITHUB_APP_INSTALLATION_ID)
+                         config.GITHUB_APP_PRIVATE_KEY)
         
         if not has_github_app:
             logger.error("GitHub authentication is not configured")
-            logger.error("Please set GITHUB_APP_ID, GITHUB_APP_PRIVATE_KEY, and GITHUB_APP_INSTALLATION_ID")
+            logger.error("Please set GITHUB_APP_ID and GITHUB_APP_PRIVATE_KEY")
             sys.exit(1)
         
+        if not config.GITHUB_REPO_NAMES:
+            logger.info("GITHUB_REPO_NAMES is not set, fetching every repository the GitHub App is installed on")
+        
         # Parse since_datetime if provided
         since_datetime = None
         if len(sys.argv) > 1:
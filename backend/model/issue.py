@@ -1,19 +1,36 @@
+import hashlib
 import json
 from typing import Any, Optional
-from datetime import datetime
-from pytidb.schema import TableModel, Field
-from pytidb.embeddings import EmbeddingFunction
+from datetime import datetime, timezone
+from pytidb.schema import TableModel, Field, VectorField
 from sqlalchemy import JSON, TEXT, Column, BigInteger
 
 from backend import config
-
-text_embedding_function = EmbeddingFunction(
-    config.EMBEDDING_MODEL,
-    timeout=60
+from backend.model.compact_vectors import check_compact_dimensions, compact_enabled
+from backend.model.embedding import (
+    EMPTY_BODY_PLACEHOLDER,
+    text_embedding_function,
+    title_embedding_function,
+    body_embedding_function,
 )
 
 ISSUE_TABLE_NAME = "issues"
 
+check_compact_dimensions(text_embedding_function.dimensions)
+
+# Fields left out of the content fingerprint: derived vectors and the fingerprint itself
+FINGERPRINT_EXCLUDED_FIELDS = {
+    "title_vec", "body_vec", "title_vec_compact", "body_vec_compact", "title_vec_next", "body_vec_next", "content_fingerprint",
+    "reply_comment_id",
+}
+
+# GitHub's placeholder account for deleted users, as reported by the REST API
+GHOST_USER_LOGIN = "ghost"
+GHOST_USER_ID = 10137
+
+# GraphQL lock reasons spelled as the REST API does
+GRAPHQL_LOCK_REASONS = {"OFF_TOPIC": "off-topic", "TOO_HEATED": "too heated"}
+
 class Issue(TableModel, table=True):
     """
     Issue model that mirrors GitHub's Issue structure.
@@ -29,7 +46,7 @@ class Issue(TableModel, table=True):
     # Repository information
     repository_name: str = Field(index=True)  # Repository name (e.g., "owner/repo")
     repository_owner: str = Field(index=True)  # Repository owner
-    repository_id: int  # GitHub repository ID
+    repository_id: int = Field(index=True)  # GitHub repository ID, scopes similarity search
     
     # Issue content
     title: str = Field(sa_column=Column(TEXT, nullable=False))  # Issue title
@@ -64,14 +81,30 @@ class Issue(TableModel, table=True):
     html_url: str  # GitHub issue URL
     url: str  # API URL
     
+    # SHA-256 over the non-vector fields, lets unchanged events skip the update after a single-column read
+    content_fingerprint: Optional[str] = Field(default=None, max_length=64)
+    
+    # ID of Tiara's reply comment, 0 while a reply is being posted (see backend.tool.send_issue_comment)
+    reply_comment_id: Optional[int] = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    
     # Vector embeddings for content search
-    title_vec: Optional[Any] = text_embedding_function.VectorField(
+    # Embedding input is compacted (see backend.model.embedding), placeholder bodies get no vector
+    title_vec: Optional[Any] = title_embedding_function.VectorField(
         source_field="title",
     )
-    body_vec: Optional[Any] = text_embedding_function.VectorField(
+    body_vec: Optional[Any] = body_embedding_function.VectorField(
         source_field="body",
     )
     
+    # Truncated copies of the vectors for the first-pass search, only defined (and indexed) when VECTOR_STORAGE_MODE is "truncated"
+    if compact_enabled():
+        title_vec_compact: Optional[Any] = VectorField(dimensions=config.COMPACT_VECTOR_DIMENSIONS)
+        body_vec_compact: Optional[Any] = VectorField(dimensions=config.COMPACT_VECTOR_DIMENSIONS)
+    
+    # Vectors of EMBEDDING_MIGRATION_MODEL while an embedding model migration runs (see backend.tool.reembed)
+    title_vec_next: Optional[Any] = VectorField(dimensions=config.EMBEDDING_MIGRATION_DIMENSIONS, index=False)
+    body_vec_next: Optional[Any] = VectorField(dimensions=config.EMBEDDING_MIGRATION_DIMENSIONS, index=False)
+    
     @classmethod
     def from_github_issue(cls, github_issue: Any) -> "Issue":
         """
@@ -123,7 +156,7 @@ class Issue(TableModel, table=True):
             repository_owner=repo_owner,
             repository_id=repo.id,
             title=github_issue.title,
-            body=github_issue.body if github_issue.body is not None else "N/A",
+            body=github_issue.body if github_issue.body is not None else EMPTY_BODY_PLACEHOLDER,
             state=github_issue.state,
             state_reason=github_issue.state_reason,
             locked=github_issue.locked,
@@ -203,7 +236,7 @@ class Issue(TableModel, table=True):
             repository_owner=repo_owner,
             repository_id=repo_id,
             title=issue_data.get('title'),
-            body=issue_data.get('body') if issue_data.get('body') is not None else "N/A",
+            body=issue_data.get('body') if issue_data.get('body') is not None else EMPTY_BODY_PLACEHOLDER,
             state=issue_data.get('state'),
             state_reason=issue_data.get('state_reason'),
             locked=issue_data.get('locked', False),
@@ -223,6 +256,75 @@ class Issue(TableModel, table=True):
             url=issue_data.get('url')
         )
     
+    @classmethod
+    def from_graphql_node(cls, node: dict) -> "Issue":
+        """
+        Convert an issue node of the GraphQL sync query (see backend.tool.graphql_issues)
+        to our Issue model, with the same values a REST listing gives.
+        
+        Args:
+            node: GraphQL issue node, with its 'repository' and its milestone's REST 'id'
+            
+        Returns:
+            Issue model instance
+        """
+        repo = node['repository']
+        
+        # Deleted accounts are null in GraphQL, REST reports GitHub's ghost user
+        def actor_fields(actor):
+            if actor is None:
+                return GHOST_USER_LOGIN, GHOST_USER_ID
+            return actor.get('login'), actor.get('databaseId')
+        
+        def parse_datetime(dt_str):
+            if dt_str:
+                return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+            return None
+        
+        author_login, author_id = actor_fields(node.get('author'))
+        
+        # REST reports who closed the issue last, GraphQL has it on the last closed event
+        closed_by_login = closed_by_id = None
+        closed_events = node.get('timelineItems', {}).get('nodes') or []
+        if node['state'] == 'CLOSED' and closed_events:
+            closed_by_login, closed_by_id = actor_fields(closed_events[-1].get('actor'))
+        
+        milestone = node.get('milestone')
+        state_reason = node.get('stateReason')
+        lock_reason = node.get('activeLockReason')
+        
+        return cls(
+            github_issue_id=int(node['fullDatabaseId']),
+            github_issue_number=node['number'],
+            node_id=node['id'],
+            repository_name=repo['nameWithOwner'],
+            repository_owner=repo['owner']['login'],
+            repository_id=repo['databaseId'],
+            title=node['title'],
+            # GraphQL reports a missing body as an empty string, REST as null
+            body=node.get('body') or EMPTY_BODY_PLACEHOLDER,
+            state=node['state'].lower(),
+            state_reason=state_reason.lower() if state_reason else None,
+            locked=node.get('locked', False),
+            active_lock_reason=GRAPHQL_LOCK_REASONS.get(lock_reason, lock_reason.lower()) if lock_reason else None,
+            author_login=author_login,
+            author_id=author_id,
+            closed_by_login=closed_by_login,
+            closed_by_id=closed_by_id,
+            assignees=[{'login': assignee['login'], 'id': assignee['databaseId']} for assignee in node['assignees']['nodes']],
+            labels=[
+                {'name': label['name'], 'color': label['color'], 'description': label['description']}
+                for label in node['labels']['nodes']
+            ],
+            milestone_title=milestone['title'] if milestone else None,
+            milestone_id=milestone.get('id') if milestone else None,
+            created_at=parse_datetime(node['createdAt']),
+            updated_at=parse_datetime(node['updatedAt']),
+            closed_at=parse_datetime(node.get('closedAt')),
+            html_url=node['url'],
+            url=f"{config.GITHUB_API_URL}/repos/{repo['nameWithOwner']}/issues/{node['number']}"
+        )
+    
     def get_content_for_embedding(self) -> str:
         """
         Get combined content (title + body) for vector embedding.
@@ -232,12 +334,35 @@ class Issue(TableModel, table=True):
             content_parts.append(self.body)
         return " ".join(content_parts)
     
+    def compute_content_fingerprint(self) -> str:
+        """
+        Hash the non-vector fields, normalized the same way the diff compares them
+        (stripped strings, UTC datetimes), so equal content gives equal fingerprints.
+        """
+        def normalize(value):
+            if isinstance(value, str):
+                return value.strip()
+            if isinstance(value, datetime):
+                if value.tzinfo is not None:
+                    value = value.astimezone(timezone.utc).replace(tzinfo=None)
+                return value.isoformat()
+            return value
+        
+        content = {
+            field_name: normalize(getattr(self, field_name))
+            for field_name in sorted(type(self).model_fields)
+            if field_name not in FINGERPRINT_EXCLUDED_FIELDS
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+    
     def get_labels_list(self) -> list[dict]:
         """
-        Parse labels JSON and return as list of dictionaries.
+        Return labels as a list of dictionaries, parsing them if stored as a JSON string.
         """
         if not self.labels:
             return []
+        if isinstance(self.labels, list):
+            return self.labels
         try:
             return json.loads(self.labels)
         except (json.JSONDecodeError, TypeError):
@@ -245,10 +370,12 @@ class Issue(TableModel, table=True):
     
     def get_assignees_list(self) -> list[dict]:
         """
-        Parse assignees JSON and return as list of dictionaries.
+        Return assignees as a list of dictionaries, parsing them if stored as a JSON string.
         """
         if not self.assignees:
             return []
+        if isinstance(self.assignees, list):
+            return self.assignees
         try:
             return json.loads(self.assignees)
         except (json.JSONDecodeError, TypeError):
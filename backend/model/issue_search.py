@@ -0,0 +1,304 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend import config
+from backend.model import base
+from backend.model.compact_vectors import COMPACT_VECTOR_COLUMNS, compact_enabled, compact_vector
+from backend.model.embedding import MIGRATION_VECTOR_COLUMNS
+from backend.model.issue import FINGERPRINT_EXCLUDED_FIELDS, ISSUE_TABLE_NAME, Issue
+from backend.tool.logger import get_logger
+from backend.tool.resilience import bounded_timeout
+
+logger = get_logger(__name__)
+
+# Open issues rank first and closed ones last, each group ordered by distance
+STATE_ORDER_SQL = "issues.state = 'open' DESC, issues.state = 'closed' ASC"
+
+# Columns with a full-text index (hybrid search)
+LEXICAL_COLUMNS = ("title", "body")
+
+# Row columns search results can be projected to (no vectors), and the ones always returned
+RESULT_COLUMNS = [name for name in Issue.model_fields if name not in FINGERPRINT_EXCLUDED_FIELDS]
+REQUIRED_RESULT_COLUMNS = ["github_issue_id", "state"]
+
+# Columns the build_filter_sql conditions read, carried by the nearest-neighbour candidates
+FILTER_COLUMNS = ["repository_id", "repository_name", "state", "labels", "created_at", "updated_at"]
+
+
+def _max_execution_time_hint() -> str:
+    """
+    Optimizer hint bounding the query by the time left in the current budget, if any.
+    """
+    timeout = bounded_timeout(None, "search")
+    if timeout is None:
+        return ""
+    return f"/*+ MAX_EXECUTION_TIME({max(1, int(timeout * 1000))}) */ "
+
+
+def _project_columns(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Validate a search result projection, adding the columns ordering needs.
+
+    Args:
+        fields: Row columns to return, None for whole rows
+
+    Returns:
+        Columns to select, None for whole rows
+    """
+    if fields is None:
+        return None
+    unknown_fields = set(fields) - set(RESULT_COLUMNS)
+    if unknown_fields:
+        raise ValueError(f"Cannot project search results to: {sorted(unknown_fields)}")
+    return list(dict.fromkeys([*REQUIRED_RESULT_COLUMNS, *fields]))
+
+
+def _select_columns(columns: Optional[List[str]]) -> str:
+    return "issues.*" if columns is None else ", ".join(f"issues.{column}" for column in columns)
+
+
+def format_vector(vector) -> str:
+    """
+    Format a vector as a TiDB vector literal.
+    """
+    return "[" + ",".join(str(float(value)) for value in vector) + "]"
+
+
+def build_filter_sql(
+    params: Dict,
+    repository_id: Optional[int] = None,
+    repository_name: Optional[str] = None,
+    state: Optional[str] = None,
+    labels: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    exclude_issue_id: Optional[int] = None,
+    issue_ids: Optional[List[int]] = None,
+    hot_since: Optional[datetime] = None,
+    cold_before: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Build the metadata conditions applied to the vector search candidates.
+
+    Args:
+        params: Bind parameters, updated in place
+        repository_id: Only issues of this repository
+        repository_name: Only issues of this repository (e.g. "owner/repo")
+        state: Only issues in this state (open/closed)
+        labels: Only issues carrying all of these labels
+        created_after: Only issues created after this datetime
+        exclude_issue_id: Issue to leave out (usually the query issue itself)
+        issue_ids: Only these issues (e.g. full-text candidates to score by distance)
+        hot_since: Only the hot tier: open issues, and issues updated since this datetime
+        cold_before: Only the cold tier: every issue not in the hot tier of this datetime
+
+    Returns:
+        List of SQL conditions
+    """
+    conditions = []
+    if repository_id is not None:
+        conditions.append("repository_id = :repository_id")
+        params["repository_id"] = repository_id
+    if repository_name:
+        conditions.append("repository_name = :repository_name")
+        params["repository_name"] = repository_name
+    if state:
+        conditions.append("state = :state")
+        params["state"] = state
+    for i, label in enumerate(labels or []):
+        conditions.append(f"JSON_CONTAINS(labels, :label_{i})")
+        params[f"label_{i}"] = json.dumps({"name": label})
+    if created_after is not None:
+        conditions.append("created_at > :created_after")
+        params["created_after"] = created_after
+    if exclude_issue_id is not None:
+        conditions.append("github_issue_id != :exclude_issue_id")
+        params["exclude_issue_id"] = exclude_issue_id
+    if issue_ids is not None:
+        names = [f"issue_id_{i}" for i in range(len(issue_ids))]
+        conditions.append(f"github_issue_id IN ({', '.join(f':{name}' for name in names)})" if names else "FALSE")
+        params.update(zip(names, issue_ids))
+    if hot_since is not None:
+        conditions.append("(state = 'open' OR updated_at >= :hot_since)")
+        params["hot_since"] = hot_since
+    if cold_before is not None:
+        # Exact complement of the hot tier, rows with NULL state or updated_at included
+        conditions.append("NOT COALESCE(state = 'open' OR updated_at >= :cold_before, FALSE)")
+        params["cold_before"] = cold_before
+    return conditions
+
+
+def _has_vector_index(vector_column: str) -> bool:
+    # Migration columns are only indexed once EMBEDDING_MIGRATION_DIMENSIONS is set (see tidb_store.SCHEMA_MIGRATIONS)
+    return vector_column not in MIGRATION_VECTOR_COLUMNS.values() or bool(config.EMBEDDING_MIGRATION_DIMENSIONS)
+
+
+def _build_field_query(
+    vector_column: str,
+    query_vector,
+    conditions: List[str],
+    params: Dict,
+    limit_per_field: int,
+    prefilter: bool = False,
+) -> str:
+    """
+    Build the nearest-neighbour query of one vector column. The inner query takes the
+    nearest candidates (on the compact column in "truncated" mode), the outer one filters
+    them and ranks them by exact distance on the full vector.
+
+    The inner query is a bare ORDER BY distance LIMIT, the only shape TiDB serves from the
+    vector index, and over-fetches by VECTOR_SEARCH_OVERFETCH_FACTOR for the filters to
+    drop rows from. With prefilter (a handful of issue_ids) or on an unindexed column, the
+    conditions are applied in the inner query instead.
+    """
+    params[f"{vector_column}_query"] = format_vector(query_vector)
+    params[f"{vector_column}_limit"] = limit_per_field
+
+    first_pass_column = vector_column
+    candidates = limit_per_field
+    if compact_enabled() and vector_column in COMPACT_VECTOR_COLUMNS:
+        first_pass_column = COMPACT_VECTOR_COLUMNS[vector_column]
+        params[f"{vector_column}_first_pass"] = format_vector(compact_vector(query_vector))
+        candidates *= config.RERANK_CANDIDATE_FACTOR
+    else:
+        params[f"{vector_column}_first_pass"] = params[f"{vector_column}_query"]
+
+    prefilter = prefilter or not _has_vector_index(first_pass_column)
+    inner_conditions, outer_conditions = [f"{first_pass_column} IS NOT NULL", *conditions], [f"{vector_column} IS NOT NULL"]
+    if not prefilter:
+        inner_conditions, outer_conditions = [], [*outer_conditions, *conditions]
+        candidates *= config.VECTOR_SEARCH_OVERFETCH_FACTOR
+    params[f"{vector_column}_candidates"] = candidates
+
+    inner_where_sql = f"\n            WHERE {' AND '.join(inner_conditions)}" if inner_conditions else ""
+    return f"""(
+        SELECT
+            github_issue_id,
+            VEC_COSINE_DISTANCE({vector_column}, :{vector_column}_query) AS _distance,
+            '{vector_column}' AS _search_field
+        FROM (
+            SELECT github_issue_id, {vector_column}, {', '.join(FILTER_COLUMNS)}
+            FROM {ISSUE_TABLE_NAME}{inner_where_sql}
+            ORDER BY VEC_COSINE_DISTANCE({first_pass_column}, :{vector_column}_first_pass)
+            LIMIT :{vector_column}_candidates
+        ) AS {vector_column}_candidates
+        WHERE {' AND '.join(outer_conditions)}
+        ORDER BY _distance
+        LIMIT :{vector_column}_limit
+    )"""
+
+
+def search_issues_by_vectors(
+    query_vectors: Dict[str, list],
+    limit_per_field: int = config.RETRIEVAL_LIMIT,
+    limit: Optional[int] = None,
+    distance_threshold: float = config.MIN_DISTANCE,
+    fields: Optional[List[str]] = None,
+    **filters,
+) -> List[Dict]:
+    """
+    Search issues similar to the query vectors in a single SQL statement.
+
+    Filtering, the per-field nearest-neighbour search, deduplication across fields (keeping
+    the smaller distance), the distance threshold and state-aware ordering all run in TiDB,
+    so only the rows that end up in the result are returned.
+
+    Args:
+        query_vectors: Vector column name (title_vec / body_vec, or their migration columns) -> query vector
+        limit_per_field: Number of nearest neighbours taken from each vector column
+        limit: Total number of results, defaults to limit_per_field per searched column
+        distance_threshold: Drop results farther than this cosine distance
+        fields: Row columns to return (see RESULT_COLUMNS), None for whole rows including vectors.
+            github_issue_id and state are always returned.
+        **filters: Metadata filters, see build_filter_sql
+
+    Returns:
+        List of issue rows with '_distance' and '_search_field'
+    """
+    query_vectors = {column: vector for column, vector in query_vectors.items() if vector is not None}
+    if not query_vectors:
+        return []
+
+    params = {
+        "distance_threshold": distance_threshold,
+        "limit": limit if limit is not None else limit_per_field * len(query_vectors),
+    }
+    conditions = build_filter_sql(params, **filters)
+    # Scoring a few given issues reads them by primary key, no index search needed
+    prefilter = filters.get("issue_ids") is not None
+    field_queries = [
+        _build_field_query(column, vector, conditions, params, limit_per_field, prefilter=prefilter)
+        for column, vector in query_vectors.items()
+    ]
+
+    union_sql = "\n        UNION ALL\n        ".join(field_queries)
+    sql = f"""
+        WITH hits AS (
+        {union_sql}
+        ),
+        ranked AS (
+            SELECT
+                github_issue_id,
+                _distance,
+                _search_field,
+                ROW_NUMBER() OVER (PARTITION BY github_issue_id ORDER BY _distance) AS _rank
+            FROM hits
+            WHERE _distance <= :distance_threshold
+        )
+        SELECT {_max_execution_time_hint()}{_select_columns(_project_columns(fields))}, ranked._distance, ranked._search_field
+        FROM ranked
+        JOIN {ISSUE_TABLE_NAME} AS issues ON issues.github_issue_id = ranked.github_issue_id
+        WHERE ranked._rank = 1
+        ORDER BY {STATE_ORDER_SQL}, ranked._distance ASC
+        LIMIT :limit
+    """
+    return base.db.query(sql, params).to_list()
+
+
+def search_issues_by_text(query: str, limit: int, **filters) -> List[Dict]:
+    """
+    Full-text search of the title and body columns (TiDB full-text indexes, BM25 ranked).
+    Each column is ranked separately, and the two rankings are fused by reciprocal rank.
+
+    Args:
+        query: Search words, separated by spaces
+        limit: Maximum number of results
+        **filters: Metadata filters, see build_filter_sql
+
+    Returns:
+        List of issue rows (without vectors) with '_lexical_score', best match first
+    """
+    params = {"query": query, "limit": limit, "rrf_k": config.HYBRID_RRF_K}
+    conditions = build_filter_sql(params, **filters)
+    field_queries = [
+        f"""(
+            SELECT github_issue_id, fts_match_word(:query, {column}) AS _score, '{column}' AS _search_field
+            FROM {ISSUE_TABLE_NAME}
+            WHERE {" AND ".join([f"fts_match_word(:query, {column})", *conditions])}
+            ORDER BY fts_match_word(:query, {column}) DESC
+            LIMIT :limit
+        )"""
+        for column in LEXICAL_COLUMNS
+    ]
+
+    union_sql = "\n        UNION ALL\n        ".join(field_queries)
+    sql = f"""
+        WITH hits AS (
+        {union_sql}
+        ),
+        ranked AS (
+            SELECT github_issue_id, ROW_NUMBER() OVER (PARTITION BY _search_field ORDER BY _score DESC) AS _rank
+            FROM hits
+        ),
+        fused AS (
+            SELECT github_issue_id, SUM(1 / (:rrf_k + _rank)) AS _lexical_score
+            FROM ranked
+            GROUP BY github_issue_id
+        )
+        SELECT {_max_execution_time_hint()}{_select_columns(RESULT_COLUMNS)}, fused._lexical_score
+        FROM fused
+        JOIN {ISSUE_TABLE_NAME} AS issues ON issues.github_issue_id = fused.github_issue_id
+        ORDER BY fused._lexical_score DESC
+        LIMIT :limit
+    """
+    return base.db.query(sql, params).to_list()
@@ -0,0 +1,564 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from backend import config
+from backend.model.compact_vectors import COMPACT_VECTOR_COLUMNS, compact_columns, compact_enabled, compact_vector, cosine_distances
+from backend.model.embedding import MIGRATION_VECTOR_COLUMNS
+from backend.model.hybrid_search import lexical_terms
+from backend.model.issue import ISSUE_TABLE_NAME, Issue
+from backend.model.store import IssueStore
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+DATABASE_FILE_NAME = "issues.sqlite3"
+
+# FTS5 index of titles and bodies (hybrid search), kept in sync with the issues table by triggers
+FTS_TABLE_NAME = f"{ISSUE_TABLE_NAME}_fts"
+FTS_TRIGGERS = {
+    "ai": f"INSERT INTO {FTS_TABLE_NAME} (rowid, title, body) VALUES (new.github_issue_id, new.title, new.body)",
+    "ad": f"INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}, rowid, title, body) VALUES ('delete', old.github_issue_id, old.title, old.body)",
+    "au": f"INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}, rowid, title, body) VALUES ('delete', old.github_issue_id, old.title, old.body); "
+          f"INSERT INTO {FTS_TABLE_NAME} (rowid, title, body) VALUES (new.github_issue_id, new.title, new.body)",
+}
+# BM25 weights of the title and body columns
+FTS_COLUMN_WEIGHTS = (2.0, 1.0)
+
+# Vectors live in memory-mapped files, the SQLite column of the same name only flags their presence
+VECTOR_COLUMNS = ("title_vec", "body_vec", *compact_columns().values(), *MIGRATION_VECTOR_COLUMNS.values())
+JSON_COLUMNS = ("assignees", "labels")
+DATETIME_COLUMNS = ("created_at", "updated_at", "closed_at")
+BOOL_COLUMNS = ("locked",)
+ROW_COLUMNS = tuple(name for name in Issue.model_fields if name not in VECTOR_COLUMNS)
+INDEXED_COLUMNS = ("github_issue_number", "repository_name", "repository_id", "state", "updated_at")
+
+# SQLite's default limit on bound parameters is 999 in older builds
+MAX_SQL_PARAMS = 900
+
+
+def _format_datetime(value) -> Optional[str]:
+    # Stored as naive UTC text, like TiDB DATETIME columns, so text comparison orders correctly
+    if value is None or isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _encode(column: str, value):
+    if value is None:
+        return None
+    if column in VECTOR_COLUMNS:
+        return 1
+    if column in JSON_COLUMNS:
+        return value if isinstance(value, str) else json.dumps(value)
+    if column in DATETIME_COLUMNS:
+        return _format_datetime(value)
+    if column in BOOL_COLUMNS:
+        return int(value)
+    return value
+
+
+def _decode(row: sqlite3.Row, columns: Iterable[str] = ROW_COLUMNS) -> Dict:
+    values = {}
+    for column in columns:
+        value = row[column]
+        if value is not None:
+            if column in JSON_COLUMNS:
+                value = json.loads(value)
+            elif column in DATETIME_COLUMNS:
+                value = datetime.fromisoformat(value)
+            elif column in BOOL_COLUMNS:
+                value = bool(value)
+        values[column] = value
+    return values
+
+
+def _chunks(values: List, size: int = MAX_SQL_PARAMS) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _deduplicate_by_distance(field_hits: Dict[str, Dict[int, float]], distance_threshold: float) -> Dict[int, tuple]:
+    """
+    Merge per-field search hits (vector column -> {issue id: distance}) into issue id ->
+    (distance, vector column), keeping the smaller distance and dropping hits beyond the threshold.
+    """
+    best = {}
+    for vector_column, hits in field_hits.items():
+        for issue_id, distance in hits.items():
+            if distance <= distance_threshold and (issue_id not in best or distance < best[issue_id][0]):
+                best[issue_id] = (distance, vector_column)
+    return best
+
+
+def _order_by_state_and_distance(results: List[Dict]) -> List[Dict]:
+    # Open issues first and closed ones last (as STATE_ORDER_SQL), each group by distance
+    results.sort(key=lambda r: (r["state"] != "open", r["state"] == "closed", r["_distance"]))
+    return results
+
+
+class VectorFile:
+    """
+    Memory-mapped float32 matrix on disk, row i holds the vector of slot i.
+    The file grows by doubling, so appends do not rewrite it.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: str, dimensions: int):
+        self.path = path
+        self.dimensions = dimensions
+        self.matrix = None
+        if not os.path.exists(path):
+            self._resize(self.INITIAL_CAPACITY)
+        self._open()
+
+    def _open(self):
+        capacity = os.path.getsize(self.path) // (4 * self.dimensions)
+        self.matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions))
+
+    def _resize(self, capacity: int):
+        with open(self.path, "ab") as f:
+            f.truncate(capacity * 4 * self.dimensions)
+
+    def write(self, slot: int, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dimensions,):
+            raise ValueError(f"Expected a vector of {self.dimensions} dimensions for {self.path}, got {vector.shape}")
+        if slot >= len(self.matrix):
+            self.matrix.flush()
+            self.matrix = None
+            self._resize(max(slot + 1, 2 * os.path.getsize(self.path) // (4 * self.dimensions)))
+            self._open()
+        self.matrix[slot] = vector
+
+    def read(self, slots) -> np.ndarray:
+        # Fancy indexing copies, so the result stays valid after the file grows
+        return np.array(self.matrix[np.asarray(slots, dtype=np.int64)])
+
+    def flush(self):
+        self.matrix.flush()
+
+
+class LocalIssueStore(IssueStore):
+    """
+    Issues stored on local disk: rows in SQLite, vectors in memory-mapped NumPy files searched
+    by brute force. Needs no network, for single-node deployments and CPU-only benchmarks.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(os.path.join(path, DATABASE_FILE_NAME), check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._vector_files: Dict[str, VectorFile] = {}
+        self._next_slot = 0
+        self.init_schema()
+
+    def init_schema(self):
+        with self._lock:
+            columns = ", ".join(column for column in (*ROW_COLUMNS, *VECTOR_COLUMNS) if column != "github_issue_id")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {ISSUE_TABLE_NAME} "
+                f"(github_issue_id INTEGER PRIMARY KEY, _slot INTEGER NOT NULL UNIQUE, {columns})"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS vector_columns (name TEXT PRIMARY KEY, dimensions INTEGER NOT NULL)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            # Expiry as Unix time: processes sharing the store run on the same host, so share a clock
+            self._connection.execute("CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+            # Columns added to the model after the file was created
+            existing = {row["name"] for row in self._connection.execute(f"PRAGMA table_info({ISSUE_TABLE_NAME})")}
+            for column in (*ROW_COLUMNS, *VECTOR_COLUMNS):
+                if column not in existing:
+                    self._connection.execute(f"ALTER TABLE {ISSUE_TABLE_NAME} ADD COLUMN {column}")
+            for column in INDEXED_COLUMNS:
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS ix_{ISSUE_TABLE_NAME}_{column} ON {ISSUE_TABLE_NAME} ({column})")
+
+            fts_exists = self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE_NAME,)
+            ).fetchone()
+            self._connection.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE_NAME} USING fts5"
+                f"(title, body, content='{ISSUE_TABLE_NAME}', content_rowid='github_issue_id')"
+            )
+            for name, statement in FTS_TRIGGERS.items():
+                event = {"ai": "INSERT", "ad": "DELETE", "au": "UPDATE OF title, body"}[name]
+                self._connection.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_{name} AFTER {event} ON {ISSUE_TABLE_NAME} BEGIN {statement}; END"
+                )
+            if not fts_exists:
+                # Index the rows stored before the full-text index existed
+                self._connection.execute(f"INSERT INTO {FTS_TABLE_NAME} ({FTS_TABLE_NAME}) VALUES ('rebuild')")
+            self._connection.commit()
+
+            for row in self._connection.execute("SELECT name, dimensions FROM vector_columns"):
+                self._vector_files[row["name"]] = VectorFile(self._vector_path(row["name"]), row["dimensions"])
+            self._next_slot = self._connection.execute(f"SELECT COALESCE(MAX(_slot), -1) + 1 FROM {ISSUE_TABLE_NAME}").fetchone()[0]
+        logger.info(f"Local issue store ready at {self.path} ({self._next_slot} slots)")
+
+    def _vector_path(self, column: str) -> str:
+        return os.path.join(self.path, f"{column}.f32")
+
+    def _vector_file(self, column: str, vector) -> VectorFile:
+        # Dimensions are taken from the first vector written, the embedding model is not probed
+        if column not in self._vector_files:
+            dimensions = len(vector)
+            self._connection.execute("INSERT INTO vector_columns (name, dimensions) VALUES (?, ?)", (column, dimensions))
+            self._connection.commit()
+            self._vector_files[column] = VectorFile(self._vector_path(column), dimensions)
+        return self._vector_files[column]
+
+    def _write_vectors(self, slots: List[int], values: Dict):
+        for column in VECTOR_COLUMNS:
+            vector = values.get(column)
+            if vector is None:
+                continue
+            vector_file = self._vector_file(column, vector)
+            for slot in slots:
+                vector_file.write(slot, vector)
+
+    def _flush_vectors(self):
+        for vector_file in self._vector_files.values():
+            vector_file.flush()
+
+    def _build_where(self, filters: Dict, params: List) -> str:
+        conditions = []
+        for column, condition in (filters or {}).items():
+            if column not in ROW_COLUMNS and column not in VECTOR_COLUMNS:
+                raise ValueError(f"Unknown column in filters: {column}")
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, value in condition.items():
+                if operator in ("$eq", "$ne") and value is None:
+                    conditions.append(f"{column} IS {'NOT ' if operator == '$ne' else ''}NULL")
+                elif operator == "$in":
+                    conditions.append(f"{column} IN ({', '.join('?' for _ in value)})" if value else "0")
+                    params.extend(_encode(column, item) for item in value)
+                elif operator in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte"):
+                    sql_operator = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}[operator]
+                    conditions.append(f"{column} {sql_operator} ?")
+                    params.append(_encode(column, value))
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+        return " AND ".join(conditions) or "1"
+
+    def _rows_to_dicts(self, rows: List[sqlite3.Row], with_vectors: bool) -> List[Dict]:
+        results = [_decode(row) for row in rows]
+        if with_vectors and rows:
+            for column in VECTOR_COLUMNS:
+                present = [i for i, row in enumerate(rows) if row[column] is not None]
+                vectors = self._vector_files[column].read([rows[i]["_slot"] for i in present]) if present else []
+                for result in results:
+                    result[column] = None
+                for i, vector in zip(present, vectors):
+                    results[i][column] = vector.tolist()
+        return results
+
+    def get(self, github_issue_id: int) -> Optional[Issue]:
+        rows = self.query({"github_issue_id": github_issue_id}, limit=1)
+        return Issue(**rows[0]) if rows else None
+
+    def get_fields(self, github_issue_id: int, fields: List[str]) -> Optional[Dict]:
+        unknown_fields = set(fields) - set(ROW_COLUMNS)
+        if unknown_fields:
+            raise ValueError(f"Cannot project fields: {sorted(unknown_fields)}")
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(fields)} FROM {ISSUE_TABLE_NAME} WHERE github_issue_id = ?", (github_issue_id,)
+            ).fetchone()
+        return _decode(row, fields) if row else None
+
+    def insert(self, issue: Issue):
+        self.bulk_insert([issue])
+
+    def bulk_insert(self, issues: List[Issue]):
+        columns = ["_slot", *ROW_COLUMNS, *VECTOR_COLUMNS]
+        with self._lock:
+            try:
+                rows = []
+                for offset, issue in enumerate(issues):
+                    slot = self._next_slot + offset
+                    values = {column: getattr(issue, column) for column in (*ROW_COLUMNS, *VECTOR_COLUMNS)}
+                    # Vectors are written before the rows are committed, so a stored row never lacks them
+                    self._write_vectors([slot], values)
+                    rows.append([slot, *(_encode(column, value) for column, value in values.items())])
+                self._flush_vectors()
+                self._connection.executemany(
+                    f"INSERT INTO {ISSUE_TABLE_NAME} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                    rows,
+                )
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+            self._next_slot += len(issues)
+
+    def existing_ids(self, github_issue_ids: Iterable[int]) -> Set[int]:
+        github_issue_ids = list(github_issue_ids)
+        existing = set()
+        with self._lock:
+            for chunk in _chunks(github_issue_ids):
+                rows = self._connection.execute(
+                    f"SELECT github_issue_id FROM {ISSUE_TABLE_NAME} WHERE github_issue_id IN ({', '.join('?' for _ in chunk)})", chunk
+                )
+                existing.update(row["github_issue_id"] for row in rows)
+        return existing
+
+    def update(self, values: Dict, filters: Dict):
+        for column in values:
+            if column not in ROW_COLUMNS and column not in VECTOR_COLUMNS:
+                raise ValueError(f"Unknown column in values: {column}")
+        with self._lock:
+            params = []
+            where_sql = self._build_where(filters, params)
+            try:
+                slots = [row["_slot"] for row in self._connection.execute(f"SELECT _slot FROM {ISSUE_TABLE_NAME} WHERE {where_sql}", params)]
+                if not slots:
+                    return
+                self._write_vectors(slots, values)
+                self._flush_vectors()
+                assignments = ", ".join(f"{column} = ?" for column in values)
+                for chunk in _chunks(slots):
+                    self._connection.execute(
+                        f"UPDATE {ISSUE_TABLE_NAME} SET {assignments} WHERE _slot IN ({', '.join('?' for _ in chunk)})",
+                        [*(_encode(column, value) for column, value in values.items()), *chunk],
+                    )
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+
+    def delete(self, filters: Dict):
+        # The vector slots of deleted rows are left unused
+        with self._lock:
+            params = []
+            where_sql = self._build_where(filters, params)
+            try:
+                self._connection.execute(f"DELETE FROM {ISSUE_TABLE_NAME} WHERE {where_sql}", params)
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+
+    def query(self, filters: Dict, limit: int) -> List[Dict]:
+        with self._lock:
+            params = []
+            where_sql = self._build_where(filters, params)
+            rows = self._connection.execute(
+                f"SELECT * FROM {ISSUE_TABLE_NAME} WHERE {where_sql} LIMIT ?", [*params, limit]
+            ).fetchall()
+            return self._rows_to_dicts(rows, with_vectors=True)
+
+    def scan(self, after_id: Optional[int], limit: int, fields: Optional[List[str]] = None, filters: Optional[Dict] = None) -> List[Dict]:
+        if fields is not None and set(fields) - set(ROW_COLUMNS):
+            raise ValueError(f"Cannot project fields: {sorted(set(fields) - set(ROW_COLUMNS))}")
+        with self._lock:
+            params = []
+            where_sql = self._build_where(filters, params)
+            rows = self._connection.execute(
+                f"SELECT {', '.join(fields) if fields is not None else '*'} FROM {ISSUE_TABLE_NAME} "
+                f"WHERE github_issue_id > ? AND {where_sql} ORDER BY github_issue_id LIMIT ?",
+                [after_id if after_id is not None else -1, *params, limit],
+            ).fetchall()
+            if fields is not None:
+                return [_decode(row, fields) for row in rows]
+            return self._rows_to_dicts(rows, with_vectors=True)
+
+    def get_setting(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+        return row["value"] if row else None
+
+    def set_setting(self, name: str, value: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO settings (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value)
+            )
+            self._connection.commit()
+
+    def try_acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at WHERE leases.expires_at < ?",
+                (name, owner, now + ttl_seconds, now),
+            )
+            self._connection.commit()
+        return cursor.rowcount > 0
+
+    def release_lease(self, name: str, owner: str, keep_seconds: Optional[float] = None):
+        with self._lock:
+            if keep_seconds:
+                self._connection.execute(
+                    "UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ?", (time.time() + keep_seconds, name, owner)
+                )
+            else:
+                self._connection.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+            self._connection.commit()
+
+    def purge_expired_leases(self) -> int:
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM leases WHERE expires_at < ?", (time.time(),))
+            self._connection.commit()
+        return cursor.rowcount
+
+    def _build_search_conditions(
+        self,
+        params: List,
+        repository_id: Optional[int] = None,
+        repository_name: Optional[str] = None,
+        state: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        created_after: Optional[datetime] = None,
+        exclude_issue_id: Optional[int] = None,
+        issue_ids: Optional[List[int]] = None,
+        hot_since: Optional[datetime] = None,
+        cold_before: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Same metadata filters as backend.model.issue_search.build_filter_sql.
+        """
+        conditions = []
+        if repository_id is not None:
+            conditions.append("repository_id = ?")
+            params.append(repository_id)
+        if repository_name:
+            conditions.append("repository_name = ?")
+            params.append(repository_name)
+        if state:
+            conditions.append("state = ?")
+            params.append(state)
+        for label in labels or []:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(labels) WHERE json_extract(json_each.value, '$.name') = ?)")
+            params.append(label)
+        if created_after is not None:
+            conditions.append("created_at > ?")
+            params.append(_format_datetime(created_after))
+        if exclude_issue_id is not None:
+            conditions.append("github_issue_id != ?")
+            params.append(exclude_issue_id)
+        if issue_ids is not None:
+            conditions.append(f"github_issue_id IN ({', '.join('?' for _ in issue_ids)})" if issue_ids else "0")
+            params.extend(issue_ids)
+        if hot_since is not None:
+            conditions.append("(state = 'open' OR updated_at >= ?)")
+            params.append(_format_datetime(hot_since))
+        if cold_before is not None:
+            conditions.append("NOT COALESCE(state = 'open' OR updated_at >= ?, FALSE)")
+            params.append(_format_datetime(cold_before))
+        return conditions
+
+    def _search_field(self, vector_column: str, query_vector, conditions: List[str], params: List, limit_per_field: int) -> Dict[int, float]:
+        """
+        Nearest neighbours of one vector column: a first pass over the filtered rows (on the
+        compact vectors in "truncated" mode), then the candidates ranked by exact distance.
+        """
+        first_pass_column = vector_column
+        num_candidates = limit_per_field
+        first_pass_query = query_vector
+        if compact_enabled() and vector_column in COMPACT_VECTOR_COLUMNS:
+            first_pass_column = COMPACT_VECTOR_COLUMNS[vector_column]
+            num_candidates = limit_per_field * config.RERANK_CANDIDATE_FACTOR
+            first_pass_query = compact_vector(query_vector)
+
+        where_sql = " AND ".join([f"{first_pass_column} IS NOT NULL", f"{vector_column} IS NOT NULL", *conditions])
+        with self._lock:
+            rows = self._connection.execute(f"SELECT github_issue_id, _slot FROM {ISSUE_TABLE_NAME} WHERE {where_sql}", params).fetchall()
+            if not rows:
+                return {}
+            slots = np.array([row["_slot"] for row in rows], dtype=np.int64)
+            issue_ids = np.array([row["github_issue_id"] for row in rows], dtype=np.int64)
+            first_pass_vectors = self._vector_files[first_pass_column].read(slots)
+
+        distances = cosine_distances(first_pass_vectors, first_pass_query)
+        if num_candidates < len(distances):
+            candidates = np.argpartition(distances, num_candidates)[:num_candidates]
+        else:
+            candidates = np.arange(len(distances))
+
+        if first_pass_column != vector_column:
+            with self._lock:
+                full_vectors = self._vector_files[vector_column].read(slots[candidates])
+            candidate_distances = cosine_distances(full_vectors, query_vector)
+        else:
+            candidate_distances = distances[candidates]
+
+        nearest = np.argsort(candidate_distances)[:limit_per_field]
+        return {int(issue_ids[candidates[i]]): float(candidate_distances[i]) for i in nearest}
+
+    def search(
+        self,
+        query_vectors: Dict[str, list],
+        limit_per_field: int = config.RETRIEVAL_LIMIT,
+        limit: Optional[int] = None,
+        distance_threshold: float = config.MIN_DISTANCE,
+        fields: Optional[List[str]] = None,
+        **filters,
+    ) -> List[Dict]:
+        query_vectors = {column: vector for column, vector in query_vectors.items() if vector is not None}
+        if not query_vectors:
+            return []
+        if limit is None:
+            limit = limit_per_field * len(query_vectors)
+        if fields is not None:
+            unknown_fields = set(fields) - set(ROW_COLUMNS)
+            if unknown_fields:
+                raise ValueError(f"Cannot project search results to: {sorted(unknown_fields)}")
+            fields = list(dict.fromkeys(["github_issue_id", "state", *fields]))
+
+        params = []
+        conditions = self._build_search_conditions(params, **filters)
+
+        best = _deduplicate_by_distance(
+            {
+                vector_column: self._search_field(vector_column, query_vector, conditions, params, limit_per_field)
+                for vector_column, query_vector in query_vectors.items()
+            },
+            distance_threshold,
+        )
+        if not best:
+            return []
+
+        with self._lock:
+            rows = []
+            for chunk in _chunks(list(best)):
+                rows.extend(self._connection.execute(
+                    f"SELECT {', '.join(fields or ['*'])} FROM {ISSUE_TABLE_NAME} WHERE github_issue_id IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchall())
+        results = [_decode(row, fields) for row in rows] if fields is not None else self._rows_to_dicts(rows, with_vectors=False)
+        for result in results:
+            result["_distance"], result["_search_field"] = best[result["github_issue_id"]]
+
+        return _order_by_state_and_distance(results)[:limit]
+
+    def lexical_search(self, query: str, limit: int, **filters) -> List[Dict]:
+        terms = lexical_terms(query)
+        if not terms:
+            return []
+        # Any of the words, ranked by BM25 (lower is better in FTS5)
+        params = [" OR ".join(f'"{term}"' for term in terms)]
+        conditions = self._build_search_conditions(params, **filters)
+        where_sql = " AND ".join([f"{FTS_TABLE_NAME} MATCH ?", *conditions])
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT issues.*, bm25({FTS_TABLE_NAME}, {', '.join(map(str, FTS_COLUMN_WEIGHTS))}) AS _bm25 "
+                f"FROM {FTS_TABLE_NAME} JOIN {ISSUE_TABLE_NAME} AS issues ON issues.github_issue_id = {FTS_TABLE_NAME}.rowid "
+                f"WHERE {where_sql} ORDER BY _bm25 LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        results = self._rows_to_dicts(rows, with_vectors=False)
+        for result, row in zip(results, rows):
+            result["_lexical_score"] = -row["_bm25"]
+        return results
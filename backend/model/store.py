@@ -0,0 +1,192 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend import config
+from backend.model.issue import Issue
+
+# tidb: TiDB Serverless through pytidb
+# local: SQLite rows and memory-mapped NumPy vectors on disk, for single-node deployments and offline benchmarks
+STORAGE_BACKENDS = ("tidb", "local")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class IssueStore(ABC):
+    """
+    Storage operations the service needs for issues.
+
+    Filters are dicts in the pytidb style: {"column": value} for equality (None means IS NULL),
+    or {"column": {"$ne": value}} / {"column": {"$in": [values]}}.
+    """
+
+    @abstractmethod
+    def init_schema(self):
+        """
+        Create the storage if it does not exist and bring storage created by older versions up to date.
+        """
+
+    @abstractmethod
+    def get(self, github_issue_id: int) -> Optional[Issue]:
+        """
+        Get an issue by its GitHub ID, None if it is not stored.
+        """
+
+    @abstractmethod
+    def get_fields(self, github_issue_id: int, fields: List[str]) -> Optional[Dict]:
+        """
+        Read only the given non-vector fields of an issue, None if it is not stored.
+        """
+
+    @abstractmethod
+    def insert(self, issue: Issue):
+        """
+        Insert an issue. Vectors must already be set (see backend.model.embedding.embed_issue).
+        """
+
+    @abstractmethod
+    def bulk_insert(self, issues: List[Issue]):
+        """
+        Insert issues in one batch as they are, vectors included; nothing is embedded.
+        """
+
+    @abstractmethod
+    def existing_ids(self, github_issue_ids: Iterable[int]) -> Set[int]:
+        """
+        Get which of the given GitHub issue IDs are stored.
+        """
+
+    @abstractmethod
+    def update(self, values: Dict, filters: Dict):
+        """
+        Set values on every issue matching filters. Vectors in values are stored as given.
+        """
+
+    @abstractmethod
+    def delete(self, filters: Dict):
+        """
+        Delete every issue matching filters.
+        """
+
+    @abstractmethod
+    def query(self, filters: Dict, limit: int) -> List[Dict]:
+        """
+        Get up to limit issue rows (vectors included) matching filters.
+        """
+
+    @abstractmethod
+    def scan(self, after_id: Optional[int], limit: int, fields: Optional[List[str]] = None, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Get up to limit issue rows ordered by GitHub issue ID, starting after after_id (from
+        the beginning if None). Used to stream the whole table.
+
+        Args:
+            after_id: GitHub issue ID of the last row of the previous page
+            limit: Maximum number of rows
+            fields: Non-vector fields to read, all fields (vectors included) if None
+            filters: Optional filters on the rows
+        """
+
+    @abstractmethod
+    def get_setting(self, name: str) -> Optional[str]:
+        """
+        Get a persisted service setting (e.g. migration state), None if it is not set.
+        """
+
+    @abstractmethod
+    def set_setting(self, name: str, value: str):
+        """
+        Persist a service setting, visible to every process sharing the storage.
+        """
+
+    @abstractmethod
+    def try_acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """
+        Claim a named lease for ttl_seconds, atomically across every process sharing the storage.
+
+        Args:
+            name: Lease name, e.g. "issue:<github_issue_id>" or "delivery:<delivery id>"
+            owner: ID of the claiming worker
+            ttl_seconds: Seconds after which the lease is free again, if not released before
+
+        Returns:
+            Whether the lease was free (never claimed, released or expired) and is now owner's
+        """
+
+    @abstractmethod
+    def release_lease(self, name: str, owner: str, keep_seconds: Optional[float] = None):
+        """
+        Release a lease held by owner, at once, or after keep_seconds to keep the work it
+        covered from being done again meanwhile (e.g. redeliveries of a processed delivery).
+        """
+
+    @abstractmethod
+    def purge_expired_leases(self) -> int:
+        """
+        Delete expired leases, returning how many were deleted.
+        """
+
+    @abstractmethod
+    def search(
+        self,
+        query_vectors: Dict[str, list],
+        limit_per_field: int = config.RETRIEVAL_LIMIT,
+        limit: Optional[int] = None,
+        distance_threshold: float = config.MIN_DISTANCE,
+        fields: Optional[List[str]] = None,
+        **filters,
+    ) -> List[Dict]:
+        """
+        Search issues similar to the query vectors.
+
+        Args:
+            query_vectors: Vector column name (title_vec / body_vec) -> query vector
+            limit_per_field: Number of nearest neighbours taken from each vector column
+            limit: Total number of results, defaults to limit_per_field per searched column
+            distance_threshold: Drop results farther than this cosine distance
+            fields: Row columns to return, None for whole rows. github_issue_id and state,
+                which results are ordered and deduplicated by, are always returned.
+            **filters: Metadata filters (repository_id, repository_name, state, labels,
+                created_after, exclude_issue_id, issue_ids, hot_since, cold_before)
+
+        Returns:
+            List of issue rows with '_distance' and '_search_field', deduplicated across
+            fields (keeping the smaller distance), open issues first, then by distance
+        """
+
+    @abstractmethod
+    def lexical_search(self, query: str, limit: int, **filters) -> List[Dict]:
+        """
+        Full-text search of issue titles and bodies, used by the hybrid search mode.
+
+        Args:
+            query: Search words, separated by spaces (see backend.model.hybrid_search.lexical_terms)
+            limit: Maximum number of results
+            **filters: Same metadata filters as search
+
+        Returns:
+            List of issue rows (without vectors) with '_lexical_score', best match first
+        """
+
+
+def get_issue_store() -> IssueStore:
+    """
+    Get the process-wide store of the configured STORAGE_BACKEND.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _create_store(config.STORAGE_BACKEND)
+    return _store
+
+
+def _create_store(backend: str) -> IssueStore:
+    if backend == "tidb":
+        from backend.model.tidb_store import TiDBIssueStore
+        return TiDBIssueStore()
+    if backend == "local":
+        from backend.model.local_store import LocalIssueStore
+        return LocalIssueStore(config.LOCAL_STORAGE_PATH)
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}', expected one of {STORAGE_BACKENDS}")
@@ -0,0 +1,230 @@
+import json
+from typing import Dict, Iterable, List, Optional, Set
+
+from pytidb.filters import build_filter_clauses
+from sqlalchemy import select
+
+from backend import config
+from backend.model.embedding import MIGRATION_VECTOR_COLUMNS
+from backend.model import base
+from backend.model.compact_vectors import compact_columns
+from backend.model.issue import FINGERPRINT_EXCLUDED_FIELDS, ISSUE_TABLE_NAME, Issue
+from backend.model.issue_search import LEXICAL_COLUMNS, search_issues_by_text, search_issues_by_vectors
+from backend.model.store import IssueStore
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+SETTINGS_TABLE_NAME = "tiara_settings"
+LEASES_TABLE_NAME = "tiara_leases"
+
+# Fields that can be read with get_fields, raw queries return JSON columns as text
+PROJECTABLE_FIELDS = {name for name in Issue.model_fields if name not in FINGERPRINT_EXCLUDED_FIELDS} | {"content_fingerprint", "reply_comment_id"}
+JSON_FIELDS = ("assignees", "labels")
+
+table_models = [
+    (ISSUE_TABLE_NAME, Issue),
+]
+
+# Idempotent DDL bringing tables created by older versions up to date
+SCHEMA_MIGRATIONS = [
+    f"CREATE INDEX IF NOT EXISTS ix_{ISSUE_TABLE_NAME}_repository_id ON {ISSUE_TABLE_NAME} (repository_id)",
+    # Hot tier of the tiered search (open or recently updated issues)
+    f"CREATE INDEX IF NOT EXISTS ix_{ISSUE_TABLE_NAME}_state_updated_at ON {ISSUE_TABLE_NAME} (state, updated_at)",
+    f"ALTER TABLE {ISSUE_TABLE_NAME} ADD COLUMN IF NOT EXISTS content_fingerprint VARCHAR(64)",
+    f"ALTER TABLE {ISSUE_TABLE_NAME} ADD COLUMN IF NOT EXISTS reply_comment_id BIGINT",
+    f"CREATE TABLE IF NOT EXISTS {SETTINGS_TABLE_NAME} (name VARCHAR(64) PRIMARY KEY, value TEXT NOT NULL)",
+    f"CREATE TABLE IF NOT EXISTS {LEASES_TABLE_NAME} "
+    f"(name VARCHAR(128) PRIMARY KEY, owner VARCHAR(128) NOT NULL, expires_at DATETIME(6) NOT NULL, KEY (expires_at))",
+    *[
+        f"ALTER TABLE {ISSUE_TABLE_NAME} ADD COLUMN IF NOT EXISTS {column} "
+        f"VECTOR{f'({config.EMBEDDING_MIGRATION_DIMENSIONS})' if config.EMBEDDING_MIGRATION_DIMENSIONS else ''}"
+        for column in MIGRATION_VECTOR_COLUMNS.values()
+    ],
+    # Vector indexes need fixed dimensions, so the next columns are only indexed once EMBEDDING_MIGRATION_DIMENSIONS is set
+    *[
+        f"ALTER TABLE {ISSUE_TABLE_NAME} ADD VECTOR INDEX IF NOT EXISTS vec_idx_{column}_cosine ((VEC_COSINE_DISTANCE({column}))) USING HNSW"
+        for column in MIGRATION_VECTOR_COLUMNS.values()
+        if config.EMBEDDING_MIGRATION_DIMENSIONS
+    ],
+    # Full-text indexes are only available on some TiDB Cloud clusters, so only created for the hybrid search mode
+    *[
+        f"ALTER TABLE {ISSUE_TABLE_NAME} ADD FULLTEXT INDEX IF NOT EXISTS fts_idx_{column} ({column}) "
+        f"WITH PARSER MULTILINGUAL ADD_COLUMNAR_REPLICA_ON_DEMAND"
+        for column in LEXICAL_COLUMNS
+        if config.SEARCH_MODE == "hybrid"
+    ],
+    # Compact first-pass columns and their indexes only exist in "truncated" mode
+    *[
+        statement
+        for column in compact_columns().values()
+        for statement in (
+            f"ALTER TABLE {ISSUE_TABLE_NAME} ADD COLUMN IF NOT EXISTS {column} VECTOR({config.COMPACT_VECTOR_DIMENSIONS})",
+            f"ALTER TABLE {ISSUE_TABLE_NAME} ADD VECTOR INDEX IF NOT EXISTS vec_idx_{column}_cosine ((VEC_COSINE_DISTANCE({column}))) USING HNSW",
+        )
+    ],
+]
+
+
+class TiDBIssueStore(IssueStore):
+    """
+    Issues stored in TiDB Serverless through pytidb, searched with TiDB vector indexes.
+    """
+
+    def __init__(self):
+        if base.db is None:
+            raise RuntimeError("TiDB is not connected, STORAGE_BACKEND must be 'tidb' to use the TiDB store")
+        self.db = base.db
+        self._table = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self.db.open_table(ISSUE_TABLE_NAME)
+        return self._table
+
+    def init_schema(self):
+        for table_name, table_model in table_models:
+            if not self.db.has_table(table_name):
+                table = self.db.create_table(schema=table_model)
+                if table:
+                    logger.info(f"Table {table_name} created")
+            else:
+                logger.info(f"Table {table_name} already exists")
+
+        for statement in SCHEMA_MIGRATIONS:
+            self.db.execute(statement, raise_error=True)
+        logger.info(f"Applied {len(SCHEMA_MIGRATIONS)} schema migrations")
+
+    def get(self, github_issue_id: int) -> Optional[Issue]:
+        return self.table.get(github_issue_id)
+
+    def get_fields(self, github_issue_id: int, fields: List[str]) -> Optional[Dict]:
+        unknown_fields = set(fields) - PROJECTABLE_FIELDS
+        if unknown_fields:
+            raise ValueError(f"Cannot project fields: {sorted(unknown_fields)}")
+        rows = self.db.query(
+            f"SELECT {', '.join(fields)} FROM {ISSUE_TABLE_NAME} WHERE github_issue_id = :github_issue_id",
+            {"github_issue_id": github_issue_id},
+        ).to_list()
+        if not rows:
+            return None
+        row = rows[0]
+        for field in JSON_FIELDS:
+            if isinstance(row.get(field), str):
+                row[field] = json.loads(row[field])
+        return row
+
+    def insert(self, issue: Issue):
+        self.table.insert(issue)
+
+    def bulk_insert(self, issues: List[Issue]):
+        # Table.bulk_insert would auto-embed missing vectors, add the rows to a session directly
+        with self.db.session() as session:
+            session.add_all(issues)
+
+    def existing_ids(self, github_issue_ids: Iterable[int]) -> Set[int]:
+        github_issue_ids = list(github_issue_ids)
+        if not github_issue_ids:
+            return set()
+        params = {f"id_{i}": github_issue_id for i, github_issue_id in enumerate(github_issue_ids)}
+        rows = self.db.query(
+            f"SELECT github_issue_id FROM {ISSUE_TABLE_NAME} WHERE github_issue_id IN ({', '.join(f':{name}' for name in params)})",
+            params,
+        ).to_list()
+        return {row["github_issue_id"] for row in rows}
+
+    def update(self, values: Dict, filters: Dict):
+        self.table.update(values, filters)
+
+    def delete(self, filters: Dict):
+        self.table.delete(filters)
+
+    def query(self, filters: Dict, limit: int) -> List[Dict]:
+        return self.table.query(filters=filters, limit=limit).to_list()
+
+    def scan(self, after_id: Optional[int], limit: int, fields: Optional[List[str]] = None, filters: Optional[Dict] = None) -> List[Dict]:
+        filters = dict(filters or {})
+        if after_id is not None:
+            filters["github_issue_id"] = {"$gt": after_id}
+        if fields is None:
+            return self.table.query(filters=filters or None, order_by="github_issue_id", limit=limit).to_list()
+
+        unknown_fields = set(fields) - PROJECTABLE_FIELDS
+        if unknown_fields:
+            raise ValueError(f"Cannot project fields: {sorted(unknown_fields)}")
+        columns = Issue.__table__.columns
+        stmt = (
+            select(*[columns[field] for field in fields])
+            .where(*build_filter_clauses(filters, columns))
+            .order_by(columns["github_issue_id"])
+            .limit(limit)
+        )
+        with self.db.session() as session:
+            return [dict(row) for row in session.execute(stmt).mappings().all()]
+
+    def get_setting(self, name: str) -> Optional[str]:
+        rows = self.db.query(f"SELECT value FROM {SETTINGS_TABLE_NAME} WHERE name = :name", {"name": name}).to_list()
+        return rows[0]["value"] if rows else None
+
+    def set_setting(self, name: str, value: str):
+        self.db.execute(
+            f"INSERT INTO {SETTINGS_TABLE_NAME} (name, value) VALUES (:name, :value) ON DUPLICATE KEY UPDATE value = VALUES(value)",
+            {"name": name, "value": value},
+            raise_error=True,
+        )
+
+    def try_acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        # Expiry is computed by TiDB, so replicas with skewed clocks agree on it
+        params = {"name": name, "owner": owner, "ttl": int(ttl_seconds * 1_000_000)}
+        inserted = self.db.execute(
+            f"INSERT IGNORE INTO {LEASES_TABLE_NAME} (name, owner, expires_at) VALUES (:name, :owner, NOW(6) + INTERVAL :ttl MICROSECOND)",
+            params,
+            raise_error=True,
+        )
+        if inserted.rowcount:
+            return True
+        taken_over = self.db.execute(
+            f"UPDATE {LEASES_TABLE_NAME} SET owner = :owner, expires_at = NOW(6) + INTERVAL :ttl MICROSECOND "
+            f"WHERE name = :name AND expires_at < NOW(6)",
+            params,
+            raise_error=True,
+        )
+        return taken_over.rowcount > 0
+
+    def release_lease(self, name: str, owner: str, keep_seconds: Optional[float] = None):
+        params = {"name": name, "owner": owner}
+        if keep_seconds:
+            self.db.execute(
+                f"UPDATE {LEASES_TABLE_NAME} SET expires_at = NOW(6) + INTERVAL :keep MICROSECOND WHERE name = :name AND owner = :owner",
+                {**params, "keep": int(keep_seconds * 1_000_000)},
+                raise_error=True,
+            )
+        else:
+            self.db.execute(f"DELETE FROM {LEASES_TABLE_NAME} WHERE name = :name AND owner = :owner", params, raise_error=True)
+
+    def purge_expired_leases(self) -> int:
+        return self.db.execute(f"DELETE FROM {LEASES_TABLE_NAME} WHERE expires_at < NOW(6)", raise_error=True).rowcount
+
+    def search(
+        self,
+        query_vectors: Dict[str, list],
+        limit_per_field: int = config.RETRIEVAL_LIMIT,
+        limit: Optional[int] = None,
+        distance_threshold: float = config.MIN_DISTANCE,
+        fields: Optional[List[str]] = None,
+        **filters,
+    ) -> List[Dict]:
+        return search_issues_by_vectors(
+            query_vectors,
+            limit_per_field=limit_per_field,
+            limit=limit,
+            distance_threshold=distance_threshold,
+            fields=fields,
+            **filters,
+        )
+
+    def lexical_search(self, query: str, limit: int, **filters) -> List[Dict]:
+        if not query:
+            return []
+        return search_issues_by_text(query, limit, **filters)
@@ -0,0 +1,108 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from backend import config
+from backend.model.store import IssueStore
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+HOT_TIER = "hot"
+COLD_TIER = "cold"
+
+_stats = {
+    "searches": 0,
+    "answered_by_hot_tier": 0,
+    "tiers": {tier: {"searches": 0, "searches_with_hits": 0, "hits": 0} for tier in (HOT_TIER, COLD_TIER)},
+}
+_stats_lock = threading.Lock()
+
+
+def hot_tier_cutoff() -> datetime:
+    """
+    Issues updated since this (naive UTC) datetime are in the hot tier, as are open issues.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=config.SEARCH_HOT_TIER_DAYS)
+
+
+def _record(tier: str, results: List[Dict]):
+    with _stats_lock:
+        stats = _stats["tiers"][tier]
+        stats["searches"] += 1
+        stats["searches_with_hits"] += int(bool(results))
+        stats["hits"] += len(results)
+
+
+def tiered_search(
+    store: IssueStore,
+    query_vectors: Dict[str, list],
+    limit_per_field: int = config.RETRIEVAL_LIMIT,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    **filters,
+) -> List[Dict]:
+    """
+    Search the hot tier (open issues and issues updated in the last SEARCH_HOT_TIER_DAYS)
+    first, and the cold tier (all other issues) only if fewer than SEARCH_HOT_TIER_MIN_HITS
+    results fall within the distance threshold. A plain store search if SEARCH_TIERED is off.
+
+    Args:
+        store: Issue store to search
+        query_vectors: Vector column name -> query vector
+        limit_per_field: Number of nearest neighbours taken from each vector column, per tier
+        limit: Total number of results
+        fields: Row columns to return, None for whole rows
+        **filters: Metadata filters, see IssueStore.search
+
+    Returns:
+        Same rows as IssueStore.search, with '_tier' set when tiered
+    """
+    if not config.SEARCH_TIERED:
+        return store.search(query_vectors, limit_per_field=limit_per_field, limit=limit, fields=fields, **filters)
+
+    cutoff = hot_tier_cutoff()
+    with _stats_lock:
+        _stats["searches"] += 1
+
+    results = store.search(query_vectors, limit_per_field=limit_per_field, limit=limit, fields=fields, hot_since=cutoff, **filters)
+    _record(HOT_TIER, results)
+    for result in results:
+        result["_tier"] = HOT_TIER
+    if len(results) >= config.SEARCH_HOT_TIER_MIN_HITS or (limit is not None and len(results) >= limit):
+        with _stats_lock:
+            _stats["answered_by_hot_tier"] += 1
+        return results
+
+    cold_results = store.search(query_vectors, limit_per_field=limit_per_field, limit=limit, fields=fields, cold_before=cutoff, **filters)
+    _record(COLD_TIER, cold_results)
+    logger.debug(f"Hot tier returned {len(results)} results, cold tier {len(cold_results)}")
+    for result in cold_results:
+        result["_tier"] = COLD_TIER
+    results.extend(cold_results)
+
+    # Open issues first and closed ones last, each group by distance, as within a tier
+    results.sort(key=lambda r: (r["state"] != "open", r["state"] == "closed", r["_distance"]))
+    return results[:limit] if limit is not None else results
+
+
+def get_tier_metrics() -> Dict:
+    """
+    Tiered search counters since process start: how often the hot tier answered alone, and
+    per tier how many searches found anything. Tune SEARCH_HOT_TIER_DAYS with these.
+    """
+    with _stats_lock:
+        tiers = {
+            tier: {**stats, "hit_rate": stats["searches_with_hits"] / stats["searches"] if stats["searches"] else 0.0}
+            for tier, stats in _stats["tiers"].items()
+        }
+        searches = _stats["searches"]
+        answered = _stats["answered_by_hot_tier"]
+    return {
+        "enabled": config.SEARCH_TIERED,
+        "hot_tier_days": config.SEARCH_HOT_TIER_DAYS,
+        "searches": searches,
+        "answered_by_hot_tier": answered,
+        "hot_tier_answer_rate": answered / searches if searches else 0.0,
+        "tiers": tiers,
+    }
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from typing import Dict, NamedTuple
+
+from backend import config
+from backend.model.embedding import (
+    MIGRATION_VECTOR_COLUMNS,
+    PreprocessedEmbeddingFunction,
+    body_embedding_function,
+    get_migration_embedding_functions,
+    text_embedding_function,
+    title_embedding_function,
+)
+from backend.model.store import get_issue_store
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATION_STATE_SETTING = "embedding_migration"
+
+# Search re-reads the migration state this often, so every replica switches within this delay
+SEARCH_STATE_CACHE_SECONDS = 10
+
+_cached_vector_set = None
+_cached_at = 0.0
+_cache_lock = threading.Lock()
+
+
+class VectorSet(NamedTuple):
+    """
+    Embedding model and the vector columns holding its vectors, used together by one search.
+    """
+    model_name: str
+    text_function: PreprocessedEmbeddingFunction
+    title_function: PreprocessedEmbeddingFunction
+    body_function: PreprocessedEmbeddingFunction
+    columns: Dict[str, str]  # Logical vector field (title_vec / body_vec) -> column
+
+
+PRIMARY_VECTOR_SET = VectorSet(
+    model_name=config.EMBEDDING_MODEL,
+    text_function=text_embedding_function,
+    title_function=title_embedding_function,
+    body_function=body_embedding_function,
+    columns={"title_vec": "title_vec", "body_vec": "body_vec"},
+)
+
+
+def load_migration_state(store=None) -> Dict:
+    """
+    Get the persisted state of the embedding migration, {} if none was started.
+    """
+    value = (store or get_issue_store()).get_setting(MIGRATION_STATE_SETTING)
+    return json.loads(value) if value else {}
+
+
+def save_migration_state(state: Dict, store=None):
+    (store or get_issue_store()).set_setting(MIGRATION_STATE_SETTING, json.dumps(state))
+
+
+def _resolve_vector_set() -> VectorSet:
+    functions = get_migration_embedding_functions()
+    if functions is None:
+        return PRIMARY_VECTOR_SET
+
+    state = load_migration_state()
+    if state.get("status") != "switched" or state.get("model") != config.EMBEDDING_MIGRATION_MODEL:
+        return PRIMARY_VECTOR_SET
+
+    text_function, title_function, body_function = functions
+    return VectorSet(
+        model_name=config.EMBEDDING_MIGRATION_MODEL,
+        text_function=text_function,
+        title_function=title_function,
+        body_function=body_function,
+        columns=dict(MIGRATION_VECTOR_COLUMNS),
+    )
+
+
+def get_search_vector_set() -> VectorSet:
+    """
+    Get the vector set searches should use: the migration model's once its migration has
+    switched over, the primary one otherwise. The whole set changes at once, so a search
+    never embeds its query with one model and compares it to the other model's vectors.
+    """
+    global _cached_vector_set, _cached_at
+    with _cache_lock:
+        if _cached_vector_set is None or time.monotonic() - _cached_at > SEARCH_STATE_CACHE_SECONDS:
+            try:
+                _cached_vector_set = _resolve_vector_set()
+            except Exception as e:
+                logger.error(f"Failed to read the embedding migration state: {str(e)}")
+                if _cached_vector_set is None:
+                    _cached_vector_set = PRIMARY_VECTOR_SET
+            _cached_at = time.monotonic()
+        return _cached_vector_set
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark compact vector storage against the full-precision baseline.
+
+Loads stored full vectors from the storage backend, uses a sample of them as queries and
+reports, for each compact representation, recall@k of "first pass + exact re-rank"
+against exact full-precision search, together with the bytes stored per vector.
+No embedding calls are made.
+
+Usage:
+    python -m backend.tool.bench_compact_vectors
+    python -m backend.tool.bench_compact_vectors --column body_vec --limit 20000 --queries 500 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.model.compact_vectors import quantize_float16, quantize_int8
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def load_vectors(column: str, limit: int) -> np.ndarray:
+    """
+    Load up to limit non-null vectors of the column from the configured storage backend.
+    """
+    from backend.model.store import get_issue_store
+
+    rows = get_issue_store().query(filters={column: {"$ne": None}}, limit=limit)
+    return np.asarray([row[column] for row in rows], dtype=np.float32)
+
+
+def build_variants(vectors: np.ndarray, dimensions: list[int]) -> dict:
+    """
+    Build the first-pass representations to compare, keyed by name: (matrix, bytes per vector).
+    """
+    full_dimensions = vectors.shape[1]
+    variants = {}
+    for dims in dimensions:
+        if dims < full_dimensions:
+            variants[f"truncated-{dims}"] = (_normalize(vectors[:, :dims]), dims * 4)
+    variants["float16"] = (_normalize(quantize_float16(vectors)), full_dimensions * 2)
+    variants["int8"] = (_normalize(np.stack([quantize_int8(v) for v in vectors])), full_dimensions + 4)
+    return variants
+
+
+def recall_at_k(full: np.ndarray, first_pass: np.ndarray, query_ids: np.ndarray, k: int, candidate_factor: int) -> float:
+    """
+    Recall@k of first-pass search on first_pass followed by exact re-rank on full.
+    """
+    hits = 0
+    for query_id in query_ids:
+        exact_scores = full @ full[query_id]
+        exact_scores[query_id] = -np.inf
+        expected = set(np.argpartition(-exact_scores, k)[:k])
+
+        approx_scores = first_pass @ first_pass[query_id]
+        approx_scores[query_id] = -np.inf
+        num_candidates = min(k * candidate_factor, len(approx_scores) - 1)
+        candidates = np.argpartition(-approx_scores, num_candidates)[:num_candidates]
+        reranked = candidates[np.argsort(-exact_scores[candidates])][:k]
+
+        hits += len(expected.intersection(reranked))
+    return hits / (len(query_ids) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact vector storage recall against full-precision search")
+    parser.add_argument("--column", default="title_vec", choices=["title_vec", "body_vec"])
+    parser.add_argument("--limit", type=int, default=10000, help="Number of stored vectors to load")
+    parser.add_argument("--queries", type=int, default=200, help="Number of stored vectors used as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--candidate-factor", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[64, 128, 256, 512])
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.column, args.limit)
+    if len(vectors) <= args.k:
+        print(f"Not enough vectors in {args.column} to benchmark (found {len(vectors)})")
+        return
+
+    full = _normalize(vectors)
+    rng = np.random.default_rng(0)
+    query_ids = rng.choice(len(full), size=min(args.queries, len(full)), replace=False)
+
+    print(f"Column: {args.column}, vectors: {len(full)}, dimensions: {full.shape[1]}, queries: {len(query_ids)}, k: {args.k}")
+    print(f"Baseline full-precision float32: {full.shape[1] * 4} bytes/vector")
+    print("-" * 80)
+    print(f"{'variant':<16}{'bytes/vector':>14}{'candidates':>12}{'recall@k':>12}{'ms/query':>12}")
+
+    for name, (first_pass, bytes_per_vector) in build_variants(vectors, args.dimensions).items():
+        for factor in args.candidate_factor:
+            start = time.perf_counter()
+            recall = recall_at_k(full, first_pass, query_ids, args.k, factor)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(query_ids)
+            print(f"{name:<16}{bytes_per_vector:>14}{args.k * factor:>12}{recall:>12.4f}{elapsed_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
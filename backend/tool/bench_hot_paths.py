@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the per-event pure-Python hot paths.
+
+Runs each hot path over synthetic payloads of realistic sizes (the load test's delivery
+generator) and reports ops/sec, time per op and allocations per op (peak traced bytes of
+one call, measured separately so tracing does not skew the timings). Results can be saved
+as a baseline and later runs compared against it, failing when a benchmark got slower than
+--max-regression, so per-event CPU regressions are caught before deploy.
+
+No network or database is used: embeddings come from the in-process hashing vectorizer.
+Log records are dropped while timing, so log I/O is not measured.
+
+Usage:
+    python -m backend.tool.bench_hot_paths
+    python -m backend.tool.bench_hot_paths --save bench-baseline.json
+    python -m backend.tool.bench_hot_paths --baseline bench-baseline.json --max-regression 0.15
+    python -m backend.tool.bench_hot_paths --only from_webhook_payload,fingerprint
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from backend.tool.loadtest import DeliveryGenerator, parse_mix
+
+
+def _use_offline_embedding():
+    # Importing the Issue model probes the embedding model for its dimensions, use the
+    # hashing vectorizer and local storage before backend.config reads the environment
+    os.environ.update({
+        "STORAGE_BACKEND": "local",
+        "EMBEDDING_MODEL": "hashing/256",
+        "EMBEDDING_BATCH_ENABLED": "false",
+    })
+
+
+def build_benchmarks(sample_size: int) -> Dict[str, Callable[[], object]]:
+    """
+    Build the benchmarks, keyed by name. Each callable runs the hot path once over the next
+    synthetic input, cycling through sample_size inputs prepared up front.
+    """
+    from github import Github
+    from github.Issue import Issue as GithubIssue
+
+    from backend.model import init_database, local_store
+    from backend.model.issue import Issue
+    from backend.tool import send_issue_comment
+
+    generator = DeliveryGenerator(
+        parse_mix("opened=1"), repository="bench/repo", installation_id=1, reply_label="tiara",
+        reply_label_rate=0.3, issue_id_start=10 ** 9,
+    )
+    payloads = [generator.next_delivery() for _ in range(sample_size)]
+    issues = [Issue.from_webhook_payload(payload) for payload in payloads]
+
+    # REST representation of the same issues, as PyGithub receives them when listing
+    github = Github()
+    raw_issues = [
+        {**payload["issue"], "repository": {"id": payload["repository"]["id"], "full_name": payload["repository"]["full_name"]}}
+        for payload in payloads
+    ]
+    github_issues = [github.create_from_raw_data(GithubIssue, raw) for raw in raw_issues]
+
+    # Stored values as read back for the diff: same issue, one edited body and a bumped updated_at
+    stored_values = []
+    for issue in issues:
+        values = {field: getattr(issue, field) for field in init_database.DIFF_FIELDS}
+        values["body"] = values["body"][: len(values["body"]) // 2]
+        values["updated_at"] = (issue.updated_at - timedelta(hours=1)).replace(tzinfo=None)
+        stored_values.append(values)
+    value_pairs = [
+        (value, getattr(issue, field))
+        for values, issue in zip(stored_values, issues)
+        for field, value in values.items()
+    ]
+
+    # Per-field hits of a two-column search and the rows they resolve to
+    field_hits = [
+        {
+            column: {random.randint(1, 40): random.uniform(0.05, 0.9) for _ in range(20)}
+            for column in ("title_vec", "body_vec")
+        }
+        for _ in range(sample_size)
+    ]
+    rows = {issue_id: {"github_issue_id": issue_id, "state": random.choice(["open", "closed", "open"])} for issue_id in range(1, 41)}
+
+    similar_issues = [
+        [
+            {"html_url": f"https://github.com/bench/repo/issues/{n}", "_distance": random.uniform(0.05, 0.7),
+             "_search_field": random.choice(["title_vec", "body_vec"])}
+            for n in range(20)
+        ]
+        for _ in range(sample_size)
+    ]
+
+    def cycle(inputs: List):
+        index = [0]
+
+        def next_input():
+            index[0] = (index[0] + 1) % len(inputs)
+            return inputs[index[0]]
+        return next_input
+
+    next_payload, next_github_issue, next_issue = cycle(payloads), cycle(github_issues), cycle(issues)
+    # The reply label check only reads labels of issues that have some
+    next_labeled_issue = cycle([issue for issue in issues if issue.labels] or issues)
+    next_diff = cycle(list(zip(stored_values, issues)))
+    next_pairs, next_hits, next_similar = cycle(value_pairs), cycle(field_hits), cycle(similar_issues)
+
+    def dedup_and_sort():
+        best = local_store._deduplicate_by_distance(next_hits(), 0.7)
+        results = [{**rows[issue_id], "_distance": distance, "_search_field": column} for issue_id, (distance, column) in best.items()]
+        return local_store._order_by_state_and_distance(results)
+
+    return {
+        "from_webhook_payload": lambda: Issue.from_webhook_payload(next_payload()),
+        "from_github_issue": lambda: Issue.from_github_issue(next_github_issue()),
+        "diff_changed_fields": lambda: init_database.diff_and_get_changed_fields(*next_diff()),
+        "values_are_different": lambda: init_database._values_are_different(*next_pairs()),
+        "dedup_and_sort": dedup_and_sort,
+        "build_comment_content": lambda: send_issue_comment._build_comment_content(next_similar()),
+        "get_labels_list": lambda: next_labeled_issue().get_labels_list(),
+        "fingerprint": lambda: next_issue().compute_content_fingerprint(),
+    }
+
+
+def time_benchmark(fn: Callable[[], object], min_seconds: float, repeats: int) -> Dict:
+    """
+    Time fn in batches sized to last about min_seconds, returning the best of repeats runs.
+    """
+    for _ in range(100):
+        fn()
+
+    count = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds / 10:
+            break
+        count *= 2
+    count = max(1, int(count * (min_seconds / max(elapsed, 1e-9))))
+
+    per_op = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        per_op.append((time.perf_counter() - start) / count)
+    best = min(per_op)
+    return {
+        "ops_per_second": 1 / best,
+        "us_per_op": best * 1e6,
+        "us_per_op_median": statistics.median(per_op) * 1e6,
+        "iterations": count * repeats,
+    }
+
+
+def measure_allocations(fn: Callable[[], object], samples: int = 50) -> Dict:
+    """
+    Median peak of traced memory during one call.
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+            result = fn()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            del result
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes_per_op": int(statistics.median(peaks))}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result["ops_per_second"] / baseline[name]["ops_per_second"]
+            result["vs_baseline"] = ratio
+            if ratio < 1 - max_regression:
+                regressions.append(f"{name}: {ratio:.0%} of baseline ops/sec")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict]):
+    print()
+    print(f"{'benchmark':<24} {'ops/sec':>12} {'us/op':>9} {'median':>9} {'peak KiB/op':>12} {'vs baseline':>12}")
+    for name, result in results.items():
+        vs_baseline = f"{result['vs_baseline']:.0%}" if "vs_baseline" in result else "-"
+        print(
+            f"{name:<24} {result['ops_per_second']:>12,.0f} {result['us_per_op']:>9.2f} {result['us_per_op_median']:>9.2f} "
+            f"{result['peak_bytes_per_op'] / 1024:>12.1f} {vs_baseline:>12}"
+        )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark the per-event hot paths")
+    parser.add_argument("--only", default=None, help="Comma separated benchmark names")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Approximate duration of each timed run")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark, the best one is reported")
+    parser.add_argument("--sample-size", type=int, default=200, help="Synthetic inputs cycled through")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", default=None, help="Write the results as a baseline to this file")
+    parser.add_argument("--baseline", default=None, help="Compare against a baseline written with --save")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail if a benchmark's ops/sec drops more than this fraction below the baseline")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    _use_offline_embedding()
+    benchmarks = build_benchmarks(args.sample_size)
+
+    if args.only:
+        names = [name.strip() for name in args.only.split(",")]
+        unknown = set(names) - set(benchmarks)
+        if unknown:
+            parser.error(f"Unknown benchmarks: {sorted(unknown)}, available: {sorted(benchmarks)}")
+        benchmarks = {name: benchmarks[name] for name in names}
+
+    results = {}
+    logging.disable(logging.INFO)
+    try:
+        for name, fn in benchmarks.items():
+            results[name] = {**time_benchmark(fn, args.min_seconds, args.repeats), **measure_allocations(fn)}
+    finally:
+        logging.disable(logging.NOTSET)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.max_regression)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"created_at": datetime.now(timezone.utc).isoformat(), "python": sys.version, "results": results}, f, indent=2)
+
+    if regressions:
+        print("Regressions beyond the allowed threshold:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
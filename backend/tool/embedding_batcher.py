@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.tool.logger import get_logger
+from backend.tool.resilience import DeadlineExceeded, check_deadline, current_deadline, deadline_scope, remaining_seconds
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Collect embedding requests from concurrent callers for a short window and send
+    them to the provider as one batched request.
+
+    A batch is flushed once it holds max_batch_size texts or its oldest text has
+    waited max_wait_ms. Each caller gets back the vectors for its own texts. The
+    provider call runs under the latest time budget of the callers in the batch,
+    while each caller waits no longer than its own.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[list[float]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5,
+        max_concurrency: int = 4,
+        name: str = "embedding",
+    ):
+        self._embed_batch = embed_batch
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._name = name
+
+        self._condition = threading.Condition()
+        self._pending: List[Tuple[str, Future, Optional[float]]] = []
+        self._oldest_at = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{name}-batch")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name=f"{name}-batcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for embedding, under the caller's time budget, and return a future
+        resolving to its vector.
+        """
+        future = Future()
+        with self._condition:
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            self._pending.append((text, future, current_deadline()))
+            self._condition.notify()
+        return future
+
+    def embed(self, texts: List[str]) -> List[list[float]]:
+        """
+        Embed texts through the shared batch, blocking until all vectors are ready or the
+        caller's time budget runs out.
+        """
+        check_deadline(self._name)
+        futures = [self.submit(text) for text in texts]
+        try:
+            return [future.result(timeout=remaining_seconds()) for future in futures]
+        except FutureTimeoutError:
+            raise DeadlineExceeded(self._name)
+
+    def _take_batch(self) -> List[Tuple[str, Future, Optional[float]]]:
+        with self._condition:
+            while True:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+
+                remaining = self._oldest_at + self._max_wait - time.monotonic()
+                if len(self._pending) >= self._max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(timeout=remaining)
+
+            batch = self._pending[:self._max_batch_size]
+            self._pending = self._pending[self._max_batch_size:]
+            self._oldest_at = time.monotonic() if self._pending else None
+            return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._take_batch()
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future, Optional[float]]]):
+        # Callers out of time have given up, embedding their texts would only delay the others
+        now = time.monotonic()
+        for _, future, deadline in batch:
+            if deadline is not None and deadline <= now:
+                future.set_exception(DeadlineExceeded(self._name))
+        batch = [(text, future, deadline) for text, future, deadline in batch if deadline is None or deadline > now]
+        if not batch:
+            return
+
+        # Identical texts (e.g. concurrent redeliveries) are embedded once
+        unique_texts: Dict[str, int] = {}
+        for text, _, _ in batch:
+            unique_texts.setdefault(text, len(unique_texts))
+
+        # The provider call runs until the latest caller gives up (unbounded if one has no budget),
+        # each caller still stops waiting at its own deadline in embed()
+        deadlines = [deadline for _, _, deadline in batch]
+        try:
+            with deadline_scope(None if None in deadlines else max(deadlines)):
+                vectors = self._embed_batch(list(unique_texts))
+            logger.debug(f"Embedded {len(unique_texts)} texts for {len(batch)} requests in one {self._name} call")
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for text, future, _ in batch:
+            future.set_result(vectors[unique_texts[text]])
+
+
+_batchers: Dict[Hashable, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_embedding_batcher(
+    key: Hashable,
+    embed_batch: Callable[[List[str]], List[list[float]]],
+    name: Optional[str] = None,
+    **kwargs,
+) -> EmbeddingBatcher:
+    """
+    Get the process-wide batcher for key, creating it on first use.
+
+    Args:
+        key: Identifies the provider settings of embed_batch, texts sharing a key are embedded together
+        embed_batch: Embeds a list of texts, called with the merged batches
+        name: Name used in logs, defaults to str(key)
+    """
+    with _batchers_lock:
+        if key not in _batchers:
+            _batchers[key] = EmbeddingBatcher(embed_batch, name=name or str(key), **kwargs)
+        return _batchers[key]
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Evaluate retrieval quality against cost, using issues closed as duplicates as ground truth.
+
+Every stored issue that was marked as a duplicate of another stored issue of the same
+repository is a query, and the issue it duplicates is the answer the reply should show.
+Each query runs through search_similar_issues for every combination of --modes,
+--retrieval-limits and --min-distances (queries in parallel), then the results are scored
+for every --reply-limits and --similar-distances:
+
+    recall@k       queries whose duplicate is among the k results a reply shows
+    precision      shown results that are the duplicate
+    answered       queries with at least one result, i.e. that get a reply
+    sim. prec.     results marked "Similar" (closer than the cutoff) that are the duplicate
+    sim. recall    queries whose duplicate is shown and marked "Similar"
+    p50/p95 ms     search latency per query
+    tokens/query   estimated embedding tokens a new issue's search sends
+
+Queries reuse their stored vectors, so the evaluation itself sends no embedding requests
+and the latencies do not include embedding. Duplicate pairs are read from GitHub's
+GraphQL API (marked-as-duplicate events) and cached in --pairs.
+
+The cheapest setting reaching --recall-target (and --precision-target) is printed last.
+
+Usage:
+    python -m backend.tool.eval_retrieval --pairs duplicates.json
+    python -m backend.tool.eval_retrieval --repo owner/name --pairs duplicates.json --recall-target 0.8
+    python -m backend.tool.eval_retrieval --modes vector,hybrid --retrieval-limits 5,10,20 \\
+        --min-distances 0.5,0.6,0.7 --reply-limits 3,5,10 --similar-distances 0.2,0.3
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.model.embedding import CHARS_PER_TOKEN
+from backend.model.issue import Issue
+from backend.model.store import get_issue_store
+from backend.model.vector_migration import get_search_vector_set
+from backend.tool.get_issues import get_repo_names
+from backend.tool.graphql_issues import iter_duplicate_pairs
+from backend.tool.logger import get_logger
+from backend.tool.send_issue_comment import search_similar_issues
+
+logger = get_logger(__name__)
+
+
+def _parse_list(value: str, cast) -> List:
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def load_pairs(path: Optional[str], repo_names: Optional[List[str]]) -> List[Tuple[int, int]]:
+    """
+    Get the (duplicate issue ID, canonical issue ID) pairs: from path if it exists, otherwise
+    from GitHub for repo_names (all served repositories by default), saved to path if given.
+    """
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return [(pair["duplicate"], pair["canonical"]) for pair in json.load(f)]
+
+    pairs = []
+    for repo_name in repo_names or get_repo_names():
+        repo_pairs = list(iter_duplicate_pairs(repo_name))
+        logger.info(f"Found {len(repo_pairs)} duplicate issues in {repo_name}")
+        pairs.extend(repo_pairs)
+    if path:
+        with open(path, "w") as f:
+            json.dump([{"duplicate": duplicate, "canonical": canonical} for duplicate, canonical in pairs], f, indent=2)
+    return pairs
+
+
+def load_queries(pairs: List[Tuple[int, int]]) -> List[Tuple[Issue, int]]:
+    """
+    Load the stored duplicate issues (with their vectors) of the pairs whose canonical issue
+    is stored in the same repository, the only ones a search can answer.
+    """
+    store = get_issue_store()
+    queries = []
+    for duplicate_id, canonical_id in pairs:
+        issue = store.get(duplicate_id)
+        canonical = store.get_fields(canonical_id, ["repository_id"])
+        if issue is not None and canonical is not None and canonical["repository_id"] == issue.repository_id:
+            queries.append((issue, canonical_id))
+    logger.info(f"{len(queries)} of {len(pairs)} duplicate pairs are stored and answerable")
+    return queries
+
+
+def estimate_query_tokens(issue: Issue) -> int:
+    """
+    Estimated tokens embedded by the search for a new issue: its prepared title and body.
+    """
+    vector_set = get_search_vector_set()
+    texts = [vector_set.title_function.prepare_text(issue.title), vector_set.body_function.prepare_text(issue.body)]
+    return sum(len(text) for text in texts if text) // CHARS_PER_TOKEN
+
+
+def run_setting(queries: List[Tuple[Issue, int]], mode: str, retrieval_limit: int, min_distance: float, workers: int) -> List[Dict]:
+    """
+    Search every query with one setting, in parallel.
+
+    Returns:
+        Per query: the result IDs and distances best first, the canonical ID and the latency
+    """
+    def search(query: Tuple[Issue, int]) -> Dict:
+        issue, canonical_id = query
+        start = time.perf_counter()
+        results = search_similar_issues(issue, limit_per_field=retrieval_limit, distance_threshold=min_distance, search_mode=mode)
+        return {
+            "results": [(result["github_issue_id"], result.get("_distance", 0.0)) for result in results],
+            "canonical_id": canonical_id,
+            "seconds": time.perf_counter() - start,
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(search, queries))
+
+
+def score(runs: List[Dict], query_tokens: List[int], reply_limit: int, similar_distance: float) -> Dict:
+    """
+    Quality and cost of one setting's runs when replies show reply_limit results and mark
+    those closer than similar_distance as "Similar".
+    """
+    hits = shown = answered = similar_shown = similar_hits = 0
+    for run in runs:
+        results = run["results"][:reply_limit]
+        shown += len(results)
+        answered += bool(results)
+        for issue_id, distance in results:
+            is_hit = issue_id == run["canonical_id"]
+            hits += is_hit
+            if distance < similar_distance:
+                similar_shown += 1
+                similar_hits += is_hit
+
+    latencies = sorted(run["seconds"] for run in runs)
+    queries = len(runs)
+    return {
+        "recall": hits / queries if queries else 0.0,
+        "precision": hits / shown if shown else 0.0,
+        "answered": answered / queries if queries else 0.0,
+        "similar_precision": similar_hits / similar_shown if similar_shown else 0.0,
+        "similar_recall": similar_hits / queries if queries else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000 if latencies else 0.0,
+        "tokens_per_query": sum(query_tokens) / queries if queries else 0.0,
+    }
+
+
+def cost_key(row: Dict) -> tuple:
+    # Embedding spend first, then latency, then how much the search and reply fetch and show
+    return row["tokens_per_query"], row["p95_ms"], row["retrieval_limit"], row["reply_limit"]
+
+
+def print_results(rows: List[Dict]):
+    print()
+    print(
+        f"{'mode':<7} {'retr.':>5} {'min d.':>6} {'reply':>5} {'sim. d.':>7} {'recall@k':>8} {'precision':>9} "
+        f"{'answered':>8} {'sim. prec.':>10} {'sim. recall':>11} {'p50 ms':>8} {'p95 ms':>8} {'tokens/query':>12}"
+    )
+    for row in rows:
+        print(
+            f"{row['mode']:<7} {row['retrieval_limit']:>5} {row['min_distance']:>6.2f} {row['reply_limit']:>5} "
+            f"{row['similar_distance']:>7.2f} {row['recall']:>8.1%} {row['precision']:>9.1%} {row['answered']:>8.1%} "
+            f"{row['similar_precision']:>10.1%} {row['similar_recall']:>11.1%} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['tokens_per_query']:>12.0f}"
+        )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality against cost on closed-as-duplicate issues")
+    parser.add_argument("--repo", action="append", default=None, help="Repository to read duplicates of, repeatable (default: all served)")
+    parser.add_argument("--pairs", default=None, help="JSON file caching the duplicate pairs, read if it exists")
+    parser.add_argument("--modes", default="vector,hybrid", help="Comma separated search modes")
+    parser.add_argument("--retrieval-limits", default="5,10,20", help="Comma separated RETRIEVAL_LIMIT values")
+    parser.add_argument("--min-distances", default="0.5,0.6,0.7", help="Comma separated MIN_DISTANCE values")
+    parser.add_argument("--reply-limits", default="3,5,10", help="Comma separated REPLY_LIMIT values")
+    parser.add_argument("--similar-distances", default="0.2,0.3", help="Comma separated SIMILAR_DISTANCE values")
+    parser.add_argument("--workers", type=int, default=8, help="Queries searched in parallel")
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate at most this many queries")
+    parser.add_argument("--recall-target", type=float, default=0.8)
+    parser.add_argument("--precision-target", type=float, default=0.0)
+    parser.add_argument("--save", default=None, help="Write the result rows to this JSON file")
+    args = parser.parse_args()
+
+    modes = _parse_list(args.modes, str)
+    unknown_modes = set(modes) - {"vector", "hybrid"}
+    if unknown_modes:
+        parser.error(f"Unknown search modes: {sorted(unknown_modes)}")
+
+    queries = load_queries(load_pairs(args.pairs, args.repo))[:args.limit]
+    if not queries:
+        print("No answerable duplicate pairs: store the repositories first (python -m backend.model.init_database)")
+        sys.exit(1)
+    query_tokens = [estimate_query_tokens(issue) for issue, _ in queries]
+
+    rows = []
+    searches = itertools.product(
+        modes, _parse_list(args.retrieval_limits, int), _parse_list(args.min_distances, float)
+    )
+    for mode, retrieval_limit, min_distance in searches:
+        logging.disable(logging.INFO)
+        try:
+            runs = run_setting(queries, mode, retrieval_limit, min_distance, args.workers)
+        finally:
+            logging.disable(logging.NOTSET)
+        for reply_limit, similar_distance in itertools.product(
+            _parse_list(args.reply_limits, int), _parse_list(args.similar_distances, float)
+        ):
+            rows.append({
+                "mode": mode,
+                "retrieval_limit": retrieval_limit,
+                "min_distance": min_distance,
+                "reply_limit": reply_limit,
+                "similar_distance": similar_distance,
+                **score(runs, query_tokens, reply_limit, similar_distance),
+            })
+
+    print(f"{len(queries)} queries")
+    print_results(rows)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"created_at": datetime.now(timezone.utc).isoformat(), "queries": len(queries), "rows": rows}, f, indent=2)
+
+    passing = [row for row in rows if row["recall"] >= args.recall_target and row["precision"] >= args.precision_target]
+    if not passing:
+        print(f"No setting reaches recall {args.recall_target:.0%} and precision {args.precision_target:.0%}")
+        sys.exit(1)
+    best = min(passing, key=cost_key)
+    print(
+        f"Cheapest setting reaching the targets: SEARCH_MODE={best['mode']} RETRIEVAL_LIMIT={best['retrieval_limit']} "
+        f"MIN_DISTANCE={best['min_distance']} REPLY_LIMIT={best['reply_limit']} SIMILAR_DISTANCE={best['similar_distance']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ import sys
 import os
 import jwt
 import time
-import requests
+from backend import config
+from backend.tool.http_client import get_session
 
 
 def create_jwt_token(app_id: str, private_key: str):
@@ -25,7 +26,7 @@ def create_jwt_token(app_id: str, private_key: str):
     payload = {
         'iat': now,
         'exp': now + 600,  # 10 minutes
-        'iss': int(app_id)
+        'iss': str(app_id)
     }
     
     # Create JWT token
@@ -43,7 +44,7 @@ def get_installations(app_id: str, private_key: str):
         'User-Agent': 'Tiara-GitHub-App'
     }
     
-    response = requests.get('https://api.github.com/app/installations', headers=headers)
+    response = get_session().get(f'{config.GITHUB_API_URL}/app/installations', headers=headers)
     
     if response.status_code != 200:
         raise Exception(f"Failed to get installations: {response.status_code} {response.text}")
@@ -53,9 +54,9 @@ def get_installations(app_id: str, private_key: str):
 
 if __name__ == '__main__':
     if len(sys.argv) != 3:
-        print("Usage: python get_installation_id.py <APP_ID> <PRIVATE_KEY_PATH>")
+        print("Usage: python -m backend.tool.get_installation_id <APP_ID> <PRIVATE_KEY_PATH>")
         print("\nExample:")
-        print("python get_installation_id.py 123456 /path/to/private-key.pem")
+        print("python -m backend.tool.get_installation_id 123456 /path/to/private-key.pem")
         sys.exit(1)
     
     app_id = sys.argv[1]
@@ -90,8 +91,8 @@ if __name__ == '__main__':
                 'User-Agent': 'Tiara-GitHub-App'
             }
             
-            repos_response = requests.get(
-                f'https://api.github.com/app/installations/{installation_id}/repositories',
+            repos_response = get_session().get(
+                f'{config.GITHUB_API_URL}/app/installations/{installation_id}/repositories',
                 headers=headers
             )
             
@@ -1,10 +1,23 @@
 from github import Github, GithubIntegration
 import sys
 import os
+import threading
+from datetime import datetime, timedelta, timezone
 from backend import config
+from backend.tool.http_client import get_session, install_github_transport
 
 ISSUES_PER_PAGE = 100
 
+# Refresh installation tokens this long before GitHub expires them (tokens live for 1 hour)
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+_token_cache = {}
+_repo_installations = {}
+_cache_lock = threading.Lock()
+
+# PyGithub clients share the pooled keep-alive session
+install_github_transport()
+
 def create_github_app_token(app_id: str, private_key: str, installation_id: str):
     """
     Create a GitHub App installation token using JWT.
@@ -25,30 +38,157 @@ def create_github_app_token(app_id: str, private_key: str, installation_id: str)
         private_key_content = private_key
     
     # Create GitHub integration object with private key content
-    integration = GithubIntegration(int(app_id), private_key_content)
+    integration = GithubIntegration(str(app_id), private_key_content)
     
     # Get installation access token
     installation_access_token = integration.get_access_token(int(installation_id))
     return installation_access_token.token
 
 
-def get_github_client():
+def get_github_integration() -> GithubIntegration:
+    """
+    Create a GitHub integration object authenticated as the GitHub App itself.
+    """
+    private_key = config.GITHUB_APP_PRIVATE_KEY
+    if os.path.isfile(private_key):
+        with open(private_key, 'r') as key_file:
+            private_key = key_file.read()
+    return GithubIntegration(str(config.GITHUB_APP_ID), private_key, base_url=config.GITHUB_API_URL)
+
+
+def get_installation_token(installation_id: int | str) -> str:
+    """
+    Get an installation access token, reusing a cached one until shortly before it expires.
+
+    Args:
+        installation_id: Installation ID of the GitHub App
+
+    Returns:
+        Installation access token
+    """
+    installation_id = int(installation_id)
+    now = datetime.now(timezone.utc)
+
+    with _cache_lock:
+        cached = _token_cache.get(installation_id)
+        if cached and cached[1] - TOKEN_REFRESH_MARGIN > now:
+            return cached[0]
+
+    access_token = get_github_integration().get_access_token(installation_id)
+    expires_at = access_token.expires_at or now + timedelta(hours=1)
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+    with _cache_lock:
+        _token_cache[installation_id] = (access_token.token, expires_at)
+    return access_token.token
+
+
+def remember_repo_installation(repo_name: str, installation_id: int | str):
+    """
+    Record which installation serves a repository (e.g. from a webhook's installation.id).
+    """
+    if repo_name and installation_id:
+        with _cache_lock:
+            _repo_installations[repo_name.lower()] = int(installation_id)
+
+
+def resolve_installation_id(repo_name: str | None = None) -> int:
+    """
+    Resolve the installation ID for a repository.
+
+    Looks at installations learned from webhooks first, then asks GitHub for the
+    repository's installation, and finally falls back to GITHUB_APP_INSTALLATION_ID.
+
+    Args:
+        repo_name: Repository name (e.g., "owner/repo")
+
+    Returns:
+        Installation ID
+    """
+    if repo_name:
+        with _cache_lock:
+            installation_id = _repo_installations.get(repo_name.lower())
+        if installation_id:
+            return installation_id
+
+        try:
+            owner, name = repo_name.split('/', 1)
+            installation_id = get_github_integration().get_repo_installation(owner, name).id
+            remember_repo_installation(repo_name, installation_id)
+            return installation_id
+        except Exception:
+            if not config.GITHUB_APP_INSTALLATION_ID:
+                raise
+
+    if config.GITHUB_APP_INSTALLATION_ID:
+        return int(config.GITHUB_APP_INSTALLATION_ID)
+
+    raise ValueError("Cannot resolve GitHub App installation. Please set GITHUB_APP_INSTALLATION_ID or pass a repository name.")
+
+
+def get_github_client(repo_name: str | None = None, installation_id: int | str | None = None):
     """
     Create a GitHub client using available authentication methods.
-    Uses GitHub App authentication.
-    """
-    if config.GITHUB_APP_ID and config.GITHUB_APP_PRIVATE_KEY and config.GITHUB_APP_INSTALLATION_ID:
-        print("Using GitHub App authentication...")
-        token = create_github_app_token(
-            config.GITHUB_APP_ID,
-            config.GITHUB_APP_PRIVATE_KEY,
-            config.GITHUB_APP_INSTALLATION_ID
-        )
-        return Github(token, per_page=ISSUES_PER_PAGE)
+    Uses GitHub App authentication with a per-installation token.
+
+    Args:
+        repo_name: Repository the client will act on, used to resolve the installation
+        installation_id: Installation ID, if already known (e.g. from a webhook)
+    """
+    if config.GITHUB_APP_ID and config.GITHUB_APP_PRIVATE_KEY:
+        if installation_id is None:
+            installation_id = resolve_installation_id(repo_name)
+        elif repo_name:
+            remember_repo_installation(repo_name, installation_id)
+        token = get_installation_token(installation_id)
+        return Github(token, base_url=config.GITHUB_API_URL, per_page=ISSUES_PER_PAGE)
     
     raise ValueError("No valid GitHub authentication method found.")
 
 
+def list_installation_repositories() -> list[str]:
+    """
+    List the full names of all repositories the GitHub App is installed on, across all installations.
+    """
+    repo_names = []
+    for installation in get_github_integration().get_installations():
+        headers = {
+            'Authorization': f'token {get_installation_token(installation.id)}',
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'Tiara-GitHub-App'
+        }
+        url = f'{config.GITHUB_API_URL}/installation/repositories?per_page={ISSUES_PER_PAGE}'
+        while url:
+            response = get_session().get(url, headers=headers)
+            response.raise_for_status()
+            for repo in response.json().get('repositories', []):
+                remember_repo_installation(repo['full_name'], installation.id)
+                repo_names.append(repo['full_name'])
+            url = response.links.get('next', {}).get('url')
+    return repo_names
+
+
+def get_repo_names() -> list[str]:
+    """
+    Get the repositories this deployment serves: GITHUB_REPO_NAMES (or GITHUB_REPO_NAME)
+    if configured, otherwise every repository the GitHub App is installed on.
+    """
+    if config.GITHUB_REPO_NAMES:
+        return config.GITHUB_REPO_NAMES
+    return list_installation_repositories()
+
+
+def is_pull_request(github_issue) -> bool:
+    """
+    Check whether an item of GitHub's issues listing is a pull request, from its public
+    html_url (.../pull/<number> instead of .../issues/<number>). The pull_request property
+    would fetch every real issue again: listings leave the key out for them, and PyGithub
+    completes the object on access.
+    """
+    return "/pull/" in (github_issue.html_url or "")
+
+
 def list_all_issues(repo_name: str, state: str = "all"):
     """
     List all issues from the given repository.
@@ -63,7 +203,7 @@ def list_all_issues(repo_name: str, state: str = "all"):
     if not repo_name:
         raise ValueError("Repository name is required. Please set GITHUB_REPO_NAME environment variable.")
     
-    g = get_github_client()
+    g = get_github_client(repo_name=repo_name)
     repo = g.get_repo(repo_name)
     # state: 'open', 'closed', 'all'
     issues = repo.get_issues(state=state)
@@ -86,7 +226,7 @@ def get_issues_page(repo_name: str, state: str = "all", page: int = 0):
     if not repo_name:
         raise ValueError("Repository name is required. Please set GITHUB_REPO_NAME environment variable.")
     
-    g = get_github_client()
+    g = get_github_client(repo_name=repo_name)
     repo = g.get_repo(repo_name)
     issues = repo.get_issues(state=state)
     
@@ -110,7 +250,7 @@ def get_issues_since(repo_name: str, state: str = "all", since=None):
     if not repo_name:
         raise ValueError("Repository name is required. Please set GITHUB_REPO_NAME environment variable.")
     
-    g = get_github_client()
+    g = get_github_client(repo_name=repo_name)
     repo = g.get_repo(repo_name)
     
     # Use since parameter for cursor-based pagination
@@ -0,0 +1,209 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+from backend import config
+from backend.tool.get_issues import ISSUES_PER_PAGE, get_installation_token, resolve_installation_id
+from backend.tool.http_client import call_with_retries, get_session
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Actor types carrying a numeric ID, the one REST reports as user.id
+ACTOR_FIELDS = """
+    login
+    ... on User { databaseId }
+    ... on Bot { databaseId }
+    ... on Mannequin { databaseId }
+    ... on Organization { databaseId }
+"""
+
+# Only the fields the Issue model stores. The issues connection never returns pull requests.
+# Issues are ordered by creation, which cursors page through stably while issues get updated.
+REPO_ISSUES_QUERY = f"""
+query($owner: String!, $name: String!, $first: Int!, $after: String, $since: DateTime) {{
+  rateLimit {{ cost remaining }}
+  repository(owner: $owner, name: $name) {{
+    databaseId
+    nameWithOwner
+    owner {{ login }}
+    issues(first: $first, after: $after, filterBy: {{since: $since}}, orderBy: {{field: CREATED_AT, direction: ASC}}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{
+        fullDatabaseId
+        number
+        id
+        title
+        body
+        state
+        stateReason
+        locked
+        activeLockReason
+        author {{ {ACTOR_FIELDS} }}
+        assignees(first: 10) {{ nodes {{ login databaseId }} }}
+        labels(first: 100) {{ nodes {{ name color description }} }}
+        milestone {{ number title }}
+        createdAt
+        updatedAt
+        closedAt
+        url
+        timelineItems(itemTypes: [CLOSED_EVENT], last: 1) {{ nodes {{ ... on ClosedEvent {{ actor {{ {ACTOR_FIELDS} }} }} }} }}
+      }}
+    }}
+  }}
+}}
+"""
+
+
+def graphql_url() -> str:
+    """
+    GraphQL endpoint of the configured GitHub: GITHUB_GRAPHQL_URL, or derived from GITHUB_API_URL
+    (https://api.github.com/graphql, or https://<host>/api/graphql for GitHub Enterprise Server).
+    """
+    if config.GITHUB_GRAPHQL_URL:
+        return config.GITHUB_GRAPHQL_URL
+    if config.GITHUB_API_URL.endswith("/api/v3"):
+        return config.GITHUB_API_URL[:-len("/v3")] + "/graphql"
+    return config.GITHUB_API_URL + "/graphql"
+
+
+def _headers(token: str) -> Dict[str, str]:
+    return {
+        'Authorization': f'bearer {token}',
+        'Accept': 'application/vnd.github.v3+json',
+        'User-Agent': 'Tiara-GitHub-App'
+    }
+
+
+def run_query(token: str, query: str, variables: Dict) -> Tuple[Dict, int]:
+    """
+    Run a GraphQL query, retried like other idempotent calls (the session only retries GETs).
+
+    Args:
+        token: Installation access token
+        query: GraphQL query
+        variables: Query variables
+
+    Returns:
+        (data of the response, size of the response body in bytes)
+    """
+    def post():
+        response = get_session().post(graphql_url(), json={"query": query, "variables": variables}, headers=_headers(token))
+        response.raise_for_status()
+        return response
+
+    response = call_with_retries(post, "GitHub GraphQL query")
+    payload = response.json()
+    if payload.get("errors"):
+        raise RuntimeError(f"GitHub GraphQL query failed: {[error.get('message') for error in payload['errors']]}")
+    return payload["data"], len(response.content)
+
+
+def get_milestone_ids(repo_name: str, token: str) -> Dict[int, int]:
+    """
+    Map the milestone numbers of a repository to the REST milestone IDs stored on issues,
+    which GraphQL does not expose. Repositories have few milestones, this is one or two calls.
+    """
+    milestone_ids = {}
+    url = f'{config.GITHUB_API_URL}/repos/{repo_name}/milestones?state=all&per_page={ISSUES_PER_PAGE}'
+    while url:
+        response = get_session().get(url, headers=_headers(token))
+        response.raise_for_status()
+        for milestone in response.json():
+            milestone_ids[milestone['number']] = milestone['id']
+        url = response.links.get('next', {}).get('url')
+    return milestone_ids
+
+
+def iter_repo_issue_nodes(repo_name: str, since_datetime: Optional[datetime] = None) -> Iterator[Dict]:
+    """
+    Iterate over the issues of a repository as GraphQL nodes, ISSUES_PER_PAGE per query,
+    ready for Issue.from_graphql_node: each node carries its repository, and its milestone
+    the REST milestone ID.
+
+    Args:
+        repo_name: Repository name (e.g., "owner/repo")
+        since_datetime: Optional datetime, only issues updated since then are returned
+    """
+    owner, name = repo_name.split('/', 1)
+    token = get_installation_token(resolve_installation_id(repo_name))
+    milestone_ids = get_milestone_ids(repo_name, token)
+    variables = {
+        "owner": owner,
+        "name": name,
+        "first": ISSUES_PER_PAGE,
+        "after": None,
+        # Naive datetimes are UTC, as in the REST since parameter
+        "since": since_datetime.replace(tzinfo=since_datetime.tzinfo or timezone.utc).isoformat() if since_datetime else None,
+    }
+
+    queries = issue_count = response_bytes = cost = 0
+    while True:
+        data, size = run_query(token, REPO_ISSUES_QUERY, variables)
+        queries += 1
+        response_bytes += size
+        cost += (data.get("rateLimit") or {}).get("cost", 0)
+
+        repository = data["repository"]
+        if repository is None:
+            raise ValueError(f"Repository {repo_name} not found")
+        issues = repository.pop("issues")
+        for node in issues["nodes"]:
+            node["repository"] = repository
+            if node["milestone"]:
+                node["milestone"]["id"] = milestone_ids.get(node["milestone"]["number"])
+            issue_count += 1
+            yield node
+
+        if not issues["pageInfo"]["hasNextPage"]:
+            break
+        variables["after"] = issues["pageInfo"]["endCursor"]
+
+    logger.info(
+        f"Fetched {issue_count} issues of {repo_name} in {queries} GraphQL queries "
+        f"({response_bytes / 1024:.0f} KiB, {cost} rate limit points)"
+    )
+
+
+# Closed issues with their latest duplicate marking; an unmarking after it cancels it
+DUPLICATE_EVENTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    issues(first: $first, after: $after, states: CLOSED, orderBy: {field: CREATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        fullDatabaseId
+        timelineItems(itemTypes: [MARKED_AS_DUPLICATE_EVENT, UNMARKED_AS_DUPLICATE_EVENT], last: 1) {
+          nodes {
+            __typename
+            ... on MarkedAsDuplicateEvent { canonical { ... on Issue { fullDatabaseId } } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def iter_duplicate_pairs(repo_name: str) -> Iterator[Tuple[int, int]]:
+    """
+    Iterate over the issues of a repository marked as duplicates of another issue, as
+    (duplicate issue ID, canonical issue ID). Duplicates of pull requests are left out.
+    """
+    owner, name = repo_name.split('/', 1)
+    token = get_installation_token(resolve_installation_id(repo_name))
+    variables = {"owner": owner, "name": name, "first": ISSUES_PER_PAGE, "after": None}
+    while True:
+        data, _ = run_query(token, DUPLICATE_EVENTS_QUERY, variables)
+        if data["repository"] is None:
+            raise ValueError(f"Repository {repo_name} not found")
+        issues = data["repository"]["issues"]
+        for node in issues["nodes"]:
+            events = node["timelineItems"]["nodes"]
+            if events and events[-1]["__typename"] == "MarkedAsDuplicateEvent":
+                canonical = events[-1].get("canonical") or {}
+                if canonical.get("fullDatabaseId"):
+                    yield int(node["fullDatabaseId"]), int(canonical["fullDatabaseId"])
+        if not issues["pageInfo"]["hasNextPage"]:
+            return
+        variables["after"] = issues["pageInfo"]["endCursor"]
@@ -0,0 +1,227 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend import config
+from backend.tool.logger import get_logger
+from backend.tool.resilience import DependencyUnavailable, bounded_timeout, get_circuit_breaker, remaining_seconds
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# Request timeout, as reported by clients that map timeouts to a status (e.g. litellm.Timeout)
+TIMEOUT_STATUS_CODE = 408
+
+_session = None
+_httpx_client = None
+_init_lock = threading.Lock()
+
+_metrics = defaultdict(lambda: {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+_metrics_lock = threading.Lock()
+
+
+def record_request(host: str, seconds: float, error: bool = False):
+    """
+    Record the timing of one outbound request in the per-host metrics.
+    """
+    with _metrics_lock:
+        metrics = _metrics[host]
+        metrics["requests"] += 1
+        metrics["errors"] += int(error)
+        metrics["total_seconds"] += seconds
+        metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+
+
+def get_http_metrics() -> Dict[str, Dict]:
+    """
+    Get per-host request counts, error counts and latencies since process start.
+    """
+    with _metrics_lock:
+        return {
+            host: {
+                **metrics,
+                "avg_seconds": metrics["total_seconds"] / metrics["requests"] if metrics["requests"] else 0.0,
+            }
+            for host, metrics in _metrics.items()
+        }
+
+
+def build_retry() -> Retry:
+    """
+    Retry connection errors and 5xx responses with jittered exponential backoff.
+    Only idempotent methods are retried on read errors and 5xx, so comments are never posted twice.
+    """
+    return Retry(
+        total=config.HTTP_RETRIES,
+        connect=config.HTTP_RETRIES,
+        read=config.HTTP_RETRIES,
+        status=config.HTTP_RETRIES,
+        status_forcelist=RETRY_STATUS_CODES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=config.HTTP_BACKOFF_JITTER,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter recording per-host timings (including urllib3 retries) and applying a default timeout.
+    """
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).netloc
+        # Never wait longer than the caller's time budget allows
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, tuple):
+            kwargs["timeout"] = tuple(bounded_timeout(part, host) for part in timeout)
+        else:
+            kwargs["timeout"] = bounded_timeout(config.HTTP_TIMEOUT if timeout is None else timeout, host)
+        breaker = get_circuit_breaker(f"http:{host}")
+        breaker.before_call()
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            record_request(host, time.perf_counter() - start, error=True)
+            breaker.record_failure()
+            raise
+        error = response.status_code >= 500
+        record_request(host, time.perf_counter() - start, error=error)
+        if error:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide requests session: one keep-alive connection pool per host.
+    """
+    global _session
+    if _session is None:
+        with _init_lock:
+            if _session is None:
+                session = requests.Session()
+                # Never fall back to ~/.netrc credentials, callers always send their own Authorization header
+                session.auth = lambda request: request
+                adapter = InstrumentedHTTPAdapter(
+                    pool_connections=config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=config.HTTP_POOL_MAXSIZE,
+                    max_retries=build_retry(),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_httpx_client():
+    """
+    Get the process-wide httpx client used by litellm for embedding providers.
+    """
+    global _httpx_client
+    if _httpx_client is None:
+        with _init_lock:
+            if _httpx_client is None:
+                import httpx
+
+                def on_request(request):
+                    request.extensions["tiara_start"] = time.perf_counter()
+
+                def on_response(response):
+                    start = response.request.extensions.get("tiara_start", time.perf_counter())
+                    record_request(response.request.url.host, time.perf_counter() - start, error=response.status_code >= 500)
+
+                _httpx_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=config.HTTP_POOL_MAXSIZE * config.HTTP_POOL_CONNECTIONS,
+                        max_keepalive_connections=config.HTTP_POOL_MAXSIZE,
+                    ),
+                    transport=httpx.HTTPTransport(retries=config.HTTP_RETRIES),
+                    timeout=config.HTTP_TIMEOUT,
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                )
+    return _httpx_client
+
+
+def install_github_transport():
+    """
+    Route PyGithub's requests through the shared session instead of one session per client.
+    """
+    from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester
+
+    def init_connection(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        self.host = host
+        self.port = port if port else (443 if self.protocol == "https" else 80)
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self.session = get_session()
+
+    def close(self):
+        # The shared session outlives single requests
+        pass
+
+    connection_classes = [
+        type(f"Shared{base.__name__}", (base,), {"protocol": protocol, "__init__": init_connection, "close": close})
+        for base, protocol in ((HTTPRequestsConnectionClass, "http"), (HTTPSRequestsConnectionClass, "https"))
+    ]
+    Requester.injectConnectionClasses(*connection_classes)
+
+
+def install_litellm_transport():
+    """
+    Make litellm reuse the shared httpx client for providers that honour litellm.client_session.
+    """
+    import litellm
+
+    litellm.client_session = get_httpx_client()
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Whether an error may go away on retry: connection errors, timeouts and 5xx responses.
+    4xx responses (bad credentials, invalid input) fail the same way every time.
+    """
+    import httpx
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status_code, int) and (status_code >= 500 or status_code == TIMEOUT_STATUS_CODE)
+
+
+def call_with_retries(fn: Callable[[], T], description: str = "call") -> T:
+    """
+    Call fn, retrying transient errors (see is_transient_error) with jittered exponential
+    backoff (for idempotent calls made through clients that do not retry on their own).
+    Other errors, open circuits and exhausted time budgets are raised at once, and no
+    retry is started that could not finish within the budget.
+    """
+    for attempt in range(config.HTTP_RETRIES + 1):
+        try:
+            return fn()
+        except DependencyUnavailable:
+            raise
+        except Exception as e:
+            if attempt == config.HTTP_RETRIES or not is_transient_error(e):
+                raise
+            delay = config.HTTP_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, config.HTTP_BACKOFF_JITTER)
+            remaining = remaining_seconds()
+            if remaining is not None and delay >= remaining:
+                raise
+            logger.warning(f"{description} failed ({str(e)}), retrying in {delay:.2f}s")
+            time.sleep(delay)
@@ -0,0 +1,107 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from backend import config
+from backend.model.store import get_issue_store
+from backend.tool.logger import get_logger
+from backend.tool.resilience import DeadlineExceeded, remaining_seconds
+
+logger = get_logger(__name__)
+
+# Owner of the leases claimed by this process, unique across replicas and restarts
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_stats = {"acquired": 0, "busy": 0, "waited": 0, "released": 0, "kept": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def issue_lease_name(github_issue_id: int) -> str:
+    return f"issue:{github_issue_id}"
+
+
+def delivery_lease_name(delivery_id: str) -> str:
+    return f"delivery:{delivery_id}"
+
+
+def try_acquire(name: str, ttl_seconds: Optional[float] = None) -> bool:
+    """
+    Claim a lease for this worker without waiting, False if another worker holds it.
+    """
+    acquired = get_issue_store().try_acquire_lease(name, WORKER_ID, ttl_seconds or config.LEASE_TTL_SECONDS)
+    _count("acquired" if acquired else "busy")
+    return acquired
+
+
+def acquire(name: str, ttl_seconds: Optional[float] = None):
+    """
+    Claim a lease for this worker, polling while another worker holds it, for at most the
+    time left in the current budget (LEASE_WAIT_SECONDS outside of one).
+
+    Raises:
+        DeadlineExceeded: The lease did not become free in time
+    """
+    remaining = remaining_seconds()
+    deadline = time.monotonic() + (config.LEASE_WAIT_SECONDS if remaining is None else remaining)
+    waited = False
+    while not try_acquire(name, ttl_seconds):
+        if time.monotonic() + config.LEASE_POLL_SECONDS >= deadline:
+            raise DeadlineExceeded(f"lease:{name}")
+        if not waited:
+            _count("waited")
+            waited = True
+        time.sleep(config.LEASE_POLL_SECONDS)
+
+
+def release(name: str, keep_seconds: Optional[float] = None):
+    """
+    Release a lease of this worker, at once or after keep_seconds (see IssueStore.release_lease).
+    Failures are only logged: the lease then expires on its own.
+    """
+    try:
+        get_issue_store().release_lease(name, WORKER_ID, keep_seconds)
+        _count("kept" if keep_seconds else "released")
+    except Exception as e:
+        logger.warning(f"Failed to release lease {name}, it expires on its own: {str(e)}")
+
+
+@contextmanager
+def held(name: str, ttl_seconds: Optional[float] = None):
+    """
+    Hold a lease for the duration of the block, waiting for it as acquire does.
+    """
+    acquire(name, ttl_seconds)
+    try:
+        yield
+    finally:
+        release(name)
+
+
+@contextmanager
+def issue_lease(github_issue_id: int):
+    """
+    Hold the lease of an issue for the duration of the block, if WORK_LEASES_ENABLED.
+    """
+    if not config.WORK_LEASES_ENABLED:
+        yield
+        return
+    with held(issue_lease_name(github_issue_id)):
+        yield
+
+
+def get_lease_metrics() -> Dict:
+    """
+    Lease counters of this worker since process start: leases acquired, found held by another
+    worker, waited for, and released at once or kept.
+    """
+    with _stats_lock:
+        return {"enabled": config.WORK_LEASES_ENABLED, "worker_id": WORKER_ID, **_stats}
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Load test the webhook endpoint with signed `issues` deliveries.
+
+Starts mock GitHub and embedding servers (with configurable latency and failure rates),
+launches Tiara against them exactly as the container does (flask run, local storage in a
+temporary directory), then replays deliveries at a fixed rate with the given action mix.
+Requests are sent on an open-loop schedule and latency is measured from each request's
+scheduled time, so a saturated service shows up as growing latency instead of a silently
+lower request rate.
+
+Reports p50/p95/p99 latency, throughput and error rates per action, the server-side
+failures of each webhook lane (background lane events are answered before they run, so
+their failures never reach the client), plus what the mock servers saw. The run fails if
+no reply comment reached the mock GitHub although deliveries carried the reply label:
+search and the comment path were then never exercised.
+
+Usage:
+    python -m backend.tool.loadtest --rps 20 --duration 60
+    python -m backend.tool.loadtest --rps 50 --mix opened=2,edited=5,labeled=2,closed=1 \\
+        --embedding-latency-ms 80 --embedding-failure-rate 0.02 --json results.json
+    python -m backend.tool.loadtest --target http://localhost:5000/github/webhook --webhook-secret ...
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+from uuid import uuid4
+
+import requests
+
+from backend.tool.logger import get_logger
+from backend.tool.mock_servers import MockBehavior, MockEmbeddingServer, MockGitHubServer
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WEBHOOK_PATH = "/github/webhook"
+DEFAULT_MIX = "opened=4,edited=3,labeled=1,closed=1,reopened=1"
+MOCK_EMBEDDING_MODEL = "openai/text-embedding-3-small"
+
+TOPICS = [
+    "tikv region split", "pd scheduler leader balance", "tiflash replica sync", "ddl add index",
+    "backup restore s3", "ticdc changefeed lag", "planner index hint", "optimizer statistics",
+    "transaction lock conflict", "vector search hnsw", "mysql compatibility collation", "dashboard slow query",
+]
+WORDS = (
+    "error panic timeout slow memory cpu query table index region store leader follower raft "
+    "snapshot cluster node upgrade version config latency write read scan commit rollback "
+    "partition schema column statement plan cost join aggregate tidb tikv pd tiflash"
+).split()
+LABELS = ["type/bug", "type/enhancement", "type/question", "severity/major", "component/tikv", "component/pd"]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        action, _, weight = part.partition("=")
+        weights[action.strip()] = float(weight or 1)
+    return weights
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _random_body(min_words: int = 40, max_words: int = 600) -> str:
+    """
+    Issue body of realistic shape: template headings, prose and sometimes a log block.
+    """
+    def prose(count):
+        return " ".join(random.choice(WORDS) for _ in range(count))
+
+    words = random.randint(min_words, max_words)
+    sections = [
+        "## Bug Report",
+        "### 1. Minimal reproduce step (Required)",
+        prose(words // 3),
+        "### 2. What did you expect to see? (Required)",
+        prose(words // 6),
+        "### 3. What did you see instead (Required)",
+        prose(words // 3),
+    ]
+    if random.random() < 0.4:
+        log_lines = [f"[2025/07/01 12:00:{i:02d}] [ERROR] {prose(8)}" for i in range(random.randint(5, 60))]
+        sections.append("```\n" + "\n".join(log_lines) + "\n```")
+    sections += ["### 4. What is your TiDB version? (Required)", f"v8.{random.randint(0, 5)}.0"]
+    return "\n\n".join(sections)
+
+
+class DeliveryGenerator:
+    """
+    Generates `issues` webhook payloads following an action mix. Opened issues are kept so
+    later edits, label changes and closes target issues the service has seen.
+    """
+
+    def __init__(self, mix: Dict[str, float], repository: str, installation_id: int, reply_label: str,
+                 reply_label_rate: float, issue_id_start: int):
+        self.actions = list(mix)
+        self.weights = list(mix.values())
+        self.repository = repository
+        self.installation_id = installation_id
+        self.reply_label = reply_label
+        self.reply_label_rate = reply_label_rate
+        self.issues = []
+        self._next_number = 1
+        self._next_id = issue_id_start
+
+    def _new_issue(self) -> Dict:
+        number = self._next_number
+        self._next_number += 1
+        self._next_id += 1
+        labels = random.sample(LABELS, random.randint(0, 2))
+        if random.random() < self.reply_label_rate:
+            labels.append(self.reply_label)
+        now = _timestamp()
+        return {
+            "id": self._next_id,
+            "number": number,
+            "node_id": f"I_mock{self._next_id}",
+            "title": f"{random.choice(TOPICS)} {' '.join(random.choice(WORDS) for _ in range(random.randint(2, 8)))}",
+            "body": _random_body(),
+            "state": "open",
+            "state_reason": None,
+            "locked": False,
+            "active_lock_reason": None,
+            "user": {"login": f"user{random.randint(1, 500)}", "id": random.randint(1, 10 ** 6)},
+            "assignees": [],
+            "labels": [{"name": name, "color": "ededed", "description": None} for name in labels],
+            "milestone": None,
+            "closed_by": None,
+            "created_at": now,
+            "updated_at": now,
+            "closed_at": None,
+            "html_url": f"https://github.com/{self.repository}/issues/{number}",
+            "url": f"https://api.github.com/repos/{self.repository}/issues/{number}",
+        }
+
+    def next_delivery(self) -> Dict:
+        action = random.choices(self.actions, self.weights)[0]
+        if action == "opened" or not self.issues:
+            action = "opened"
+            issue = self._new_issue()
+            self.issues.append(issue)
+        else:
+            issue = random.choice(self.issues)
+            if action == "edited":
+                issue["body"] = _random_body()
+            elif action == "labeled":
+                issue["labels"].append({"name": random.choice(LABELS + [self.reply_label]), "color": "ededed", "description": None})
+            elif action == "closed":
+                issue.update(state="closed", state_reason="completed", closed_at=_timestamp())
+            elif action == "reopened":
+                issue.update(state="open", state_reason="reopened", closed_at=None)
+            issue["updated_at"] = _timestamp()
+
+        owner = self.repository.split("/", 1)[0]
+        return {
+            "action": action,
+            "issue": json.loads(json.dumps(issue)),
+            "repository": {"id": 1, "full_name": self.repository, "owner": {"login": owner}},
+            "installation": {"id": self.installation_id},
+            "sender": {"login": issue["user"]["login"]},
+        }
+
+
+def sign_delivery(body: bytes, secret: str) -> Dict[str, str]:
+    """
+    Headers GitHub sends with a delivery, including both signatures.
+    """
+    return {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": str(uuid4()),
+        "X-Hub-Signature": "sha1=" + hmac.new(secret.encode(), body, hashlib.sha1).hexdigest(),
+        "X-Hub-Signature-256": "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(),
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(results: List[Dict], elapsed_seconds: float) -> Dict:
+    by_action = defaultdict(list)
+    for result in results:
+        by_action[result["action"]].append(result)
+        by_action["all"].append(result)
+
+    summary = {}
+    for action, action_results in by_action.items():
+        latencies = sorted(result["latency_ms"] for result in action_results)
+        errors = sum(1 for result in action_results if result["error"])
+        summary[action] = {
+            "requests": len(action_results),
+            "errors": errors,
+            "error_rate": errors / len(action_results),
+            "throughput_rps": len(action_results) / elapsed_seconds if elapsed_seconds else 0.0,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": latencies[-1],
+        }
+    return summary
+
+
+def run_load(target: str, secret: str, generator: DeliveryGenerator, rps: float, duration: float,
+             concurrency: int, timeout: float) -> Dict:
+    """
+    Send deliveries to target at rps for duration seconds and collect per-request results.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    results = []
+    results_lock = threading.Lock()
+
+    def send(payload: Dict, scheduled_at: float):
+        body = json.dumps(payload).encode()
+        error = None
+        status = None
+        try:
+            response = session.post(target, data=body, headers=sign_delivery(body, secret), timeout=timeout)
+            status = response.status_code
+            if status >= 400:
+                error = f"HTTP {status}"
+        except Exception as e:
+            error = type(e).__name__
+        result = {
+            "action": payload["action"],
+            "status": status,
+            "error": error,
+            "latency_ms": (time.perf_counter() - scheduled_at) * 1000,
+        }
+        with results_lock:
+            results.append(result)
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest") as executor:
+        for i in range(total):
+            scheduled_at = start + i / rps
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, generator.next_delivery(), scheduled_at)
+            if (i + 1) % max(1, int(rps * 10)) == 0:
+                with results_lock:
+                    done = len(results)
+                logger.info(f"Sent {i + 1}/{total} deliveries, {done} completed")
+    elapsed = time.perf_counter() - start
+
+    error_counts = defaultdict(int)
+    for result in results:
+        if result["error"]:
+            error_counts[result["error"]] += 1
+    return {"summary": summarize(results, elapsed), "errors": dict(error_counts), "elapsed_seconds": elapsed}
+
+
+def _generate_private_key(path: str):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+
+
+def start_app(port: int, env: Dict[str, str], log_path: str, startup_timeout: float = 120) -> subprocess.Popen:
+    """
+    Run the service the way the container does (flask run) and wait until it answers.
+    """
+    log_file = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "flask", "--app", "wsgi", "run", "--host", "127.0.0.1", "--port", str(port), "--no-reload"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **env},
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Tiara exited during startup, see {log_path}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Tiara did not start within {startup_timeout}s, see {log_path}")
+
+
+def fetch_lane_metrics(target: str, drain_timeout: float = 60) -> Dict:
+    """
+    Server-side latencies per webhook lane, once the background lane has drained. Events of
+    the background lane are answered when queued, so client latencies do not cover them.
+    """
+    base = target[:-len(WEBHOOK_PATH)] if target.endswith(WEBHOOK_PATH) else target.rsplit("/", 1)[0]
+    deadline = time.monotonic() + drain_timeout
+    lanes = {}
+    while True:
+        try:
+            lanes = requests.get(f"{base}/metrics/lanes", timeout=5).json().get("lanes", {})
+        except Exception as e:
+            logger.warning(f"Could not read lane metrics: {str(e)}")
+            return {}
+        if all(lane["queued"] == 0 and lane["in_flight"] == 0 for lane in lanes.values()) or time.monotonic() > deadline:
+            return lanes
+        time.sleep(0.5)
+
+
+def count_reply_comments(report: Dict) -> int:
+    github_stats = report.get("mocks", {}).get("github", {})
+    return github_stats.get("comments_created", 0) + github_stats.get("comments_updated", 0)
+
+
+def check_report(report: Dict, expect_comments: bool) -> List[str]:
+    """
+    Problems that make the run unrepresentative or show failures the client did not see.
+    """
+    problems = []
+    if expect_comments and count_reply_comments(report) == 0:
+        problems.append("No reply comment reached the mock GitHub, search and the comment path were not exercised")
+    lane_failures = {
+        name: lane["failed"] + lane["rejected"]
+        for name, lane in report.get("lanes", {}).items()
+        if lane["failed"] or lane["rejected"]
+    }
+    if lane_failures:
+        problems.append(f"Events failed or were rejected server-side, per lane: {lane_failures}")
+    return problems
+
+
+def print_report(report: Dict):
+    print()
+    print(f"{'action':<10} {'requests':>8} {'errors':>7} {'err %':>6} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    summary = report["summary"]
+    for action in sorted(summary, key=lambda name: (name == "all", name)):
+        row = summary[action]
+        print(
+            f"{action:<10} {row['requests']:>8} {row['errors']:>7} {row['error_rate']:>6.1%} {row['throughput_rps']:>7.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+    if report.get("lanes"):
+        print(f"\n{'lane':<10} {'done':>8} {'failed':>7} {'rejected':>8} {'wait p95':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, lane in report["lanes"].items():
+            print(
+                f"{name:<10} {lane['completed']:>8} {lane['failed']:>7} {lane['rejected']:>8} {lane['wait_p95_seconds'] * 1000:>9.1f} "
+                f"{lane['latency_p50_seconds'] * 1000:>8.1f} {lane['latency_p95_seconds'] * 1000:>8.1f} {lane['latency_p99_seconds'] * 1000:>8.1f}"
+            )
+    if report["errors"]:
+        print(f"\nErrors: {report['errors']}")
+    for name, stats in report.get("mocks", {}).items():
+        print(f"Mock {name}: {stats}")
+    for problem in report.get("problems", []):
+        print(f"WARNING: {problem}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the issues webhook with signed deliveries")
+    parser.add_argument("--rps", type=float, default=10, help="Deliveries per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Action weights, e.g. opened=4,edited=3,closed=1")
+    parser.add_argument("--warmup", type=int, default=20, help="Issues opened before measuring")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum deliveries in flight")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--repository", default="loadtest/repo")
+    parser.add_argument("--reply-label", default="tiara")
+    parser.add_argument("--reply-label-rate", type=float, default=0.3, help="Fraction of opened issues carrying the reply label")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible deliveries")
+    parser.add_argument("--github-latency-ms", type=float, default=50)
+    parser.add_argument("--github-jitter-ms", type=float, default=20)
+    parser.add_argument("--github-failure-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=40)
+    parser.add_argument("--embedding-jitter-ms", type=float, default=15)
+    parser.add_argument("--embedding-failure-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-dimensions", type=int, default=256)
+    parser.add_argument("--port", type=int, default=5099, help="Port of the launched Tiara instance")
+    parser.add_argument("--target", default=None,
+                        help="Webhook URL of an already running instance instead of launching one (its GitHub and "
+                             "embedding endpoints must point to the mock servers, see --github-port/--embedding-port)")
+    parser.add_argument("--webhook-secret", default="loadtest-secret")
+    parser.add_argument("--github-port", type=int, default=0)
+    parser.add_argument("--embedding-port", type=int, default=0)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra environment for the launched instance, repeatable")
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    github = MockGitHubServer(
+        MockBehavior(args.github_latency_ms, args.github_jitter_ms, args.github_failure_rate), port=args.github_port
+    ).start()
+    embedding = MockEmbeddingServer(
+        MockBehavior(args.embedding_latency_ms, args.embedding_jitter_ms, args.embedding_failure_rate),
+        port=args.embedding_port,
+        dimensions=args.embedding_dimensions,
+    ).start()
+
+    process = None
+    work_dir = tempfile.mkdtemp(prefix="tiara-loadtest-")
+    try:
+        target = args.target
+        if target is None:
+            private_key_path = os.path.join(work_dir, "app.pem")
+            _generate_private_key(private_key_path)
+            env = {
+                "STORAGE_BACKEND": "local",
+                "LOCAL_STORAGE_PATH": os.path.join(work_dir, "data"),
+                "GITHUB_API_URL": github.url,
+                "GITHUB_APP_ID": "1",
+                "GITHUB_APP_PRIVATE_KEY": private_key_path,
+                "GITHUB_APP_INSTALLATION_ID": "1",
+                "GITHUB_WEBHOOK_SECRET": args.webhook_secret,
+                "GITHUB_REPO_NAMES": args.repository,
+                "REPLY_LABEL": args.reply_label,
+                "EMBEDDING_MODEL": MOCK_EMBEDDING_MODEL,
+                "OPENAI_API_BASE": f"{embedding.url}/v1",
+                "OPENAI_API_KEY": "mock",
+            }
+            env.update(dict(item.split("=", 1) for item in args.env))
+
+            # Tables are created by the database initialization step in deployments, do the same here
+            subprocess.run(
+                [sys.executable, "-c", "from backend.model.store import get_issue_store; get_issue_store().init_schema()"],
+                cwd=PROJECT_ROOT, env={**os.environ, **env}, check=True, capture_output=True,
+            )
+
+            log_path = os.path.join(work_dir, "tiara.log")
+            logger.info(f"Starting Tiara on port {args.port}, logs in {log_path}")
+            process = start_app(args.port, env, log_path)
+            target = f"http://127.0.0.1:{args.port}{WEBHOOK_PATH}"
+
+        generator = DeliveryGenerator(
+            parse_mix(args.mix),
+            repository=args.repository,
+            installation_id=1,
+            reply_label=args.reply_label,
+            reply_label_rate=args.reply_label_rate,
+            issue_id_start=random.randint(10 ** 9, 2 * 10 ** 9),
+        )
+
+        if args.warmup:
+            logger.info(f"Warming up with {args.warmup} opened issues")
+            warmup_generator_mix = generator.actions, generator.weights
+            generator.actions, generator.weights = ["opened"], [1]
+            run_load(target, args.webhook_secret, generator, rps=min(args.rps, 20), duration=args.warmup / min(args.rps, 20),
+                     concurrency=args.concurrency, timeout=args.timeout)
+            generator.actions, generator.weights = warmup_generator_mix
+
+        logger.info(f"Sending {args.rps} deliveries/s for {args.duration}s to {target}")
+        report = run_load(target, args.webhook_secret, generator, args.rps, args.duration, args.concurrency, args.timeout)
+        report["config"] = vars(args)
+        report["lanes"] = fetch_lane_metrics(target)
+        report["mocks"] = {"github": dict(github.stats), "embedding": dict(embedding.stats)}
+        report["server_failures"] = sum(lane["failed"] + lane["rejected"] for lane in report["lanes"].values())
+        report["problems"] = check_report(report, expect_comments=args.reply_label_rate > 0)
+        print_report(report)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        github.stop()
+        embedding.stop()
+    if args.reply_label_rate > 0 and count_reply_comments(report) == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+# EMBEDDING_MODEL prefixes of in-process models, e.g. "local/models/bge-small-en-v1.5" or "hashing/256"
+LOCAL_MODEL_PREFIX = "local/"
+HASHING_MODEL_PREFIX = "hashing/"
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def is_local_model(model_name: Optional[str]) -> bool:
+    """
+    Check whether the model runs in-process instead of at a remote provider.
+    """
+    return bool(model_name) and model_name.startswith((LOCAL_MODEL_PREFIX, HASHING_MODEL_PREFIX))
+
+
+@lru_cache(maxsize=65536)
+def _word_vector(word: str, dimensions: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.md5(word.encode()).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+
+
+def hashed_embedding(text: str, dimensions: int) -> list:
+    """
+    Deterministic unit vector of a text: the sum of one random vector per word, so texts
+    sharing words are close, as with a real embedding model.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in WORD_PATTERN.findall(text.lower()):
+        vector += _word_vector(word, dimensions)
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        vector[0] = 1.0
+        norm = 1.0
+    return (vector / norm).tolist()
+
+
+class HashingVectorizer:
+    """
+    Deterministic bag-of-words vectors, for offline tests and benchmarks. No model files,
+    no network, and the same text always gets the same vector.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def encode(self, texts: List[str]) -> List[list]:
+        return [hashed_embedding(text, self.dimensions) for text in texts]
+
+
+def _import_sentence_transformers():
+    try:
+        import sentence_transformers
+    except ImportError:
+        raise RuntimeError(
+            "Local embedding models require sentence-transformers, install it with: pip install sentence-transformers"
+        )
+    return sentence_transformers
+
+
+class SentenceTransformerModel:
+    """
+    Sentence-transformers model loaded from a local path, run on CPU in batches.
+
+    Args:
+        path: Directory of the model (as saved by SentenceTransformer.save or downloaded from the Hub)
+        threads: Intra-op threads used by torch, 0 to keep its default (one per core)
+        batch_size: Texts per forward pass
+        device: Torch device, "cpu" by default
+    """
+
+    def __init__(self, path: str, threads: int = 0, batch_size: int = 32, device: str = "cpu"):
+        sentence_transformers = _import_sentence_transformers()
+        if threads > 0:
+            import torch
+            # Process wide: inference is serialized below, so one pool of threads is busy at a time
+            torch.set_num_threads(threads)
+        self.batch_size = batch_size
+        self._model = sentence_transformers.SentenceTransformer(path, device=device)
+        self._lock = threading.Lock()
+        logger.info(f"Loaded local embedding model {path} on {device} ({self._model.get_sentence_embedding_dimension()} dimensions)")
+
+    def encode(self, texts: List[str]) -> List[list]:
+        with self._lock:
+            vectors = self._model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
+
+
+_models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+
+
+def get_local_embedding_model(model_name: str, threads: int = 0, batch_size: int = 32, device: str = "cpu"):
+    """
+    Get the in-process model of an EMBEDDING_MODEL value, loading it on first use.
+
+    Args:
+        model_name: "local/<model path>" or "hashing/<dimensions>"
+        threads: Inference threads of local models, 0 for the library default
+        batch_size: Texts per forward pass of local models
+        device: Torch device of local models
+
+    Returns:
+        Model with an encode(texts) method returning one unit vector per text
+    """
+    with _models_lock:
+        if model_name not in _models:
+            if model_name.startswith(HASHING_MODEL_PREFIX):
+                _models[model_name] = HashingVectorizer(int(model_name[len(HASHING_MODEL_PREFIX):]))
+            elif model_name.startswith(LOCAL_MODEL_PREFIX):
+                _models[model_name] = SentenceTransformerModel(
+                    model_name[len(LOCAL_MODEL_PREFIX):], threads=threads, batch_size=batch_size, device=device
+                )
+            else:
+                raise ValueError(f"Not a local embedding model: {model_name}")
+        return _models[model_name]
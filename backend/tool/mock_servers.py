@@ -0,0 +1,208 @@
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from backend.tool.local_embedding import hashed_embedding
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MockBehavior:
+    """
+    Latency and failure injection of a mock server.
+
+    Args:
+        latency_ms: Mean added latency per request
+        jitter_ms: Latency is drawn uniformly from latency_ms +/- jitter_ms
+        failure_rate: Fraction of requests answered with a 503
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+
+    def delay(self):
+        latency_ms = max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms))
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    def should_fail(self) -> bool:
+        return self.failure_rate > 0 and random.random() < self.failure_rate
+
+
+class MockServer:
+    """
+    Threaded HTTP server on 127.0.0.1 answering JSON requests with handle(method, path, body),
+    after the configured latency, or with an injected 503.
+    """
+
+    name = "mock"
+
+    def __init__(self, behavior: Optional[MockBehavior] = None, port: int = 0):
+        self.behavior = behavior or MockBehavior()
+        self.stats = {"requests": 0, "injected_failures": 0}
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"{self.name}-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock {self.name} server listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, object]:
+        raise NotImplementedError
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                server.count("requests")
+                server.behavior.delay()
+
+                if server.behavior.should_fail():
+                    server.count("injected_failures")
+                    status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {"message": "Injected failure"}
+                else:
+                    try:
+                        body = json.loads(raw_body) if raw_body else None
+                        status, payload = server.handle(self.command, self.path, body)
+                    except Exception as e:
+                        server.count("handler_errors")
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"message": str(e)}
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class MockGitHubServer(MockServer):
+    """
+    The GitHub REST endpoints Tiara calls while handling webhooks: installation tokens,
+    repository installations and issue comments.
+    """
+
+    name = "github"
+
+    def __init__(self, behavior: Optional[MockBehavior] = None, port: int = 0, installation_id: int = 1):
+        super().__init__(behavior, port)
+        self.installation_id = installation_id
+        self._comments = {}  # Comment id -> (repo, issue number, body)
+        self._next_comment_id = 1
+        self._comments_lock = threading.Lock()
+
+    def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, object]:
+        path = path.split("?", 1)[0]
+
+        if method == "POST" and re.fullmatch(r"/app/installations/\d+/access_tokens", path):
+            self.count("access_tokens")
+            expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+            return HTTPStatus.CREATED, {
+                "token": f"ghs_mock{random.getrandbits(64):016x}",
+                "expires_at": expires_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "permissions": {"issues": "write", "metadata": "read"},
+                "repository_selection": "all",
+            }
+
+        if method == "GET" and re.fullmatch(r"/repos/[^/]+/[^/]+/installation", path):
+            return HTTPStatus.OK, {"id": self.installation_id, "app_id": 1, "target_type": "Organization"}
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)/issues/(\d+)/comments", path)
+        if match and method == "POST":
+            self.count("comments_created")
+            with self._comments_lock:
+                comment_id = self._next_comment_id
+                self._next_comment_id += 1
+                self._comments[comment_id] = (match.group(1), int(match.group(2)), body.get("body", ""))
+            return HTTPStatus.CREATED, {"id": comment_id, "body": body.get("body", "")}
+        if match and method == "GET":
+            with self._comments_lock:
+                comments = [
+                    {"id": comment_id, "body": comment_body}
+                    for comment_id, (repo, number, comment_body) in self._comments.items()
+                    if repo == match.group(1) and number == int(match.group(2))
+                ]
+            return HTTPStatus.OK, comments
+
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/issues/comments/(\d+)", path)
+        if match and method == "PATCH":
+            comment_id = int(match.group(1))
+            with self._comments_lock:
+                if comment_id not in self._comments:
+                    return HTTPStatus.NOT_FOUND, {"message": "Not Found"}
+                repo, number, _ = self._comments[comment_id]
+                self._comments[comment_id] = (repo, number, body.get("body", ""))
+            self.count("comments_updated")
+            return HTTPStatus.OK, {"id": comment_id}
+
+        self.count("unhandled")
+        return HTTPStatus.NOT_FOUND, {"message": "Not Found"}
+
+
+class MockEmbeddingServer(MockServer):
+    """
+    OpenAI compatible embeddings endpoint (POST .../embeddings) returning hashed bag-of-words vectors.
+    """
+
+    name = "embedding"
+
+    def __init__(self, behavior: Optional[MockBehavior] = None, port: int = 0, dimensions: int = 256):
+        super().__init__(behavior, port)
+        self.dimensions = dimensions
+
+    def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, object]:
+        if method != "POST" or not path.split("?", 1)[0].endswith("/embeddings"):
+            self.count("unhandled")
+            return HTTPStatus.NOT_FOUND, {"message": "Not Found"}
+
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        dimensions = body.get("dimensions") or self.dimensions
+        self.count("texts", len(texts))
+        token_count = sum(len(text) // 4 for text in texts)
+        return HTTPStatus.OK, {
+            "object": "list",
+            "model": body.get("model"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": hashed_embedding(text, dimensions)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": token_count, "total_tokens": token_count},
+        }
@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from backend import config
+from backend.tool.logger import get_logger
+from backend.tool.resilience import DeadlineExceeded, remaining_seconds
+
+logger = get_logger(__name__)
+
+FAST_LANE = "fast"
+BACKGROUND_LANE = "background"
+
+# Latency percentiles are computed over the most recent events of each lane
+LATENCY_WINDOW = 1000
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class LaneStats:
+    """
+    Counters and recent latencies (time waiting for a worker, and in total) of one lane.
+    """
+
+    def __init__(self):
+        self.counts = {"completed": 0, "failed": 0, "rejected": 0}
+        self.in_flight = 0
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, wait_seconds: float, total_seconds: float, ok: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.counts["completed" if ok else "failed"] += 1
+            self._waits.append(wait_seconds)
+            self._latencies.append(total_seconds)
+
+    def rejected(self):
+        with self._lock:
+            self.counts["rejected"] += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            latencies = sorted(self._latencies)
+            in_flight = self.in_flight
+            counts = dict(self.counts)
+        return {
+            **counts,
+            "in_flight": in_flight,
+            "wait_p95_seconds": _percentile(waits, 0.95),
+            "latency_p50_seconds": _percentile(latencies, 0.5),
+            "latency_p95_seconds": _percentile(latencies, 0.95),
+            "latency_p99_seconds": _percentile(latencies, 0.99),
+        }
+
+
+class InlineLane:
+    """
+    Lane running work in the caller's thread, at most workers at a time. The slots are
+    reserved for this lane, so its work never waits behind another lane's.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.stats = LaneStats()
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def run(self, fn: Callable):
+        """
+        Run fn once a slot is free, waiting at most for the caller's time budget.
+        """
+        queued_at = time.monotonic()
+        if not self._slots.acquire(timeout=remaining_seconds()):
+            self.stats.rejected()
+            raise DeadlineExceeded(f"lane:{self.name}")
+        started_at = time.monotonic()
+        self.stats.started()
+        ok = False
+        try:
+            result = fn()
+            ok = True
+            return result
+        finally:
+            self._slots.release()
+            self.stats.finished(started_at - queued_at, time.monotonic() - queued_at, ok)
+
+    def summary(self) -> Dict:
+        return {"workers": self.workers, "queued": 0, **self.stats.summary()}
+
+
+class BackgroundLane:
+    """
+    Lane queueing work for its own pool of workers, so callers return at once and at most
+    workers items run concurrently. Work still queued when the process exits is lost.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.stats = LaneStats()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = [
+            threading.Thread(target=self._work_loop, name=f"{name}-lane-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable) -> bool:
+        """
+        Queue fn, False if the queue is full.
+        """
+        try:
+            self._queue.put_nowait((fn, time.monotonic()))
+        except queue.Full:
+            self.stats.rejected()
+            return False
+        return True
+
+    def _work_loop(self):
+        while True:
+            fn, queued_at = self._queue.get()
+            started_at = time.monotonic()
+            self.stats.started()
+            ok = False
+            try:
+                fn()
+                ok = True
+            except Exception as e:
+                logger.error(f"Error in {self.name} lane: {str(e)}")
+            finally:
+                self.stats.finished(started_at - queued_at, time.monotonic() - queued_at, ok)
+                self._queue.task_done()
+
+    def summary(self) -> Dict:
+        return {"workers": self.workers, "queued": self._queue.qsize(), **self.stats.summary()}
+
+
+_lanes: Optional[Dict] = None
+_lanes_lock = threading.Lock()
+
+
+def get_lanes() -> Dict:
+    """
+    Get the webhook lanes, created (and the background workers started) on first use.
+    """
+    global _lanes
+    with _lanes_lock:
+        if _lanes is None:
+            _lanes = {
+                FAST_LANE: InlineLane(FAST_LANE, config.WEBHOOK_FAST_LANE_WORKERS),
+                BACKGROUND_LANE: BackgroundLane(
+                    BACKGROUND_LANE, config.WEBHOOK_BACKGROUND_LANE_WORKERS, config.WEBHOOK_BACKGROUND_QUEUE_SIZE
+                ),
+            }
+        return _lanes
+
+
+def classify_issues_event(data: Dict) -> str:
+    """
+    Lane of an Issues webhook event, from its raw payload: events that can lead to a reply
+    (an issue opened, or the REPLY_LABEL added) take the fast lane, metadata churn
+    (assigned, milestoned, unlabeled, edited, ...) the background lane.
+    """
+    action = data.get("action")
+    if action == "opened":
+        return FAST_LANE
+    if action == "labeled" and (data.get("label") or {}).get("name") == config.REPLY_LABEL:
+        return FAST_LANE
+    return BACKGROUND_LANE
+
+
+def get_lane_metrics() -> Dict:
+    """
+    Per-lane counters and latencies (recent window) since process start.
+    """
+    if _lanes is None:
+        return {}
+    return {name: lane.summary() for name, lane in _lanes.items()}
@@ -0,0 +1,216 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from flask import g, request
+
+from backend import config
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Tiara-Profile"
+PROFILE_ID_HEADER = "X-Tiara-Profile-Id"
+TRACEMALLOC_FRAMES = 10
+
+# cProfile and tracemalloc are process-wide, so a single request is profiled at a time
+_profile_lock = threading.Lock()
+
+
+def token_matches(value: Optional[str]) -> bool:
+    """
+    Check a value against PROFILING_TOKEN, always False when no token is configured.
+    """
+    return bool(config.PROFILING_TOKEN) and value is not None and hmac.compare_digest(value, config.PROFILING_TOKEN)
+
+
+class RequestProfile:
+    """
+    CPU profile (cProfile) and allocation statistics (tracemalloc) of one request.
+    """
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.profile_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.profiler = cProfile.Profile()
+        self.duration_seconds = None
+        self.status_code = None
+        self._started_tracemalloc = False
+        self._start = None
+
+    def start(self):
+        # Leave tracing alone if it was already started, e.g. with PYTHONTRACEMALLOC
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.duration_seconds = time.perf_counter() - self._start
+
+        # Allocations made during the request and still alive, grouped by source line
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        self.allocations = [
+            {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:config.PROFILING_TOP_ENTRIES]
+        ]
+        self.traced_bytes = current_bytes
+        self.peak_bytes = peak_bytes
+
+    def top_functions(self) -> str:
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats("cumulative").print_stats(config.PROFILING_TOP_ENTRIES)
+        return output.getvalue()
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_seconds * 1000, 2),
+            "peak_memory_bytes": self.peak_bytes,
+            "retained_memory_bytes": self.traced_bytes,
+        }
+
+    def save(self, directory: str):
+        """
+        Write {id}.prof (pstats, loadable with snakeviz or pstats) and {id}.json (summary,
+        top functions by cumulative time and top allocation sites) to directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.profiler.dump_stats(os.path.join(directory, f"{self.profile_id}.prof"))
+        report = {
+            **self.summary(),
+            "top_functions": self.top_functions(),
+            "top_allocations": self.allocations,
+        }
+        with open(os.path.join(directory, f"{self.profile_id}.json"), "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def list_profiles(directory: str = None) -> List[Dict]:
+    """
+    Summaries of the saved profiles, newest first.
+    """
+    directory = directory or config.PROFILING_DIR
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for file_name in sorted(os.listdir(directory), reverse=True):
+        if file_name.endswith(".json"):
+            report = load_profile(file_name[:-len(".json")], directory)
+            if report:
+                report.pop("top_functions", None)
+                report.pop("top_allocations", None)
+                summaries.append(report)
+    return summaries
+
+
+def profile_path(profile_id: str, extension: str, directory: str = None) -> Optional[str]:
+    # Ids are generated by RequestProfile, anything else could escape the directory
+    if not profile_id.replace("-", "").isalnum():
+        return None
+    path = os.path.join(directory or config.PROFILING_DIR, f"{profile_id}.{extension}")
+    return path if os.path.isfile(path) else None
+
+
+def load_profile(profile_id: str, directory: str = None) -> Optional[Dict]:
+    path = profile_path(profile_id, "json", directory)
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def prune_profiles(directory: str, keep: int):
+    profile_ids = sorted({file_name.rsplit(".", 1)[0] for file_name in os.listdir(directory)}, reverse=True)
+    for profile_id in profile_ids[keep:]:
+        for extension in ("prof", "json"):
+            path = os.path.join(directory, f"{profile_id}.{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _should_profile() -> Optional[str]:
+    if token_matches(request.headers.get(PROFILE_HEADER)):
+        return "header"
+    if config.PROFILING_SAMPLE_RATE > 0 and random.random() < config.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def init_profiling(app):
+    """
+    Profile requests asking for it with the X-Tiara-Profile header, plus a PROFILING_SAMPLE_RATE
+    sample of the others. Nothing is hooked into the app unless PROFILING_ENABLED is set.
+    """
+    if not config.PROFILING_ENABLED:
+        return
+
+    @app.before_request
+    def start_request_profile():
+        if request.blueprint == "profiles":
+            return
+        reason = _should_profile()
+        if reason is None or not _profile_lock.acquire(blocking=False):
+            return
+        try:
+            profile = RequestProfile(request.method, request.path, reason)
+            profile.start()
+            g.request_profile = profile
+        except Exception as e:
+            _profile_lock.release()
+            logger.error(f"Failed to start request profile: {str(e)}")
+
+    @app.after_request
+    def tag_request_profile(response):
+        profile = g.get("request_profile")
+        if profile is not None:
+            profile.status_code = response.status_code
+            response.headers[PROFILE_ID_HEADER] = profile.profile_id
+        return response
+
+    @app.teardown_request
+    def finish_request_profile(error=None):
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return
+        try:
+            profile.stop()
+            profile.save(config.PROFILING_DIR)
+            prune_profiles(config.PROFILING_DIR, config.PROFILING_MAX_PROFILES)
+            summary = profile.summary()
+            logger.info(
+                f"Profiled {summary['method']} {summary['path']} ({summary['reason']}): {summary['duration_ms']}ms, "
+                f"peak {summary['peak_memory_bytes'] / 1024:.0f} KiB, saved as {summary['id']}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to save request profile: {str(e)}")
+        finally:
+            _profile_lock.release()
+
+    logger.info(f"Request profiling enabled (sample rate {config.PROFILING_SAMPLE_RATE}), profiles saved to {config.PROFILING_DIR}")
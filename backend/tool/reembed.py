@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Re-embed stored issues with EMBEDDING_MIGRATION_MODEL in the background, then switch
+searches over to the new vectors.
+
+While a migration is configured, every write already embeds with both models (see
+backend.model.embedding.embed_migration_fields), so this job only has to fill the
+title_vec_next / body_vec_next columns of issues written before. It pages through the
+table in primary-key order, embeds at most --rate texts per second with --concurrency
+requests in flight, and persists its checkpoint after every page, so it can be stopped
+and resumed at any time without disturbing live traffic.
+
+Sweeps repeat until one finds nothing left to embed; searches then switch to the new
+model and columns together. The switch is one-way: keep EMBEDDING_MIGRATION_MODEL set
+afterwards, until the new vectors are promoted to the primary columns. Running the job
+again after the switch sweeps for issues whose new vectors were left empty (failed or
+deferred embeddings), as fill_missing_vectors also does.
+
+Changing EMBEDDING_MIGRATION_MODEL restarts the migration and first clears the vectors
+the previous model left in the next columns, so a switch never mixes two vector spaces.
+Start the job once every replica runs with the new model, or they dual-write the old one.
+
+Usage:
+    python -m backend.tool.reembed
+    python -m backend.tool.reembed --rate 5 --concurrency 1 --no-switch
+    python -m backend.tool.reembed --status
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from backend import config
+from backend.model.embedding import MIGRATION_VECTOR_COLUMNS, get_migration_embedding_functions
+from backend.model.store import get_issue_store
+from backend.model.vector_migration import load_migration_state, save_migration_state
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+SOURCE_FIELDS = ("title", "body")
+
+
+class RateLimiter:
+    """
+    Token bucket allowing rate units per second on average, with bursts of up to one second.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int = 1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                # A batch larger than the bucket goes through once the bucket is full
+                needed = min(count, self.rate)
+                if self.tokens >= needed:
+                    self.tokens -= count
+                    return
+                wait_seconds = (needed - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+def reembed_rows(store, rows: List[Dict], source_field: str, functions, rate_limiter: RateLimiter) -> int:
+    """
+    Embed the source field of rows with the migration model and store it in the field's next column.
+
+    Returns:
+        Number of texts embedded
+    """
+    text_function, title_function, body_function = functions
+    field_function = title_function if source_field == "title" else body_function
+    column = MIGRATION_VECTOR_COLUMNS[f"{source_field}_vec"]
+
+    prepared = [(row, field_function.prepare_text(row[source_field])) for row in rows]
+    prepared = [(row, text) for row, text in prepared if text is not None]
+    if not prepared:
+        return 0
+
+    rate_limiter.acquire(len(prepared))
+    vectors = text_function.embed_prepared([text for _, text in prepared])
+    for (row, _), vector in zip(prepared, vectors):
+        # Matching the fingerprint read with the text skips issues edited meanwhile, the
+        # live write already embedded their new text with both models
+        store.update(
+            {column: vector},
+            {"github_issue_id": row["github_issue_id"], "content_fingerprint": row["content_fingerprint"]},
+        )
+    return len(prepared)
+
+
+def clear_next_vectors(store, batch_size: int) -> int:
+    """
+    Empty the next vector columns, which hold the vectors of a previous migration model.
+
+    Returns:
+        Number of vectors cleared
+    """
+    cleared = 0
+    for column in MIGRATION_VECTOR_COLUMNS.values():
+        while True:
+            # Cleared rows drop out of the filter, so every page starts over from the first
+            rows = store.scan(None, batch_size, fields=["github_issue_id"], filters={column: {"$ne": None}})
+            if not rows:
+                break
+            store.update({column: None}, {"github_issue_id": {"$in": [row["github_issue_id"] for row in rows]}})
+            cleared += len(rows)
+    return cleared
+
+
+def run_migration(rate: float, concurrency: int, batch_size: int, switch: bool = True) -> Dict:
+    """
+    Fill the next vector columns with EMBEDDING_MIGRATION_MODEL, resuming from the stored
+    checkpoint, and switch searches to them once complete.
+
+    Returns:
+        The final migration state
+    """
+    functions = get_migration_embedding_functions()
+    if functions is None:
+        raise ValueError("EMBEDDING_MIGRATION_MODEL is not set, there is nothing to migrate to")
+
+    store = get_issue_store()
+    store.init_schema()
+
+    state = load_migration_state(store)
+    if state.get("model") != config.EMBEDDING_MIGRATION_MODEL:
+        previous_model = state.get("model")
+        state = {
+            "model": config.EMBEDDING_MIGRATION_MODEL,
+            # A first migration starts from empty columns (or ones live writes filled with this model)
+            "status": "clearing" if previous_model else "running",
+            "sweep": 1,
+            "checkpoints": {},
+            "sweep_embedded": 0,
+            "total_embedded": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+        save_migration_state(state, store)
+        if previous_model:
+            logger.info(f"Migration model changed from {previous_model} to {config.EMBEDDING_MIGRATION_MODEL}")
+    if state["status"] == "clearing":
+        # Persisted first, so a job stopped while clearing clears again when resumed
+        cleared = clear_next_vectors(store, batch_size)
+        logger.info(f"Cleared {cleared} vectors of the previous migration model")
+        state["status"] = "running"
+        save_migration_state(state, store)
+    switched = state["status"] == "switched"
+    if switched and state["sweep_embedded"] == 0:
+        # Searches use the new columns: sweep again for vectors left empty since the switch
+        logger.info(f"Searches already use {state['model']}, filling the issues still missing its vectors")
+        state.update(sweep=state["sweep"] + 1, checkpoints={}, sweep_embedded=0)
+        save_migration_state(state, store)
+
+    rate_limiter = RateLimiter(rate)
+    start = time.perf_counter()
+    embedded_since_start = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="reembed") as executor:
+        while True:
+            for source_field in SOURCE_FIELDS:
+                column = MIGRATION_VECTOR_COLUMNS[f"{source_field}_vec"]
+                after_id = state["checkpoints"].get(source_field)
+                while True:
+                    # One page per concurrent request
+                    batches = []
+                    for _ in range(concurrency):
+                        rows = store.scan(
+                            after_id,
+                            batch_size,
+                            fields=["github_issue_id", source_field, "content_fingerprint"],
+                            filters={column: None},
+                        )
+                        if not rows:
+                            break
+                        batches.append(rows)
+                        after_id = rows[-1]["github_issue_id"]
+                    if not batches:
+                        break
+
+                    embedded = sum(executor.map(
+                        lambda rows: reembed_rows(store, rows, source_field, functions, rate_limiter),
+                        batches,
+                    ))
+                    state["checkpoints"][source_field] = after_id
+                    state["sweep_embedded"] += embedded
+                    state["total_embedded"] += embedded
+                    save_migration_state(state, store)
+
+                    embedded_since_start += embedded
+                    logger.info(
+                        f"Sweep {state['sweep']}: {source_field} up to issue id {after_id}, "
+                        f"{state['total_embedded']} texts embedded "
+                        f"({embedded_since_start / (time.perf_counter() - start):.1f}/s)"
+                    )
+
+            if state["sweep_embedded"] == 0:
+                break
+
+            # Rows written while the sweep ran may sit behind its checkpoint, start over until a sweep finds none
+            logger.info(f"Sweep {state['sweep']} embedded {state['sweep_embedded']} texts, starting another")
+            state.update(sweep=state["sweep"] + 1, checkpoints={}, sweep_embedded=0)
+            save_migration_state(state, store)
+
+    logger.info(f"Every issue has {config.EMBEDDING_MIGRATION_MODEL} vectors after {state['sweep']} sweeps")
+    if switch and not switched:
+        state.update(status="switched", switched_at=datetime.now(timezone.utc).isoformat())
+        save_migration_state(state, store)
+        logger.info(f"Searches now use {config.EMBEDDING_MIGRATION_MODEL} and the next vector columns")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed issues with EMBEDDING_MIGRATION_MODEL and switch searches to it")
+    parser.add_argument("--rate", type=float, default=config.EMBEDDING_MIGRATION_RATE,
+                        help="Maximum texts embedded per second")
+    parser.add_argument("--concurrency", type=int, default=config.EMBEDDING_MIGRATION_CONCURRENCY,
+                        help="Maximum embedding requests in flight")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_MIGRATION_BATCH_SIZE,
+                        help="Issues per embedding request")
+    parser.add_argument("--no-switch", action="store_true", help="Fill the new columns without switching searches")
+    parser.add_argument("--status", action="store_true", help="Print the migration state and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            print(json.dumps(load_migration_state(), indent=2))
+            return
+        run_migration(
+            rate=args.rate,
+            concurrency=max(1, args.concurrency),
+            batch_size=args.batch_size,
+            switch=not args.no_switch,
+        )
+    except Exception as e:
+        logger.error(f"Embedding migration failed: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TypeVar
+
+from backend import config
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() deadline of the current unit of work (e.g. one webhook delivery)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("tiara_deadline", default=None)
+
+
+class DependencyUnavailable(Exception):
+    """
+    A dependency could not be used in time: its circuit is open or the time budget ran out.
+    """
+
+    def __init__(self, dependency: str, reason: str):
+        super().__init__(f"{dependency}: {reason}")
+        self.dependency = dependency
+
+
+class DeadlineExceeded(DependencyUnavailable):
+    def __init__(self, stage: str):
+        super().__init__(stage, "time budget exhausted")
+
+
+class CircuitOpenError(DependencyUnavailable):
+    def __init__(self, name: str):
+        super().__init__(name, "circuit open")
+
+
+@contextmanager
+def time_budget(seconds: Optional[float]):
+    """
+    Give the code in the block, and every dependency call it makes from this thread (or
+    from threads started with a copy of its context), at most seconds to complete.
+    A nested budget can only shrink the enclosing one.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """
+    Absolute time.monotonic() deadline of the current time budget, None outside of one.
+    """
+    return _deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """
+    Run the block under an absolute deadline captured with current_deadline, e.g. in a
+    worker thread doing work on behalf of callers from other threads.
+    """
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """
+    Seconds left in the current time budget, None outside of one.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(stage: str):
+    """
+    Raise DeadlineExceeded if the current time budget is used up before stage starts.
+    """
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(stage)
+
+
+def bounded_timeout(timeout: Optional[float], stage: str = "request") -> Optional[float]:
+    """
+    Shrink a per-call timeout to the time left in the current budget.
+    """
+    remaining = remaining_seconds()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise DeadlineExceeded(stage)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a dependency is failing: after failure_threshold consecutive failures
+    the circuit opens and calls raise CircuitOpenError without reaching the dependency.
+    After reset_seconds one trial call is let through (half-open); its success closes the
+    circuit, its failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the call must not reach the dependency.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.name)
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = True
+            self.stats["calls"] += 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    logger.warning(f"Circuit {self.name} opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.stats["opened"] += 1
+
+    def call(self, fn: Callable[[], T], is_failure: Optional[Callable[[Exception], bool]] = None) -> T:
+        """
+        Call fn through the breaker. Errors for which is_failure returns False (e.g. a request
+        the dependency rejected as invalid) are raised without counting as failures: the
+        dependency answered. By default every error counts.
+        """
+        self.before_call()
+        try:
+            result = fn()
+        except DependencyUnavailable:
+            # Running out of budget says nothing about the dependency's health
+            with self._lock:
+                self._trial_in_flight = False
+            raise
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.consecutive_failures, **self.stats}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker of a dependency, creating it on first use.
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=config.CIRCUIT_BREAKER_RESET_SECONDS,
+            )
+        return _breakers[name]
+
+
+_hedge_executor = None
+_hedge_stats = defaultdict(lambda: {"requests": 0, "hedged": 0, "primary_wins": 0, "secondary_wins": 0, "failures": 0})
+_hedge_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+        return _hedge_executor
+
+
+def _count_hedge(name: str, key: str):
+    with _hedge_lock:
+        _hedge_stats[name][key] += 1
+
+
+def hedged_call(name: str, primary: Callable[[], T], secondary: Callable[[], T], hedge_after: float) -> T:
+    """
+    Call primary, and also secondary if primary has not succeeded within hedge_after
+    seconds (or failed before that); the first success wins. Both calls see the caller's
+    time budget. If both fail, the primary's error is raised.
+    """
+    executor = _get_hedge_executor()
+    _count_hedge(name, "requests")
+    futures = {executor.submit(contextvars.copy_context().run, primary): "primary"}
+
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done or next(iter(done)).exception() is not None:
+        _count_hedge(name, "hedged")
+        futures[executor.submit(contextvars.copy_context().run, secondary)] = "secondary"
+
+    errors = {}
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=remaining_seconds(), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(name)
+        for future in done:
+            if future.exception() is None:
+                _count_hedge(name, f"{futures[future]}_wins")
+                return future.result()
+            errors[futures[future]] = future.exception()
+
+    _count_hedge(name, "failures")
+    raise errors.get("primary") or errors["secondary"]
+
+
+def get_resilience_metrics() -> Dict:
+    """
+    Circuit breaker states and hedging counters since process start.
+    """
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    with _hedge_lock:
+        hedging = {name: dict(stats) for name, stats in _hedge_stats.items()}
+    return {
+        "circuit_breakers": {name: breaker.summary() for name, breaker in breakers.items()},
+        "hedging": hedging,
+    }
+
+
+def with_time_budget(seconds: Callable[[], Optional[float]]):
+    """
+    Decorator running the function within time_budget(seconds()), seconds being read per call.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with time_budget(seconds()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,67 +1,122 @@
 #!/usr/bin/env python3
 
+from http import HTTPStatus
 from typing import List, Dict, Optional
-from backend.model import base
-from backend.model.issue import ISSUE_TABLE_NAME, Issue
+from backend.model.issue import Issue
+from backend.model.embedding import text_embedding_function
+from backend.model.hybrid_search import MAX_COSINE_DISTANCE, fuse_with_lexical, lexical_prefilter
+from backend.model.store import get_issue_store
+from backend.model.tiered_search import tiered_search
+from backend.model.vector_migration import get_search_vector_set
 from backend.tool.logger import get_logger
-from backend.tool.get_issues import get_github_client
+from backend.tool.get_issues import get_installation_token, resolve_installation_id
+from backend.tool.http_client import get_session, is_transient_error
+from backend.tool.resilience import DependencyUnavailable, get_circuit_breaker
 from backend import config
 
 logger = get_logger(__name__)
 
+# Hidden marker identifying Tiara's own comment, so it can be found and edited later
+TIARA_COMMENT_MARKER = "<!-- tiara:related-issues -->"
 
-def search_similar_issues(issue: Issue, limit_per_field: int = config.RETRIEVAL_LIMIT) -> List[Dict]:
+# reply_comment_id recorded before posting a reply: an attempt that fails past the POST may have posted it
+PENDING_REPLY_COMMENT_ID = 0
+
+# Row columns the comment and logs use; search results carry only these, not bodies or vectors
+SEARCH_RESULT_FIELDS = ["github_issue_id", "github_issue_number", "title", "state", "html_url"]
+
+
+def search_similar_issues(
+    issue: Issue,
+    limit_per_field: int = config.RETRIEVAL_LIMIT,
+    distance_threshold: Optional[float] = None,
+    search_mode: Optional[str] = None,
+    **filters,
+) -> List[Dict]:
     """
-    Search for similar issues using semantic vector search on title and body.
+    Search for similar issues using semantic vector search on title and body, combined
+    with full-text search in the "hybrid" SEARCH_MODE.
     
     Args:
-        issue: The issue to find similar issues for
+        issue: The issue to find similar issues for. Its own vectors are used as query
+            vectors if it has them (e.g. just embedded to be stored), otherwise it is embedded.
         limit_per_field: Number of results to get for each field (title_vec, body_vec)
+        distance_threshold: Drop results farther than this cosine distance, MIN_DISTANCE by default
+        search_mode: "vector" or "hybrid", SEARCH_MODE by default
+        **filters: Extra metadata filters pushed down into the query (state, repository_name,
+            labels, created_after), see backend.model.issue_search.build_filter_sql
         
     Returns:
-        List of similar issues (as dicts) sorted by distance, deduplicated
+        List of similar issues (as dicts) from the same repository, open issues first, then by distance, deduplicated
     """
-    if not issue.title and not issue.body:
+    # Query embedding model and searched columns switch together during an embedding migration
+    vector_set = get_search_vector_set()
+    
+    # Placeholder or empty text is not embedded, so there is nothing to search with
+    title_query = vector_set.title_function.prepare_text(issue.title)
+    body_query = vector_set.body_function.prepare_text(issue.body)
+    if title_query is None and body_query is None:
         logger.warning(f"Issue #{issue.github_issue_number} has no title or body for similarity search")
         return []
     
-    table = base.db.open_table(ISSUE_TABLE_NAME)
-    all_results = []
+    if distance_threshold is None:
+        distance_threshold = config.MIN_DISTANCE
     
     try:
-        # Search by title vector if title exists
-        if issue.title and issue.title.strip():
-            logger.debug(f"Searching similar issues by title: '{issue.title[:50]}'")
-            title_results = table.search(issue.title).limit(limit_per_field).vector_column("title_vec").distance_threshold(config.MIN_DISTANCE).to_list()
-            
-            for result in title_results:
-                result['_search_field'] = 'title_vec'
-                result['_state'] = issue.state
-                all_results.append(result)
-            
-            logger.debug(f"Found {len(title_results)} similar issues by title")
-        
-        # Search by body vector if body exists
-        if issue.body and issue.body.strip():
-            logger.debug(f"Searching similar issues by body: '{issue.body[:50]}...'")
-            body_results = table.search(issue.body).limit(limit_per_field).vector_column("body_vec").distance_threshold(config.MIN_DISTANCE).to_list()
-            
-            for result in body_results:
-                result['_search_field'] = 'body_vec'
-                result['_state'] = issue.state
-                all_results.append(result)
-            
-            logger.debug(f"Found {len(body_results)} similar issues by body")
-        
-        # Deduplicate results by github_issue_id, keeping the one with smaller distance
-        deduplicated_results = _deduplicate_by_distance(all_results, issue.github_issue_id)
-        
-        # Sort by distance (ascending - smaller distance means more similar)
-        deduplicated_results.sort(key=lambda x: (x.get('_state') != 'open', x.get('_state') == 'closed', x.get('_distance', float('inf'))))
-        
-        # Limit total results (title_vec + body_vec should each contribute up to limit_per_field)
-        max_total_results = limit_per_field * 2
-        final_results = deduplicated_results[:max_total_results]
+        store = get_issue_store()
+        breaker = get_circuit_breaker("storage:search")
+        scope = {"repository_id": issue.repository_id, "exclude_issue_id": issue.github_issue_id, **filters}
+        
+        # Hybrid mode: full-text hits, among them the issues containing one of this issue's error lines verbatim
+        lexical_hits, exact_match_ids = [], []
+        if (search_mode or config.SEARCH_MODE) == "hybrid":
+            lexical_hits, exact_match_ids = breaker.call(lambda: lexical_prefilter(store, issue, **scope))
+            if exact_match_ids:
+                logger.info(f"Found {len(exact_match_ids)} exact error matches for issue #{issue.github_issue_number}")
+        
+        # Query and stored vectors come from the same model and text preparation, so an issue's own vectors are reused
+        title_column, body_column = vector_set.columns["title_vec"], vector_set.columns["body_vec"]
+        query_vectors = {title_column: getattr(issue, title_column, None), body_column: getattr(issue, body_column, None)}
+        if (title_query is not None and query_vectors[title_column] is None) or (body_query is not None and query_vectors[body_column] is None):
+            # Embed both queries in a single provider request
+            title_query_vec, body_query_vec = vector_set.text_function.embed_prepared([title_query, body_query])
+            query_vectors = {title_column: title_query_vec, body_column: body_query_vec}
+        
+        # Filtering, deduplication and state-aware ordering run in the storage backend
+        final_results = breaker.call(lambda: tiered_search(
+            store,
+            query_vectors,
+            limit_per_field=limit_per_field,
+            limit=limit_per_field * 2,
+            distance_threshold=distance_threshold,
+            fields=SEARCH_RESULT_FIELDS,
+            **scope,
+        ))
+        
+        if lexical_hits:
+            # Full-text hits missed by the nearest-neighbour search are scored by distance too, then the rankings
+            # are fused. Exact error matches are kept whatever their distance.
+            found = {result["github_issue_id"] for result in final_results}
+            for missing, threshold in (
+                ([hit["github_issue_id"] for hit in lexical_hits if hit["github_issue_id"] not in exact_match_ids], distance_threshold),
+                (list(exact_match_ids), MAX_COSINE_DISTANCE),
+            ):
+                missing = [issue_id for issue_id in missing if issue_id not in found]
+                if missing:
+                    final_results += breaker.call(lambda: store.search(
+                        query_vectors,
+                        limit_per_field=len(missing),
+                        distance_threshold=threshold,
+                        fields=SEARCH_RESULT_FIELDS,
+                        issue_ids=missing,
+                        **scope,
+                    ))
+            final_results = fuse_with_lexical(final_results, lexical_hits, limit=limit_per_field * 2, exact_match_ids=exact_match_ids)
+        
+        # Report the logical field the match came from, whichever columns were searched
+        field_by_column = {column: field for field, column in vector_set.columns.items()}
+        for result in final_results:
+            result['_search_field'] = field_by_column.get(result.get('_search_field'), result.get('_search_field'))
         
         logger.info(f"Found {len(final_results)} similar issues for issue #{issue.github_issue_number}")
         
@@ -71,40 +126,17 @@ def search_similar_issues(issue: Issue, limit_per_field: int = config.RETRIEVAL_
         
         return final_results
         
+    except DependencyUnavailable:
+        # Circuit open or time budget spent: the caller degrades the delivery so it is redelivered
+        raise
     except Exception as e:
+        if is_transient_error(e):
+            # Embedding provider or storage still failing after retries, same as an open circuit
+            raise DependencyUnavailable("search", str(e)) from e
         logger.error(f"Error searching similar issues for #{issue.github_issue_number}: {str(e)}")
         return []
 
 
-def _deduplicate_by_distance(results: List[Dict], exclude_issue_id: Optional[int] = None) -> List[Dict]:
-    """
-    Deduplicate search results by github_issue_id, keeping the result with smaller distance.
-    
-    Args:
-        results: List of search result dictionaries
-        exclude_issue_id: Issue ID to exclude from results (usually the current issue)
-        
-    Returns:
-        Deduplicated list of results
-    """
-    issue_map = {}
-    
-    for result in results:
-        issue_id = result.get('github_issue_id')
-        
-        # Skip if no issue_id or if it's the same as the current issue
-        if not issue_id or issue_id == exclude_issue_id:
-            continue
-        
-        distance = result.get('_distance', float('inf'))
-        
-        # Keep the result with smaller distance
-        if issue_id not in issue_map or distance < issue_map[issue_id].get('_distance', float('inf')):
-            issue_map[issue_id] = result
-    
-    return list(issue_map.values())
-
-
 def log_similar_issues(similar_issues: List[Dict], current_issue: Issue):
     """
     Log information about found similar issues.
@@ -133,31 +165,44 @@ def log_similar_issues(similar_issues: List[Dict], current_issue: Issue):
         logger.info(f"     Title: {display_title}")
 
 
-def send_issue_comment(issue: Issue, similar_issues: List[Dict]):
+def send_issue_comment(issue: Issue, similar_issues: List[Dict], upsert: bool = False):
     """
     Send a comment to the issue with the similar issues found.
     
+    The comment is POSTed straight to the known issue number, without fetching the
+    repository or the issue first.
+    
     Args:
         issue: The current issue to comment on
         similar_issues: List of similar issue dictionaries from search results
+        upsert: Edit the existing Tiara comment on the issue instead of adding another one.
+            Its ID is recorded on the issue row, so a first reply is posted without a lookup.
     """
     if not similar_issues:
         logger.info(f"No similar issues to comment on for issue #{issue.github_issue_number}")
         return
     
     try:
-        # Get GitHub client
-        github_client = get_github_client()
-        repo = github_client.get_repo(config.GITHUB_REPO_NAME)
-        github_issue = repo.get_issue(issue.github_issue_number)
-        
         # Build comment content
         comment_content = _build_comment_content(similar_issues)
         
-        # Send comment
-        github_issue.create_comment(comment_content)
+        comment_id = None
+        if upsert:
+            comment_id = _find_tiara_comment_id(issue)
+        
+        if comment_id is not None:
+            comment_id = _update_comment(issue.repository_name, issue.github_issue_number, comment_id, comment_content)
         
-        logger.info(f"Successfully posted related issues comment to issue #{issue.github_issue_number}")
+        if comment_id is None:
+            if upsert:
+                # A retry after a failure past this point looks the reply up instead of posting another one
+                _record_comment_id(issue, PENDING_REPLY_COMMENT_ID)
+            comment_id = _create_comment(issue.repository_name, issue.github_issue_number, comment_content)
+            logger.info(f"Successfully posted related issues comment to issue #{issue.github_issue_number}")
+        else:
+            logger.info(f"Successfully updated related issues comment {comment_id} on issue #{issue.github_issue_number}")
+        
+        _record_comment_id(issue, comment_id)
         logger.debug(f"Comment content: {comment_content}")
         
     except Exception as e:
@@ -165,6 +210,72 @@ def send_issue_comment(issue: Issue, similar_issues: List[Dict]):
         raise
 
 
+def _github_api_headers(repo_name: str) -> Dict:
+    return {
+        'Authorization': f'token {get_installation_token(resolve_installation_id(repo_name))}',
+        'Accept': 'application/vnd.github.v3+json',
+        'User-Agent': 'Tiara-GitHub-App'
+    }
+
+
+def _create_comment(repo_name: str, issue_number: int, body: str) -> int:
+    """
+    Create a comment on the issue and return its ID.
+    """
+    response = get_session().post(
+        f'{config.GITHUB_API_URL}/repos/{repo_name}/issues/{issue_number}/comments',
+        headers=_github_api_headers(repo_name),
+        json={'body': body},
+    )
+    response.raise_for_status()
+    return response.json()['id']
+
+
+def _update_comment(repo_name: str, issue_number: int, comment_id: int, body: str) -> Optional[int]:
+    """
+    Edit an existing comment. Returns None if the comment no longer exists.
+    """
+    response = get_session().patch(
+        f'{config.GITHUB_API_URL}/repos/{repo_name}/issues/comments/{comment_id}',
+        headers=_github_api_headers(repo_name),
+        json={'body': body},
+    )
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        logger.info(f"Tiara comment {comment_id} on issue #{issue_number} was deleted, posting a new one")
+        return None
+    response.raise_for_status()
+    return comment_id
+
+
+def _find_tiara_comment_id(issue: Issue) -> Optional[int]:
+    """
+    Find the Tiara comment on an issue from the ID recorded on its row. The issue's comments
+    are only scanned for TIARA_COMMENT_MARKER when an earlier attempt may have posted the
+    reply without recording its ID (retries and redeliveries of a failed delivery).
+    """
+    stored = get_issue_store().get_fields(issue.github_issue_id, ['reply_comment_id'])
+    comment_id = stored['reply_comment_id'] if stored else None
+    if comment_id != PENDING_REPLY_COMMENT_ID:
+        return comment_id
+    
+    repo_name = issue.repository_name
+    url = f'{config.GITHUB_API_URL}/repos/{repo_name}/issues/{issue.github_issue_number}/comments?per_page=100'
+    headers = _github_api_headers(repo_name)
+    while url:
+        response = get_session().get(url, headers=headers)
+        response.raise_for_status()
+        for comment in response.json():
+            if TIARA_COMMENT_MARKER in (comment.get('body') or ''):
+                return comment['id']
+        url = response.links.get('next', {}).get('url')
+    return None
+
+
+def _record_comment_id(issue: Issue, comment_id: int):
+    # Issues not stored (e.g. a manual trigger of an unknown issue) are left as they are
+    get_issue_store().update({"reply_comment_id": comment_id}, {"github_issue_id": issue.github_issue_id})
+
+
 def _build_comment_content(similar_issues: List[Dict]) -> str:
     """
     Build the comment content with related issues.
@@ -186,7 +297,7 @@ def _build_comment_content(similar_issues: List[Dict]) -> str:
         search_field = similar.get('_search_field', 'unknown')
 
         # Add similarity indicator
-        if distance < 0.3:
+        if distance < config.SIMILAR_DISTANCE:
             similarity_text = "✨ Similar"
         else:
             similarity_text = "📝 Related"
@@ -197,6 +308,7 @@ def _build_comment_content(similar_issues: List[Dict]) -> str:
     
     lines.append("---")
     lines.append("*This comment was automatically generated based on semantic similarity analysis.*")
+    lines.append(TIARA_COMMENT_MARKER)
     
     return "\n".join(lines)
 
@@ -237,6 +349,6 @@ def should_send_comment(action: str, issue: Issue, similar_issues: List[Dict]) -
     return True
 
 if __name__ == "__main__":
-    table = base.db.open_table(ISSUE_TABLE_NAME)
-    results = table.search("test").limit(1).vector_column("title_vec").to_list()
+    query_vec = text_embedding_function.get_query_embedding("test")
+    results = get_issue_store().search({"title_vec": query_vec}, limit_per_field=1)
     print(results)
\ No newline at end of file
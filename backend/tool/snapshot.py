@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Export the issues table, vectors included, to columnar snapshot files and import it back.
+
+Export streams the table in chunks of --chunk-size rows, one Parquet (or Arrow IPC) file
+per chunk, plus a manifest.json. Import bulk-loads the files in batches of --batch-size
+rows without calling GitHub or the embedding provider; issues already stored are skipped,
+so an interrupted import can simply be run again. Requires pyarrow.
+
+Usage:
+    python -m backend.tool.snapshot export snapshots/2025-07-03
+    python -m backend.tool.snapshot export snapshots/2025-07-03 --format arrow --chunk-size 5000
+    python -m backend.tool.snapshot import snapshots/2025-07-03
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Union, get_args, get_origin
+
+from backend import config
+from backend.model.compact_vectors import add_compact_vectors
+from backend.model.issue import FINGERPRINT_EXCLUDED_FIELDS, Issue
+from backend.model.store import get_issue_store
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+# Compact vectors are not exported, they are derived from the full ones on import
+VECTOR_COLUMNS = ("title_vec", "body_vec")
+JSON_COLUMNS = ("assignees", "labels")
+SCALAR_COLUMNS = [
+    field_name for field_name in Issue.model_fields
+    if field_name not in FINGERPRINT_EXCLUDED_FIELDS
+]
+SNAPSHOT_COLUMNS = [*SCALAR_COLUMNS, "content_fingerprint", *VECTOR_COLUMNS]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Snapshots require pyarrow, install it with: poetry install -E snapshots (or pip install pyarrow)")
+    return pyarrow
+
+
+def build_schema(pa):
+    """
+    Arrow schema of the snapshot files: scalars typed after the Issue model, JSON columns as
+    text and vectors as lists of float32.
+    """
+    fields = []
+    for column in SNAPSHOT_COLUMNS:
+        if column in VECTOR_COLUMNS:
+            arrow_type = pa.list_(pa.float32())
+        elif column in JSON_COLUMNS or column == "content_fingerprint":
+            arrow_type = pa.string()
+        else:
+            annotation = Issue.model_fields[column].annotation
+            if get_origin(annotation) is Union:
+                annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+            arrow_type = {
+                int: pa.int64(),
+                bool: pa.bool_(),
+                datetime: pa.timestamp("us"),
+            }.get(annotation, pa.string())
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def _to_record(row: Dict) -> Dict:
+    record = {}
+    for column in SNAPSHOT_COLUMNS:
+        value = row.get(column)
+        if value is not None:
+            if column in VECTOR_COLUMNS:
+                value = [float(x) for x in value]
+            elif column in JSON_COLUMNS and not isinstance(value, str):
+                value = json.dumps(value)
+            elif isinstance(value, datetime) and value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        record[column] = value
+    return record
+
+
+def _to_issue(record: Dict) -> Issue:
+    values = dict(record)
+    for column in JSON_COLUMNS:
+        if isinstance(values.get(column), str):
+            values[column] = json.loads(values[column])
+    issue = Issue(**add_compact_vectors(values))
+    if issue.content_fingerprint is None:
+        issue.content_fingerprint = issue.compute_content_fingerprint()
+    return issue
+
+
+def export_snapshot(path: str, file_format: str = "parquet", chunk_size: int = 10000) -> Dict:
+    """
+    Stream the issues table to snapshot files in path.
+
+    Args:
+        path: Output directory, created if missing
+        file_format: "parquet" or "arrow" (Arrow IPC)
+        chunk_size: Rows per file, only one chunk is held in memory
+
+    Returns:
+        The written manifest
+    """
+    pa = _import_pyarrow()
+    schema = build_schema(pa)
+    store = get_issue_store()
+    os.makedirs(path, exist_ok=True)
+
+    files = []
+    row_count = 0
+    after_id = None
+    start = time.perf_counter()
+    while True:
+        rows = store.scan(after_id, chunk_size)
+        if not rows:
+            break
+
+        table = pa.Table.from_pylist([_to_record(row) for row in rows], schema=schema)
+        file_name = f"issues-{len(files):05d}.{FILE_EXTENSIONS[file_format]}"
+        file_path = os.path.join(path, file_name)
+        if file_format == "parquet":
+            pa.parquet.write_table(table, file_path, compression="zstd")
+        else:
+            with pa.ipc.new_file(file_path, schema) as writer:
+                writer.write_table(table)
+
+        files.append(file_name)
+        row_count += len(rows)
+        after_id = rows[-1]["github_issue_id"]
+        logger.info(f"Exported {row_count} issues ({row_count / (time.perf_counter() - start):.0f}/s)")
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "format": file_format,
+        "embedding_model": config.EMBEDDING_MODEL,
+        "row_count": row_count,
+        "columns": SNAPSHOT_COLUMNS,
+        "files": files,
+    }
+    with open(os.path.join(path, MANIFEST_FILE_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Exported {row_count} issues to {len(files)} {file_format} files in {path}")
+    return manifest
+
+
+def _iter_record_batches(pa, file_path: str, file_format: str, batch_size: int) -> Iterator[List[Dict]]:
+    if file_format == "parquet":
+        for batch in pa.parquet.ParquetFile(file_path).iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+    else:
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                for batch in pa.Table.from_batches([reader.get_batch(i)]).to_batches(max_chunksize=batch_size):
+                    yield batch.to_pylist()
+
+
+def import_snapshot(path: str, batch_size: int = 500, allow_model_mismatch: bool = False) -> Dict:
+    """
+    Bulk-load snapshot files into the configured storage backend, skipping issues already stored.
+
+    Args:
+        path: Snapshot directory written by export_snapshot
+        batch_size: Rows per insert batch
+        allow_model_mismatch: Import even if the snapshot was embedded with another EMBEDDING_MODEL
+
+    Returns:
+        Counts of imported and skipped issues
+    """
+    pa = _import_pyarrow()
+    with open(os.path.join(path, MANIFEST_FILE_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest['version']}, expected {SNAPSHOT_VERSION}")
+    if manifest["embedding_model"] != config.EMBEDDING_MODEL and not allow_model_mismatch:
+        raise ValueError(
+            f"Snapshot vectors come from {manifest['embedding_model']} but EMBEDDING_MODEL is {config.EMBEDDING_MODEL}, "
+            f"searches would compare different vector spaces"
+        )
+
+    store = get_issue_store()
+    store.init_schema()
+
+    imported_count = 0
+    skipped_count = 0
+    start = time.perf_counter()
+    for file_name in manifest["files"]:
+        for records in _iter_record_batches(pa, os.path.join(path, file_name), manifest["format"], batch_size):
+            existing_ids = store.existing_ids(record["github_issue_id"] for record in records)
+            issues = [_to_issue(record) for record in records if record["github_issue_id"] not in existing_ids]
+            if issues:
+                store.bulk_insert(issues)
+            imported_count += len(issues)
+            skipped_count += len(records) - len(issues)
+        logger.info(
+            f"Imported {file_name}: {imported_count} issues so far, {skipped_count} already stored "
+            f"({(imported_count + skipped_count) / (time.perf_counter() - start):.0f}/s)"
+        )
+
+    logger.info(f"Imported {imported_count} of {manifest['row_count']} issues from {path}, {skipped_count} were already stored")
+    return {"imported": imported_count, "skipped": skipped_count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import issue snapshots (vectors included)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write the issues table to snapshot files")
+    export_parser.add_argument("path", help="Output directory")
+    export_parser.add_argument("--format", default="parquet", choices=sorted(FILE_EXTENSIONS))
+    export_parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per file")
+
+    import_parser = subparsers.add_parser("import", help="Load snapshot files into the storage backend")
+    import_parser.add_argument("path", help="Snapshot directory")
+    import_parser.add_argument("--batch-size", type=int, default=500, help="Rows per insert batch")
+    import_parser.add_argument("--allow-model-mismatch", action="store_true",
+                               help="Import vectors embedded with a different EMBEDDING_MODEL")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            export_snapshot(args.path, file_format=args.format, chunk_size=args.chunk_size)
+        else:
+            import_snapshot(args.path, batch_size=args.batch_size, allow_model_mismatch=args.allow_model_mismatch)
+    except Exception as e:
+        logger.error(f"Snapshot {args.command} failed: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
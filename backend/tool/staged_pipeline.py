@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+from backend.tool.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of a stage's input, one per worker
+_DONE = object()
+
+
+class StageStats:
+    """
+    Counters of one pipeline stage, updated by its workers.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0  # Time spent in the stage function, not blocked, summed over workers
+        self.blocked_seconds = 0.0  # Time spent waiting for room in the next queue (backpressure)
+        self._lock = threading.Lock()
+
+    def add(self, processed: int = 0, emitted: int = 0, errors: int = 0, busy_seconds: float = 0.0, blocked_seconds: float = 0.0):
+        with self._lock:
+            self.processed += processed
+            self.emitted += emitted
+            self.errors += errors
+            self.busy_seconds += busy_seconds
+            self.blocked_seconds += blocked_seconds
+
+    def summary(self, elapsed_seconds: float) -> Dict:
+        with self._lock:
+            # Utilization near 100% marks the bottleneck, its workers never wait for input
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "processed": self.processed,
+                "emitted": self.emitted,
+                "errors": self.errors,
+                "per_second": self.processed / elapsed_seconds if elapsed_seconds else 0.0,
+                "utilization": self.busy_seconds / (elapsed_seconds * self.workers) if elapsed_seconds else 0.0,
+                "blocked_seconds": self.blocked_seconds,
+            }
+
+
+class PipelineStage:
+    """
+    One stage of a StagedPipeline.
+
+    Args:
+        name: Stage name used in reports
+        fn: Called as fn(item, emit) for each input item, emit(output) passes an item to the
+            next stage (any number of times, including none)
+        workers: Number of threads running fn
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any, Callable[[Any], None]], None], workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+
+class StagedPipeline:
+    """
+    Run items through stages connected by bounded queues. Each stage runs its own worker
+    threads; a full queue blocks the upstream stage, so memory stays bounded by the queue
+    sizes whatever the number of items. Failing items are logged and dropped.
+    """
+
+    def __init__(self, name: str, stages: List[PipelineStage], queue_size: int = 100, report_interval: float = 30):
+        self.name = name
+        self.stages = stages
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.stats = [StageStats(stage.name, stage.workers) for stage in stages]
+        self._start_time = None
+
+    def run(self, inputs: Iterable) -> List[Dict]:
+        """
+        Feed inputs to the first stage and block until every stage has drained.
+
+        Returns:
+            Per-stage summaries (see StageStats.summary)
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining_workers = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        finished = threading.Event()
+        self._start_time = time.perf_counter()
+
+        def worker(index: int):
+            stage, stats = self.stages[index], self.stats[index]
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+
+            # Start of the current stretch of work, so time blocked in emit is not counted as busy
+            work_started = [0.0]
+
+            def emit(output):
+                if next_queue is None:
+                    stats.add(emitted=1)
+                    return
+                put_start = time.perf_counter()
+                next_queue.put(output)
+                put_end = time.perf_counter()
+                stats.add(emitted=1, busy_seconds=put_start - work_started[0], blocked_seconds=put_end - put_start)
+                work_started[0] = put_end
+
+            while True:
+                item = queues[index].get()
+                if item is _DONE:
+                    break
+                work_started[0] = time.perf_counter()
+                try:
+                    stage.fn(item, emit)
+                    stats.add(processed=1, busy_seconds=time.perf_counter() - work_started[0])
+                except Exception as e:
+                    stats.add(processed=1, errors=1, busy_seconds=time.perf_counter() - work_started[0])
+                    logger.error(f"{self.name} stage '{stage.name}' failed on {item!r}: {str(e)}")
+
+            # The last worker of a stage closes the next one
+            with remaining_lock:
+                remaining_workers[index] -= 1
+                is_last = remaining_workers[index] == 0
+            if is_last and next_queue is not None:
+                for _ in range(self.stages[index + 1].workers):
+                    next_queue.put(_DONE)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,), name=f"{self.name}-{stage.name}-{i}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for i in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        reporter = threading.Thread(target=self._report_loop, args=(finished,), name=f"{self.name}-reporter", daemon=True)
+        reporter.start()
+
+        try:
+            for item in inputs:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+            finished.set()
+
+        summaries = self.summaries()
+        self.log_summaries(summaries, final=True)
+        return summaries
+
+    def summaries(self) -> List[Dict]:
+        elapsed = time.perf_counter() - self._start_time
+        return [stats.summary(elapsed) for stats in self.stats]
+
+    def log_summaries(self, summaries: List[Dict], final: bool = False):
+        logger.info(f"{self.name} pipeline {'finished' if final else 'progress'}:")
+        for summary in summaries:
+            logger.info(
+                f"  {summary['stage']:<10} workers={summary['workers']} processed={summary['processed']} "
+                f"({summary['per_second']:.1f}/s) emitted={summary['emitted']} errors={summary['errors']} "
+                f"utilization={summary['utilization']:.0%} blocked={summary['blocked_seconds']:.1f}s"
+            )
+        if final and summaries:
+            bottleneck = max(summaries, key=lambda summary: summary['utilization'])
+            logger.info(f"  bottleneck: {bottleneck['stage']}")
+
+    def _report_loop(self, finished: threading.Event):
+        while not finished.wait(self.report_interval):
+            self.log_summaries(self.summaries())
@@ -0,0 +1,62 @@
+import atexit
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# backend.config reads the environment on import, and importing the Issue model probes the
+# embedding model: use local storage and the hashing vectorizer, so no test needs the network
+STORAGE_PATH = tempfile.mkdtemp(prefix="tiara-tests-")
+atexit.register(shutil.rmtree, STORAGE_PATH, ignore_errors=True)
+os.environ.update({
+    "STORAGE_BACKEND": "local",
+    "LOCAL_STORAGE_PATH": STORAGE_PATH,
+    "EMBEDDING_MODEL": "hashing/32",
+    "EMBEDDING_BATCH_ENABLED": "false",
+    "VECTOR_STORAGE_MODE": "full",
+    "WORK_LEASES_ENABLED": "true",
+    "LEASE_POLL_SECONDS": "0.01",
+})
+
+
+@pytest.fixture
+def store():
+    from backend.model.store import get_issue_store
+    return get_issue_store()
+
+
+@pytest.fixture
+def make_issue():
+    """
+    Build an Issue with every required field set, overridden by keyword arguments.
+    """
+    from backend.model.issue import Issue
+
+    def make(**fields):
+        values = {
+            "github_issue_id": 1,
+            "github_issue_number": 1,
+            "node_id": "I_1",
+            "repository_name": "owner/repo",
+            "repository_owner": "owner",
+            "repository_id": 1,
+            "title": "Panic after upgrade",
+            "body": "The server panics on start after the upgrade.",
+            "state": "open",
+            "author_login": "octocat",
+            "author_id": 1,
+            "assignees": [],
+            "labels": [],
+            "created_at": datetime(2024, 1, 1),
+            "updated_at": datetime(2024, 1, 2),
+            "html_url": "https://github.com/owner/repo/issues/1",
+            "url": "https://api.github.com/repos/owner/repo/issues/1",
+            **fields,
+        }
+        issue = Issue(**values)
+        issue.content_fingerprint = issue.compute_content_fingerprint()
+        return issue
+
+    return make
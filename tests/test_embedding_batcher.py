@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from backend.tool.embedding_batcher import EmbeddingBatcher
+from backend.tool.resilience import DeadlineExceeded, remaining_seconds, time_budget
+
+
+def vectors(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_texts_share_one_call():
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(list(texts))
+        return vectors(texts)
+
+    batcher = EmbeddingBatcher(embed_batch, max_wait_ms=50)
+    results = {}
+    threads = [threading.Thread(target=lambda text=text: results.update({text: batcher.embed([text])})) for text in ("a", "bb", "bb")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {"a": [[1.0]], "bb": [[2.0]]}
+    assert len(calls) == 1 and sorted(calls[0]) == ["a", "bb"]
+
+
+def test_caller_out_of_budget_fails_without_a_call():
+    calls = []
+    batcher = EmbeddingBatcher(lambda texts: calls.append(texts) or vectors(texts))
+
+    with time_budget(0.05):
+        time.sleep(0.06)
+        with pytest.raises(DeadlineExceeded):
+            batcher.embed(["late"])
+    assert calls == []
+
+
+def test_caller_fails_on_its_own_deadline_while_the_batch_completes():
+    budgets = []
+
+    def slow_embed_batch(texts):
+        budgets.append(remaining_seconds())
+        time.sleep(0.2)
+        return vectors(texts)
+
+    batcher = EmbeddingBatcher(slow_embed_batch, max_wait_ms=50)
+    results = {}
+
+    def embed(text, seconds):
+        try:
+            with time_budget(seconds):
+                results[text] = batcher.embed([text])
+        except DeadlineExceeded:
+            results[text] = "deadline"
+
+    threads = [threading.Thread(target=embed, args=("short", 0.1)), threading.Thread(target=embed, args=("long", 2))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {"short": "deadline", "long": [[4.0]]}
+    # The shared call runs under the latest deadline, not the short one
+    assert budgets and budgets[0] > 1
+
+
+def test_expired_entries_are_dropped_from_the_batch():
+    calls = []
+    batcher = EmbeddingBatcher(lambda texts: calls.append(list(texts)) or vectors(texts), max_wait_ms=100)
+
+    with time_budget(0.02):
+        expired = batcher.submit("expired")
+    kept = batcher.submit("kept")
+
+    assert kept.result(timeout=1) == [4.0]
+    with pytest.raises(DeadlineExceeded):
+        expired.result(timeout=1)
+    assert calls == [["kept"]]
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from backend.model.init_database import load_changed_fields
+
+
+def test_unknown_issue_is_not_stored(store, make_issue):
+    assert load_changed_fields(make_issue(github_issue_id=100), store) is None
+
+
+def test_unchanged_issue_has_no_changes(store, make_issue):
+    store.insert(make_issue(github_issue_id=101))
+    assert load_changed_fields(make_issue(github_issue_id=101), store) == {}
+
+
+def test_newer_event_returns_changed_fields(store, make_issue):
+    store.insert(make_issue(github_issue_id=102))
+    edited = make_issue(github_issue_id=102, title="Panic after upgrade to v8", updated_at=datetime(2024, 1, 3))
+
+    changed_fields = load_changed_fields(edited, store)
+
+    assert changed_fields["title"] == "Panic after upgrade to v8"
+    assert changed_fields["content_fingerprint"] == edited.content_fingerprint
+    assert "body" not in changed_fields
+
+
+def test_stale_event_is_skipped(store, make_issue):
+    store.insert(make_issue(github_issue_id=103, state="closed", updated_at=datetime(2024, 1, 3)))
+    # Delivered after the close, but describes the issue before it
+    stale = make_issue(github_issue_id=103, state="open", updated_at=datetime(2024, 1, 2))
+
+    assert load_changed_fields(stale, store) == {}
+    assert store.get_fields(103, ["state"])["state"] == "closed"
@@ -0,0 +1,39 @@
+import pytest
+
+from backend.tool import leases
+from backend.tool.resilience import DeadlineExceeded, time_budget
+
+OTHER_WORKER = "other-host:1:worker"
+
+
+def test_lease_held_by_another_worker_is_not_acquired(store):
+    assert store.try_acquire_lease(leases.issue_lease_name(200), OTHER_WORKER, 60)
+
+    assert not leases.try_acquire(leases.issue_lease_name(200))
+
+
+def test_issue_lease_waits_no_longer_than_the_budget(store):
+    store.try_acquire_lease(leases.issue_lease_name(201), OTHER_WORKER, 60)
+
+    with pytest.raises(DeadlineExceeded):
+        with time_budget(0.1):
+            with leases.issue_lease(201):
+                pytest.fail("the block must not run while another worker holds the lease")
+
+
+def test_issue_lease_is_acquired_once_released(store):
+    store.try_acquire_lease(leases.issue_lease_name(202), OTHER_WORKER, 60)
+    store.release_lease(leases.issue_lease_name(202), OTHER_WORKER)
+
+    with time_budget(1):
+        with leases.issue_lease(202):
+            assert not store.try_acquire_lease(leases.issue_lease_name(202), OTHER_WORKER, 60)
+    assert store.try_acquire_lease(leases.issue_lease_name(202), OTHER_WORKER, 60)
+
+
+def test_expired_lease_is_taken_over(store):
+    store.try_acquire_lease(leases.issue_lease_name(203), OTHER_WORKER, 0.01)
+
+    with time_budget(1):
+        leases.acquire(leases.issue_lease_name(203))
+    assert not store.try_acquire_lease(leases.issue_lease_name(203), OTHER_WORKER, 60)
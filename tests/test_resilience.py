@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from backend.tool.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded
+
+
+def fail():
+    raise ConnectionError("connection refused")
+
+
+def failing_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=2, **kwargs)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    return breaker
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = failing_breaker(reset_seconds=60)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append("called"))
+    assert calls == []
+
+
+def test_rejected_errors_do_not_open_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    with pytest.raises(ValueError):
+        breaker.call(lambda: int("not a number"), is_failure=lambda e: isinstance(e, ConnectionError))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_success_closes_the_circuit():
+    breaker = failing_breaker(reset_seconds=0.01)
+    time.sleep(0.02)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_failure_opens_the_circuit_again():
+    breaker = failing_breaker(reset_seconds=0.01)
+    time.sleep(0.02)
+
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = failing_breaker(reset_seconds=0.01)
+    time.sleep(0.02)
+
+    def trial():
+        # A concurrent call while the trial is in flight is rejected
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "second")
+        return "trial"
+
+    assert breaker.call(trial) == "trial"
+
+
+def test_exhausted_budget_does_not_count_as_failure():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    def out_of_time():
+        raise DeadlineExceeded("test")
+
+    with pytest.raises(DeadlineExceeded):
+        breaker.call(out_of_time)
+    assert breaker.state == CircuitBreaker.CLOSED